@@ -1,8 +1,11 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from config import Config
 from satellite_utils import tracker
+from rotator_track import parse_frequency, to_csv, to_binary
 from database import db
+from static_responses import StaticResponse, StaticVariants, StaticStats
+from response_cache import ResponseCache
 import json
 from datetime import datetime
 import pytz
@@ -11,16 +14,64 @@ app = Flask(__name__)
 app.config.from_object(Config)
 CORS(app, origins=Config.CORS_ORIGINS)
 
-# العراقية الأقمار المهمة للعراق
-IRAQ_IMPORTANT_SATELLITES = {
-    'NOAA 19': {'freq': '137.100 MHz', 'type': 'طقس', 'importance': 'عالية'},
-    'NOAA 18': {'freq': '137.9125 MHz', 'type': 'طقس', 'importance': 'عالية'},
-    'ISS (ZARYA)': {'freq': '145.800 MHz', 'type': 'محطة فضائية', 'importance': 'متوسطة'},
-    'METEOR M2': {'freq': '137.100 MHz', 'type': 'طقس', 'importance': 'عالية'},
-    'SAUDISAT 1C': {'freq': '145.850 MHz', 'type': 'اتصالات', 'importance': 'متوسطة'},
-    'TÜRKSAT 3A': {'freq': '11767 MHz', 'type': 'اتصالات', 'importance': 'متوسطة'},
-    'IRAQ-SAT 1': {'freq': '11958 MHz', 'type': 'اتصالات', 'importance': 'عالية جداً'}
-}
+# العراقية الأقمار المهمة للعراق (معرّفة في الإعدادات لأن المتعقب يحتاجها أيضاً)
+IRAQ_IMPORTANT_SATELLITES = Config.IRAQ_IMPORTANT_SATELLITES
+
+# عدّاد الاستجابات الثابتة (كاملة أو 304) لـ /api/cache/stats
+static_stats = StaticStats()
+
+# أجسام استجابات /api/track و /api/satellites لكل فترة زمنية قصيرة
+response_cache = ResponseCache(
+    Config.RESPONSE_CACHE_MAX_ENTRIES,
+    Config.RESPONSE_CACHE_MAX_BYTES,
+    Config.RESPONSE_CACHE_GRID_DEGREES
+)
+
+def cached_response(body: bytes, status: int, source: str):
+    """استجابة JSON من جسم محفوظ، مع X-Cache يبيّن مصدره"""
+    return Response(body, status=status, mimetype='application/json', headers={'X-Cache': source.upper()})
+
+def satellites_payload(sat_type: str, iraq_only: bool):
+    """جسم /api/satellites لفئة (يُحسب مرة لكل فترة RESPONSE_CACHE_SATELLITES_SECONDS)"""
+    satellites = tracker.load_tle_from_celestrak(sat_type)
+    
+    # تنسيق الاستجابة
+    result = []
+    for name, data in list(satellites.items())[:100]:  # زيادة العدد ليشمل المزيد
+        norad_id = data['tle1'][2:7].strip()
+        
+        # تحديد أهمية القمر للعراق
+        importance = 'منخفضة'
+        if name in IRAQ_IMPORTANT_SATELLITES:
+            sat_info = IRAQ_IMPORTANT_SATELLITES[name]
+            freq = sat_info['freq']
+            sat_type = sat_info['type']
+            importance = sat_info['importance']
+        else:
+            freq = 'غير معروف'
+            sat_type = 'أخرى'
+        
+        # إذا طلبنا أقمار العراق فقط
+        if iraq_only and importance == 'منخفضة':
+            continue
+        
+        result.append({
+            'name': name,
+            'norad_id': norad_id,
+            'frequency': freq,
+            'type': sat_type,
+            'importance': importance,
+            'iraq_relevant': importance != 'منخفضة'
+        })
+    
+    return jsonify({
+        'success': True,
+        'count': len(result),
+        'developer': Config.DEVELOPER,
+        'year': Config.DEVELOPMENT_YEAR,
+        'country': 'العراق',
+        'satellites': result
+    }).get_data(), 200
 
 @app.route('/api/satellites', methods=['GET'])
 def get_satellites():
@@ -29,45 +80,12 @@ def get_satellites():
     iraq_only = request.args.get('iraq', 'false').lower() == 'true'
     
     try:
-        satellites = tracker.load_tle_from_celestrak(sat_type)
-        
-        # تنسيق الاستجابة
-        result = []
-        for name, data in list(satellites.items())[:100]:  # زيادة العدد ليشمل المزيد
-            norad_id = data['tle1'][2:7].strip()
-            
-            # تحديد أهمية القمر للعراق
-            importance = 'منخفضة'
-            if name in IRAQ_IMPORTANT_SATELLITES:
-                sat_info = IRAQ_IMPORTANT_SATELLITES[name]
-                freq = sat_info['freq']
-                sat_type = sat_info['type']
-                importance = sat_info['importance']
-            else:
-                freq = 'غير معروف'
-                sat_type = 'أخرى'
-            
-            # إذا طلبنا أقمار العراق فقط
-            if iraq_only and importance == 'منخفضة':
-                continue
-            
-            result.append({
-                'name': name,
-                'norad_id': norad_id,
-                'frequency': freq,
-                'type': sat_type,
-                'importance': importance,
-                'iraq_relevant': importance != 'منخفضة'
-            })
-        
-        return jsonify({
-            'success': True,
-            'count': len(result),
-            'developer': Config.DEVELOPER,
-            'year': Config.DEVELOPMENT_YEAR,
-            'country': 'العراق',
-            'satellites': result
-        })
+        body, status, source = response_cache.get(
+            ('satellites', sat_type, iraq_only),
+            Config.RESPONSE_CACHE_SATELLITES_SECONDS,
+            lambda: satellites_payload(sat_type, iraq_only)
+        )
+        return cached_response(body, status, source)
     
     except Exception as e:
         return jsonify({
@@ -76,6 +94,61 @@ def get_satellites():
             'developer': Config.DEVELOPER
         }), 500
 
+def track_payload(sat_name: str, latitude: float, longitude: float, altitude: float):
+    """الجزء المشترك من /api/track لقمر وموقع مقرّب (يُحسب مرة لكل فترة RESPONSE_CACHE_TRACK_SECONDS)
+
+    الموقع يُحسب عند نقطة الشبكة المقرّبة ويُذكر في computed_location، أما
+    tracking_location فيضيفه المسار لكل طلب بإحداثيات العميل نفسها.
+    """
+    # تحميل الأقمار
+    satellites = tracker.load_tle_from_celestrak()
+    
+    if sat_name not in satellites:
+        return jsonify({
+            'success': False,
+            'error': 'القمر غير موجود',
+            'developer': Config.DEVELOPER
+        }).get_data(), 404
+    
+    # حساب الموقع
+    sat_data = satellites[sat_name]
+    position = tracker.calculate_position(sat_data['satellite'], latitude, longitude, altitude)
+    
+    # الحصول على معلومات توجيه الهوائي
+    antenna_info = tracker.get_antenna_orientation(
+        position['azimuth'],
+        position['altitude']
+    )
+    
+    # إضافة معلومات العراق
+    iraq_info = IRAQ_IMPORTANT_SATELLITES.get(sat_name, {
+        'freq': 'غير معروف',
+        'type': 'أخرى',
+        'importance': 'منخفضة'
+    })
+    
+    return jsonify({
+        'success': True,
+        'developer': Config.DEVELOPER,
+        'development_year': Config.DEVELOPMENT_YEAR,
+        'country': 'العراق',
+        'computed_location': {
+            'latitude': latitude,
+            'longitude': longitude,
+            'altitude': altitude,
+            'grid_degrees': response_cache.grid_degrees
+        },
+        'position': position,
+        'antenna': antenna_info,
+        'satellite': {
+            'name': sat_name,
+            'frequency': iraq_info['freq'],
+            'type': iraq_info['type'],
+            'importance': iraq_info['importance'],
+            'iraq_relevant': iraq_info['importance'] != 'منخفضة'
+        }
+    }).get_data(), 200
+
 @app.route('/api/track', methods=['POST'])
 def track_satellite():
     """تتبع قمر معين من موقع في العراق"""
@@ -97,59 +170,441 @@ def track_satellite():
             }), 400
     
     try:
-        # تحميل الأقمار
-        satellites = tracker.load_tle_from_celestrak()
+        # الراصدون في خلية الشبكة نفسها خلال الفترة نفسها يتشاركون حساباً واحداً
+        latitude, longitude = response_cache.quantize(float(data['latitude']), float(data['longitude']))
+        altitude = round(float(data.get('altitude', 0)))
+        body, status, source = response_cache.get(
+            ('track', data['satellite_name'], latitude, longitude, altitude),
+            Config.RESPONSE_CACHE_TRACK_SECONDS,
+            lambda: track_payload(data['satellite_name'], latitude, longitude, altitude)
+        )
+        if status != 200:
+            return cached_response(body, status, source)
         
-        if data['satellite_name'] not in satellites:
+        # إضافة موقع العميل إلى الجسم المحفوظ مباشرة دون إعادة تحليله
+        tracking_location = app.json.dumps({
+            'city': data.get('city', 'بغداد'),
+            'latitude': data['latitude'],
+            'longitude': data['longitude'],
+            'country': 'العراق'
+        }).encode()
+        body = body.rstrip()[:-1] + b',"tracking_location":' + tracking_location + b'}\n'
+        return cached_response(body, status, source)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+
+def resolve_observers(data: dict):
+    """تحديد قائمة الرواصد من الطلب: مواقع صريحة و/أو محطات
+
+    المحطة إما مفتاح مدينة من Config.IRAQ_LOCATIONS (مثل baghdad، و all لجميعها)
+    أو معرّف صف في جدول iraq_stations.
+    """
+    observers = []
+    
+    stations = data.get('stations', [])
+    if stations == 'all':
+        stations = list(Config.IRAQ_LOCATIONS.keys())
+    elif isinstance(stations, str):
+        stations = [stations]
+    if not isinstance(stations, list):
+        raise ValueError('stations يجب أن تكون قائمة أو all')
+    
+    # المعرفات غير الموجودة في الإعدادات تُقرأ من iraq_stations باستعلام واحد
+    unknown = [str(s) for s in stations if s not in Config.IRAQ_LOCATIONS]
+    db_stations = db.get_station_locations(unknown) if unknown else {}
+    for station_id in stations:
+        if station_id in Config.IRAQ_LOCATIONS:
+            location = Config.IRAQ_LOCATIONS[station_id]
+            observers.append({
+                'id': station_id,
+                'city': location['city'],
+                'latitude': location['lat'],
+                'longitude': location['lon'],
+                'altitude': 0.0
+            })
+        elif str(station_id) in db_stations:
+            station = db_stations[str(station_id)]
+            observers.append({
+                'id': station['id'],
+                'city': station['location'],
+                'name': station['name'],
+                'latitude': float(station['latitude']),
+                'longitude': float(station['longitude']),
+                'altitude': 0.0
+            })
+        else:
+            raise ValueError(f'محطة غير معروفة: {station_id}')
+    
+    explicit = data.get('observers', [])
+    if not isinstance(explicit, list):
+        raise ValueError('observers يجب أن تكون قائمة')
+    for i, observer in enumerate(explicit):
+        if not isinstance(observer, dict):
+            raise ValueError(f'الراصد {i} يجب أن يكون كائناً فيه latitude و longitude')
+        observers.append({
+            'id': observer.get('id', f'observer-{i}'),
+            'city': observer.get('city'),
+            'latitude': float(observer['latitude']),
+            'longitude': float(observer['longitude']),
+            'altitude': float(observer.get('altitude', 0))
+        })
+    
+    # بغداد افتراضياً إذا لم يُحدد أي راصد
+    if not observers:
+        observers.append({
+            'id': 'baghdad',
+            'city': Config.DEFAULT_LOCATION['city'],
+            'latitude': Config.DEFAULT_LOCATION['lat'],
+            'longitude': Config.DEFAULT_LOCATION['lon'],
+            'altitude': 0.0
+        })
+    
+    return observers
+
+def find_satellite_name(satellites: dict, identifier, norad_index: dict = None):
+    """البحث عن قمر بالاسم أو برقم NORAD"""
+    identifier = str(identifier).strip()
+    if identifier in satellites:
+        return identifier
+    if norad_index is not None:
+        return norad_index.get(identifier.lstrip('0'))
+    return None
+
+@app.route('/api/track/batch', methods=['POST'])
+def track_satellites_batch():
+    """تتبع عدة أقمار من عدة مواقع عراقية في طلب واحد"""
+    data = request.json or {}
+    
+    if not data.get('satellites'):
+        return jsonify({
+            'success': False,
+            'error': 'Missing field: satellites',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    if not isinstance(data['satellites'], list):
+        return jsonify({
+            'success': False,
+            'error': 'satellites يجب أن تكون قائمة أسماء أو أرقام NORAD',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    try:
+        observers = resolve_observers(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'بيانات الراصد غير صحيحة: {e}',
+            'developer': Config.DEVELOPER
+        }), 400
+    except Exception as e:
+        # فشل قراءة iraq_stations
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+    
+    if len(data['satellites']) * len(observers) > Config.TRACK_BATCH_MAX_CELLS:
+        return jsonify({
+            'success': False,
+            'error': f'الطلب أكبر من الحد المسموح ({Config.TRACK_BATCH_MAX_CELLS} خلية)',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    try:
+        satellites = tracker.load_tle_from_celestrak(data.get('category', 'stations'))
+        
+        norad_index = None
+        if any(str(identifier).strip() not in satellites for identifier in data['satellites']):
+            norad_index = {record.norad_id.lstrip('0'): name for name, record in satellites.items()}
+        
+        names = []
+        not_found = []
+        for identifier in data['satellites']:
+            name = find_satellite_name(satellites, identifier, norad_index)
+            if name is None:
+                not_found.append(identifier)
+            elif name not in names:
+                names.append(name)
+        
+        t = tracker.time_from_iso(data.get('time'))
+        
+        sat_list = []
+        matrix = []
+        if names:
+            result = tracker.track_many(
+                [satellites[name] for name in names],
+                [(o['latitude'], o['longitude'], o['altitude']) for o in observers],
+                t
+            )
+            
+            for i, name in enumerate(names):
+                iraq_info = IRAQ_IMPORTANT_SATELLITES.get(name, {
+                    'freq': 'غير معروف',
+                    'type': 'أخرى',
+                    'importance': 'منخفضة'
+                })
+                sat_list.append({
+                    'name': name,
+                    'norad_id': satellites[name].norad_id,
+                    'frequency': iraq_info['freq'],
+                    'type': iraq_info['type'],
+                    'importance': iraq_info['importance'],
+                    'iraq_relevant': iraq_info['importance'] != 'منخفضة'
+                })
+                
+                row = []
+                for j in range(len(observers)):
+                    if not result['valid'][i]:
+                        row.append(None)
+                        continue
+                    az = float(result['azimuth'][i, j])
+                    el = float(result['altitude'][i, j])
+                    row.append({
+                        'azimuth': az,
+                        'altitude': el,
+                        'satellite_height': float(result['satellite_height'][i, j]),
+                        'is_visible': el > 0,
+                        'antenna': tracker.get_antenna_orientation(az, el)
+                    })
+                matrix.append(row)
+        
+        for observer in observers:
+            observer['daytime'] = tracker.is_daytime(observer['latitude'], observer['longitude'], t.utc_datetime())
+        
+        return jsonify({
+            'success': True,
+            'developer': Config.DEVELOPER,
+            'development_year': Config.DEVELOPMENT_YEAR,
+            'country': 'العراق',
+            'timestamp': t.utc_datetime().isoformat(),
+            'observers': observers,
+            'satellites': sat_list,
+            'matrix': matrix,
+            'not_found': not_found
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+
+@app.route('/api/track/stream', methods=['GET'])
+def stream_satellite_track():
+    """بث موقع قمر لحظياً (SSE أو NDJSON) من موقع في العراق"""
+    identifier = request.args.get('satellite', 'ISS (ZARYA)')
+    city = request.args.get('city', 'baghdad')
+    location = Config.IRAQ_LOCATIONS.get(city, Config.DEFAULT_LOCATION)
+    stream_format = request.args.get('format', 'sse')
+    
+    try:
+        lat = float(request.args.get('latitude', location['lat']))
+        lon = float(request.args.get('longitude', location['lon']))
+        alt = float(request.args.get('altitude', 0))
+        rate = float(request.args.get('rate', 1))
+        duration = float(request.args.get('duration', Config.STREAM_MAX_SECONDS))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'معاملات غير صحيحة: {e}',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    if not 0 < rate <= Config.STREAM_MAX_RATE or stream_format not in ('sse', 'ndjson'):
+        return jsonify({
+            'success': False,
+            'error': f'rate يجب أن يكون بين 0 و {Config.STREAM_MAX_RATE}، وformat إما sse أو ndjson',
+            'developer': Config.DEVELOPER
+        }), 400
+    duration = min(max(duration, 0), Config.STREAM_MAX_SECONDS)
+    
+    try:
+        satellites = tracker.load_tle_from_celestrak(request.args.get('type', 'stations'))
+        norad_index = {record.norad_id.lstrip('0'): name for name, record in satellites.items()}
+        name = find_satellite_name(satellites, identifier, norad_index)
+        if name is None:
             return jsonify({
                 'success': False,
                 'error': 'القمر غير موجود',
                 'developer': Config.DEVELOPER
             }), 404
         
-        # حساب الموقع
-        sat_data = satellites[data['satellite_name']]
-        position = tracker.calculate_position(
-            sat_data['satellite'],
-            float(data['latitude']),
-            float(data['longitude']),
-            float(data.get('altitude', 0))
-        )
+        samples = tracker.stream_positions(satellites[name], lat, lon, alt, rate, duration)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+    
+    def generate():
+        for sample in samples:
+            payload = json.dumps(sample, ensure_ascii=False)
+            yield f'data: {payload}\n\n' if stream_format == 'sse' else payload + '\n'
+        # نهاية المدة: العميل يعيد الاتصال (EventSource يفعل ذلك تلقائياً)
+        if stream_format == 'sse':
+            yield 'event: end\ndata: {}\n\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if stream_format == 'sse' else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/rotator/track', methods=['GET'])
+def export_rotator_track():
+    """جدول دوّار الهوائي لمرور كامل (سمت/ارتفاع/دوبلر) بصيغة CSV أو ثنائية أو JSON"""
+    identifier = request.args.get('satellite', 'ISS (ZARYA)')
+    city = request.args.get('city', 'baghdad')
+    location = Config.IRAQ_LOCATIONS.get(city, Config.DEFAULT_LOCATION)
+    export_format = request.args.get('format', 'csv')
+    
+    try:
+        lat = float(request.args.get('latitude', location['lat']))
+        lon = float(request.args.get('longitude', location['lon']))
+        alt = float(request.args.get('altitude', 0))
+        rate = float(request.args.get('rate', 1))
+        days = float(request.args.get('days', 1))
+        min_elevation = float(request.args.get('min_elevation', 0))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'معاملات غير صحيحة: {e}',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    if not 0 < rate <= Config.ROTATOR_MAX_RATE or not 0 < days <= 7 or export_format not in ('csv', 'binary', 'json'):
+        return jsonify({
+            'success': False,
+            'error': f'rate بين 0 و {Config.ROTATOR_MAX_RATE}، days بين 0 و 7، وformat إما csv أو binary أو json',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    try:
+        satellites = tracker.load_tle_from_celestrak(request.args.get('type', 'stations'))
+        norad_index = {record.norad_id.lstrip('0'): name for name, record in satellites.items()}
+        name = find_satellite_name(satellites, identifier, norad_index)
+        if name is None:
+            return jsonify({
+                'success': False,
+                'error': 'القمر غير موجود',
+                'developer': Config.DEVELOPER
+            }), 404
         
-        # الحصول على معلومات توجيه الهوائي
-        antenna_info = tracker.get_antenna_orientation(
-            position['azimuth'],
-            position['altitude']
+        # التردد من المعامل frequency (مثل '437.5 MHz') أو من جدول الأقمار المهمة
+        frequency = request.args.get('frequency') or IRAQ_IMPORTANT_SATELLITES.get(name, {}).get('freq')
+        frequency_hz = parse_frequency(frequency)
+        
+        schedule = tracker.rotator_track(
+            satellites[name], lat, lon, alt, rate, days, min_elevation, frequency_hz
         )
+        if schedule is None:
+            return jsonify({
+                'success': False,
+                'error': 'لا يوجد مرور خلال الفترة المطلوبة',
+                'developer': Config.DEVELOPER
+            }), 404
         
-        # إضافة معلومات العراق
-        sat_name = data['satellite_name']
-        iraq_info = IRAQ_IMPORTANT_SATELLITES.get(sat_name, {
-            'freq': 'غير معروف',
-            'type': 'أخرى',
-            'importance': 'منخفضة'
+        track = schedule['track']
+        norad_id = int(satellites[name].norad_id)
+        headers = {
+            'X-Satellite': str(norad_id),
+            'X-Pass-Start': f"{schedule['start']:.3f}",
+            'X-Pass-End': f"{schedule['end']:.3f}",
+            'X-Azimuth-Fits-Rotator': str(schedule['azimuth_fits_rotator']).lower()
+        }
+        
+        if export_format == 'csv':
+            headers['Content-Disposition'] = f'attachment; filename=rotator-{norad_id}.csv'
+            return Response(to_csv(track), mimetype='text/csv', headers=headers)
+        if export_format == 'binary':
+            headers['Content-Disposition'] = f'attachment; filename=rotator-{norad_id}.bin'
+            return Response(to_binary(track, norad_id), mimetype='application/octet-stream', headers=headers)
+        
+        return jsonify({
+            'success': True,
+            'satellite': name,
+            'norad_id': norad_id,
+            'location': {'latitude': lat, 'longitude': lon, 'altitude': alt},
+            'frequency_hz': frequency_hz,
+            'rate': rate,
+            'start': schedule['start'],
+            'end': schedule['end'],
+            'max_elevation': schedule['max_elevation'],
+            'azimuth_fits_rotator': schedule['azimuth_fits_rotator'],
+            'columns': list(track.dtype.names),
+            # التردد غير المعروف (NaN) يصبح null في JSON
+            'samples': [[None if value != value else value for value in row] for row in track.tolist()],
+            'developer': Config.DEVELOPER
         })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+
+@app.route('/api/groundtrack', methods=['GET'])
+def get_ground_track():
+    """المسار الأرضي لقمر ودائرة رؤيته (لخريطة الواجهة بدل استدعاء /api/track متكرراً)"""
+    identifier = request.args.get('satellite', 'ISS (ZARYA)')
+    
+    try:
+        minutes = float(request.args.get('minutes', 90))
+        step = float(request.args.get('step', 30))
+        min_elevation = float(request.args.get('min_elevation', 0))
+        # دقة التبسيط بالدرجات (0 = كل العينات)
+        tolerance = float(request.args.get('simplify', 0))
+        t0 = tracker.time_from_iso(request.args.get('time'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'معاملات غير صحيحة: {e}',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    if minutes <= 0 or step <= 0 or minutes * 60 / step > Config.GROUND_TRACK_MAX_POINTS:
+        return jsonify({
+            'success': False,
+            'error': f'minutes وstep يجب أن يكونا موجبين وعدد العينات لا يتجاوز {Config.GROUND_TRACK_MAX_POINTS}',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    try:
+        satellites = tracker.load_tle_from_celestrak(request.args.get('type', 'stations'))
+        norad_index = {record.norad_id.lstrip('0'): name for name, record in satellites.items()}
+        name = find_satellite_name(satellites, identifier, norad_index)
+        if name is None:
+            return jsonify({
+                'success': False,
+                'error': 'القمر غير موجود',
+                'developer': Config.DEVELOPER
+            }), 404
+        
+        track = tracker.ground_track(satellites[name], minutes, step, min_elevation, tolerance, t0)
         
         return jsonify({
             'success': True,
-            'developer': Config.DEVELOPER,
-            'development_year': Config.DEVELOPMENT_YEAR,
-            'country': 'العراق',
-            'tracking_location': {
-                'city': data.get('city', 'بغداد'),
-                'latitude': data['latitude'],
-                'longitude': data['longitude'],
-                'country': 'العراق'
-            },
-            'position': position,
-            'antenna': antenna_info,
-            'satellite': {
-                'name': sat_name,
-                'frequency': iraq_info['freq'],
-                'type': iraq_info['type'],
-                'importance': iraq_info['importance'],
-                'iraq_relevant': iraq_info['importance'] != 'منخفضة'
-            }
+            'satellite': name,
+            'start': t0.utc_iso(),
+            'minutes': minutes,
+            'step': step,
+            # كل نقطة [خط العرض، خط الطول، ثوانٍ منذ start]، والمقاطع مقسمة عند خط الطول ±180
+            'segments': track['segments'],
+            'points': track['points'],
+            'points_kept': track['kept'],
+            'footprint': track['footprint'],
+            'developer': Config.DEVELOPER
         })
     
     except Exception as e:
@@ -159,6 +614,24 @@ def track_satellite():
             'developer': Config.DEVELOPER
         }), 500
 
+def prediction_entry(sat_name: str, passes: list):
+    """تنبؤات قمر واحد مع معلومات أهميته للعراق"""
+    iraq_info = IRAQ_IMPORTANT_SATELLITES.get(sat_name, {
+        'freq': 'غير معروف',
+        'type': 'أخرى',
+        'importance': 'منخفضة'
+    })
+    
+    return {
+        'satellite': sat_name,
+        'arabic_name': f'قمر {iraq_info["type"]}' if sat_name != 'ISS (ZARYA)' else 'محطة الفضاء الدولية',
+        'passes': passes,
+        'frequency': iraq_info['freq'],
+        'type': iraq_info['type'],
+        'importance': iraq_info['importance'],
+        'iraq_relevant': iraq_info['importance'] != 'منخفضة'
+    }
+
 @app.route('/api/predict', methods=['POST'])
 def predict_passes():
     """تنبؤ بمرور الأقمار فوق العراق"""
@@ -175,47 +648,112 @@ def predict_passes():
         # الأقمار المهمة للعراق
         important_sats = data.get('satellites', list(IRAQ_IMPORTANT_SATELLITES.keys()))
         
-        predictions = []
+        # مهلة الطلب (ثانية) بحد أقصى من الإعدادات؛ الأقمار المتأخرة تُعاد في timed_out
+        timeout = min(float(data.get('timeout', Config.PASS_PREDICT_DEADLINE)), Config.PASS_PREDICT_DEADLINE)
+        selected = [(sat_name, satellites[sat_name]) for sat_name in important_sats if sat_name in satellites]
         
-        for sat_name in important_sats:
-            if sat_name in satellites:
-                passes = tracker.predict_passes(
-                    satellites[sat_name]['satellite'],
-                    user_lat,
-                    user_lon,
-                    days=days
-                )
-                
+        # عدة محطات (stations=all أو قائمة مدن): مسار مداري واحد لكل قمر لجميع المحطات
+        if data.get('stations'):
+            observers = resolve_observers({'stations': data['stations']})
+            observer_points = [(o['latitude'], o['longitude'], o['altitude']) for o in observers]
+        else:
+            observers = None
+            observer_points = [(user_lat, user_lon, 0.0)]
+        
+        # النافذة المغطاة في iraq_passes (بالحد نفسه للارتفاع) تُجاب باستعلام واحد، وإلا الحساب المباشر
+        min_elevation = 10
+        results = tracker.stored_passes([name for name, _ in selected], observer_points, days, min_elevation)
+        if results is not None:
+            timed_out, pruned, source = [], 0, 'precomputed'
+        else:
+            results, timed_out, pruned = tracker.predict_passes_many(
+                selected, observer_points, days=days, min_elevation=min_elevation, timeout=timeout
+            )
+            source = 'live'
+        
+        station_predictions = [[] for _ in observer_points]
+        for sat_name, all_passes in results.items():
+            for predictions, passes in zip(station_predictions, all_passes):
                 if passes:
-                    iraq_info = IRAQ_IMPORTANT_SATELLITES.get(sat_name, {
-                        'freq': 'غير معروف',
-                        'type': 'أخرى',
-                        'importance': 'منخفضة'
-                    })
-                    
-                    predictions.append({
-                        'satellite': sat_name,
-                        'arabic_name': f'قمر {iraq_info["type"]}' if sat_name != 'ISS (ZARYA)' else 'محطة الفضاء الدولية',
-                        'passes': passes,
-                        'frequency': iraq_info['freq'],
-                        'type': iraq_info['type'],
-                        'importance': iraq_info['importance'],
-                        'iraq_relevant': iraq_info['importance'] != 'منخفضة'
-                    })
+                    predictions.append(prediction_entry(sat_name, passes))
         
-        return jsonify({
+        response = {
             'success': True,
             'developer': Config.DEVELOPER,
             'university': Config.UNIVERSITY,
             'year': Config.DEVELOPMENT_YEAR,
-            'predictions': predictions,
+            'complete': not timed_out,
+            'timed_out': timed_out,
+            'pruned': pruned,
+            'source': source
+        }
+        
+        if observers is not None:
+            response['stations'] = [
+                dict(observer, country='العراق', predictions=predictions)
+                for observer, predictions in zip(observers, station_predictions)
+            ]
+            response['note'] = 'تنبؤات مرور الأقمار فوق المحطات العراقية'
+            return jsonify(response)
+        
+        response['predictions'] = station_predictions[0]
+        response['location'] = {
+            'latitude': user_lat,
+            'longitude': user_lon,
+            'city': data.get('city', 'بغداد'),
+            'country': 'العراق'
+        }
+        response['note'] = 'تنبؤات مرور الأقمار فوق الأراضي العراقية'
+        return jsonify(response)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+
+@app.route('/api/overhead', methods=['GET'])
+def get_overhead_satellites():
+    """جميع أقمار الفئة الظاهرة فوق الأفق لموقع في العراق في لحظة معينة"""
+    sat_type = request.args.get('type', 'stations')
+    city = request.args.get('city', 'baghdad')
+    location = Config.IRAQ_LOCATIONS.get(city, Config.DEFAULT_LOCATION)
+    
+    try:
+        lat = float(request.args.get('latitude', location['lat']))
+        lon = float(request.args.get('longitude', location['lon']))
+        alt = float(request.args.get('altitude', 0))
+        min_elevation = float(request.args.get('min_elevation', 0))
+        t = tracker.time_from_iso(request.args.get('time'))
+        
+        satellites = tracker.load_tle_from_celestrak(sat_type)
+        overhead, pruned = tracker.find_overhead(satellites, lat, lon, alt, min_elevation, t)
+        
+        for sat in overhead:
+            iraq_info = IRAQ_IMPORTANT_SATELLITES.get(sat['name'])
+            sat['iraq_relevant'] = iraq_info is not None
+            if iraq_info:
+                sat['frequency'] = iraq_info['freq']
+                sat['type'] = iraq_info['type']
+        
+        return jsonify({
+            'success': True,
+            'developer': Config.DEVELOPER,
+            'country': 'العراق',
+            'category': sat_type,
+            'timestamp': t.utc_datetime().isoformat(),
             'location': {
-                'latitude': user_lat,
-                'longitude': user_lon,
-                'city': data.get('city', 'بغداد'),
+                'city': location['city'] if 'latitude' not in request.args else None,
+                'latitude': lat,
+                'longitude': lon,
                 'country': 'العراق'
             },
-            'note': 'تنبؤات مرور الأقمار فوق الأراضي العراقية'
+            'min_elevation': min_elevation,
+            'total_in_category': len(satellites),
+            'pruned': pruned,
+            'count': len(overhead),
+            'satellites': overhead
         })
     
     except Exception as e:
@@ -225,10 +763,138 @@ def predict_passes():
             'developer': Config.DEVELOPER
         }), 500
 
-@app.route('/api/iraq/info', methods=['GET'])
-def get_iraq_info():
-    """الحصول على معلومات عن نظام التتبع العراقي"""
-    return jsonify({
+@app.route('/api/iraq/coverage', methods=['GET'])
+def get_iraq_coverage():
+    """الأقمار فوق العراق الآن من الفهرس المكاني (نقطة القمر أو دائرة رؤيته)"""
+    sat_type = request.args.get('type', 'stations')
+    mode = request.args.get('mode', 'footprint')
+    
+    try:
+        min_elevation = float(request.args.get('min_elevation', 0))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'معاملات غير صحيحة: {e}',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    if mode not in ('subpoint', 'footprint'):
+        return jsonify({
+            'success': False,
+            'error': 'mode إما subpoint أو footprint',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    try:
+        satellites = tracker.load_tle_from_celestrak(sat_type)
+        covering = tracker.iraq_coverage(satellites, mode, min_elevation)
+        
+        for sat in covering:
+            iraq_info = IRAQ_IMPORTANT_SATELLITES.get(sat['name'])
+            sat['iraq_relevant'] = iraq_info is not None
+            if iraq_info:
+                sat['frequency'] = iraq_info['freq']
+                sat['type'] = iraq_info['type']
+        
+        return jsonify({
+            'success': True,
+            'developer': Config.DEVELOPER,
+            'country': 'العراق',
+            'category': sat_type,
+            'mode': mode,
+            'min_elevation': min_elevation,
+            # المواقع محسوبة خلال آخر ثوانٍ وبانجراف لا يتجاوز هذا الحد
+            'tolerance_degrees': Config.COVERAGE_TOLERANCE_DEGREES,
+            'total_in_category': len(satellites),
+            'count': len(covering),
+            'satellites': covering
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+
+@app.route('/api/conjunctions', methods=['GET'])
+def get_conjunctions():
+    """الاقترابات بين أقمار مستهدفة وبقية أجسام المجموعة (أو كل زوج في المجموعة) خلال فترة قادمة"""
+    sat_type = request.args.get('type', 'active')
+    # target يمكن تكراره (اسم أو رقم NORAD)؛ all=true لفحص كل زوج في المجموعة
+    targets = None if request.args.get('all') == 'true' else request.args.getlist('target') or ['ISS (ZARYA)']
+    
+    try:
+        threshold = float(request.args.get('threshold', 5))
+        hours = float(request.args.get('hours', 24))
+        step = float(request.args.get('step', Config.CONJUNCTION_STEP_SECONDS))
+        t0 = tracker.time_from_iso(request.args.get('time'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'معاملات غير صحيحة: {e}',
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    if not (0 < threshold <= Config.CONJUNCTION_MAX_THRESHOLD_KM and 0 < hours <= Config.CONJUNCTION_MAX_HOURS
+            and 1 <= step <= 120):
+        return jsonify({
+            'success': False,
+            'error': (f'threshold بين 0 و {Config.CONJUNCTION_MAX_THRESHOLD_KM} كم، '
+                      f'hours بين 0 و {Config.CONJUNCTION_MAX_HOURS}، وstep بين 1 و 120 ثانية'),
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    if targets is None and hours > Config.CONJUNCTION_ALL_MAX_HOURS:
+        return jsonify({
+            'success': False,
+            'error': (f'فحص كل زوج محدود بـ {Config.CONJUNCTION_ALL_MAX_HOURS} ساعة عبر الـ API؛ '
+                      f'للفترات الأطول استخدم conjunction.py'),
+            'developer': Config.DEVELOPER
+        }), 400
+    
+    try:
+        satellites = tracker.load_tle_from_celestrak(sat_type)
+        if targets is None and len(satellites) > Config.CONJUNCTION_ALL_MAX_OBJECTS:
+            return jsonify({
+                'success': False,
+                'error': (f'فحص كل زوج محدود بـ {Config.CONJUNCTION_ALL_MAX_OBJECTS} جسم عبر الـ API '
+                          f'(المجموعة {sat_type} فيها {len(satellites)})؛ استخدم conjunction.py'),
+                'developer': Config.DEVELOPER
+            }), 400
+        
+        try:
+            events, stats = tracker.screen_conjunctions(satellites, targets, threshold, hours, step, t0)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'developer': Config.DEVELOPER
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'developer': Config.DEVELOPER,
+            'category': sat_type,
+            'targets': targets,
+            'start': t0.utc_iso(),
+            'hours': hours,
+            'threshold_km': threshold,
+            'screening': stats,
+            'count': len(events),
+            'conjunctions': events
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'developer': Config.DEVELOPER
+        }), 500
+
+def iraq_info_payload():
+    """محتوى /api/iraq/info (ثابت حتى النشر التالي)"""
+    return {
         'success': True,
         'system_name': 'نظام متعقب الأقمار الصناعية العراقي',
         'developer': Config.DEVELOPER,
@@ -245,41 +911,64 @@ def get_iraq_info():
         ],
         'iraq_locations': Config.IRAQ_LOCATIONS,
         'important_satellites': IRAQ_IMPORTANT_SATELLITES
-    })
+    }
 
-@app.route('/api/location/iraq', methods=['GET'])
-def get_iraq_locations():
-    """الحصول على مواقع المدن العراقية"""
-    city = request.args.get('city', 'baghdad')
-    
+STATIC_IRAQ_INFO = StaticResponse(app, iraq_info_payload(), Config.STATIC_CACHE_CONTROL, static_stats)
+
+@app.route('/api/iraq/info', methods=['GET'])
+def get_iraq_info():
+    """الحصول على معلومات عن نظام التتبع العراقي"""
+    return STATIC_IRAQ_INFO.respond()
+
+@app.route('/api/iraq/statistics', methods=['GET'])
+def get_iraq_statistics():
+    """إحصائيات الرصد العراقي من العدادات المجمّعة (محفوظة في الذاكرة لمدة STATS_CACHE_TTL)"""
+    try:
+        return jsonify({
+            'success': True,
+            'statistics': db.statistics.get(),
+            'country': 'العراق',
+            'developer': Config.DEVELOPER
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'developer': Config.DEVELOPER}), 500
+
+def iraq_location_payload(city):
+    """محتوى /api/location/iraq لمدينة، أو قائمة المدن إذا لم تكن معروفة"""
     if city in Config.IRAQ_LOCATIONS:
         location = Config.IRAQ_LOCATIONS[city]
-        return jsonify({
+        return {
             'success': True,
             'location': location,
             'developer': Config.DEVELOPER,
             'message': f'موقع {location["city"]} في العراق'
-        })
+        }
     else:
         # عرض جميع المدن
-        return jsonify({
+        return {
             'success': True,
             'available_cities': Config.IRAQ_LOCATIONS,
             'default': Config.DEFAULT_LOCATION,
             'developer': Config.DEVELOPER
-        })
+        }
 
-@app.route('/api/location', methods=['GET'])
-def get_location():
-    """الحصول على موقع المستخدم - نسخة العراق"""
-    city = request.args.get('city', 'baghdad')
-    
+STATIC_IRAQ_LOCATIONS = StaticVariants(
+    app, iraq_location_payload, Config.IRAQ_LOCATIONS, None, Config.STATIC_CACHE_CONTROL, static_stats
+)
+
+@app.route('/api/location/iraq', methods=['GET'])
+def get_iraq_locations():
+    """الحصول على مواقع المدن العراقية"""
+    return STATIC_IRAQ_LOCATIONS.respond(request.args.get('city', 'baghdad'))
+
+def location_payload(city):
+    """محتوى /api/location لمدينة (بغداد لغير المعروفة)"""
     if city in Config.IRAQ_LOCATIONS:
         location = Config.IRAQ_LOCATIONS[city]
     else:
         location = Config.DEFAULT_LOCATION
     
-    return jsonify({
+    return {
         'success': True,
         'location': {
             'latitude': location['lat'],
@@ -292,7 +981,16 @@ def get_location():
         'development_year': Config.DEVELOPMENT_YEAR,
         'system': 'نظام التتبع الفضائي العراقي',
         'message': 'مرحباً بكم في النظام العراقي لتتبع الأقمار الصناعية'
-    })
+    }
+
+STATIC_LOCATIONS = StaticVariants(
+    app, location_payload, Config.IRAQ_LOCATIONS, None, Config.STATIC_CACHE_CONTROL, static_stats
+)
+
+@app.route('/api/location', methods=['GET'])
+def get_location():
+    """الحصول على موقع المستخدم - نسخة العراق"""
+    return STATIC_LOCATIONS.respond(request.args.get('city', 'baghdad'))
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -307,10 +1005,30 @@ def health_check():
         'version': '1.0.0'
     })
 
-@app.route('/api/developer', methods=['GET'])
-def get_developer_info():
-    """معلومات المطور"""
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """إحصائيات الذاكرة المؤقتة لبيانات الأقمار"""
     return jsonify({
+        'success': True,
+        'tle_catalog': tracker.tle_cache.get_stats(),
+        'celestrak': tracker.celestrak.get_stats(),
+        'passes': tracker.pass_cache.get_stats(),
+        'pass_store': tracker.pass_store.get_stats(),
+        'pass_pool': tracker.pass_pool.get_stats(),
+        'solar': tracker.solar.get_stats(),
+        'live': tracker.live.get_stats(),
+        'chebyshev': tracker.chebyshev.get_stats(),
+        'coverage': tracker.coverage_stats(),
+        'db_writer': db.writer.get_stats(),
+        'statistics': db.statistics.get_stats(),
+        'static_responses': static_stats.get_stats(),
+        'responses': response_cache.get_stats(),
+        'developer': Config.DEVELOPER
+    })
+
+def developer_payload():
+    """محتوى /api/developer (ثابت حتى النشر التالي)"""
+    return {
         'success': True,
         'developer': {
             'name': Config.DEVELOPER,
@@ -330,7 +1048,14 @@ def get_developer_info():
                 'تعزيز القدرات التقنية العراقية'
             ]
         }
-    })
+    }
+
+STATIC_DEVELOPER = StaticResponse(app, developer_payload(), Config.STATIC_CACHE_CONTROL, static_stats)
+
+@app.route('/api/developer', methods=['GET'])
+def get_developer_info():
+    """معلومات المطور"""
+    return STATIC_DEVELOPER.respond()
 
 if __name__ == '__main__':
     print(f"🚀 بدء تشغيل نظام متعقب الأقمار العراقي")
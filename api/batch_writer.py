@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class BufferFullError(Exception):
+    """المخزن المؤقت ممتلئ ولم يفرغ مكان خلال مهلة الانتظار"""
+
+
+class BatchWriter:
+    """كاتب مؤجل: يجمع الصفوف في الذاكرة ويرسلها كإدخال متعدد الصفوف لكل جدول
+
+    التفريغ يحدث عند بلوغ batch_size صفاً أو بعد interval ثانية من أقدم صف منتظر،
+    في خيط خلفي واحد. كل صف يعود بـ Future يكتمل بالصف المحفوظ (أو بخطأ الإدخال)،
+    وعند امتلاء max_pending صفاً ينتظر المُرسل حتى يفرغ مكان (ضغط عكسي). إذا فشلت
+    دفعة تُقسم نصفين وتُعاد حتى يفشل الصف المعيب وحده.
+    insert(table, rows) يرسل الصفوف ويعيد الصفوف المحفوظة بالترتيب نفسه.
+    """
+
+    def __init__(self, insert, batch_size: int = 100, interval: float = 1.0,
+                 max_pending: int = 5000, submit_timeout: float = 5.0):
+        self.insert = insert
+        self.batch_size = max(int(batch_size), 1)
+        self.interval = interval
+        self.max_pending = max(int(max_pending), self.batch_size)
+        self.submit_timeout = submit_timeout
+        # لكل جدول قائمة (صف، Future، زمن الوصول) بترتيب الوصول
+        self._pending = OrderedDict()
+        self._count = 0
+        self._in_flight = 0
+        self._oldest = None
+        self._closed = False
+        self._draining = 0
+        self._thread = None
+        self._condition = threading.Condition()
+        self._stats = {'submitted': 0, 'written': 0, 'failed': 0, 'batches': 0, 'retries': 0, 'waits': 0}
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _enqueue(self, table: str, row: dict) -> Future:
+        future = Future()
+        now = time.monotonic()
+        self._pending.setdefault(table, []).append((row, future, now))
+        self._count += 1
+        self._stats['submitted'] += 1
+        if self._oldest is None:
+            self._oldest = now
+        self._start()
+        self._condition.notify_all()
+        return future
+
+    def submit(self, table: str, row: dict, timeout: float = None) -> Future:
+        """إضافة صف للجدول؛ ينتظر حتى timeout ثانية إن كان المخزن ممتلئاً"""
+        timeout = self.submit_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('الكاتب مغلق')
+            if self._count >= self.max_pending:
+                self._stats['waits'] += 1
+            while self._count >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    raise BufferFullError(f'{self._count} صف بانتظار الكتابة')
+                self._condition.wait(remaining)
+            return self._enqueue(table, row)
+
+    async def write(self, table: str, row: dict):
+        """نسخة async من submit: الانتظار عند الامتلاء وتأكيد الكتابة لا يحجزان حلقة الأحداث"""
+        deadline = time.monotonic() + self.submit_timeout
+        while True:
+            try:
+                future = self.submit(table, row, timeout=0)
+                break
+            except BufferFullError:
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(min(self.interval, 0.05))
+        return await asyncio.wrap_future(future)
+
+    def _take_batch(self):
+        """أخذ دفعة من أول جدول منتظر (حتى batch_size صف)"""
+        table, rows = next(iter(self._pending.items()))
+        batch, rest = rows[:self.batch_size], rows[self.batch_size:]
+        if rest:
+            self._pending[table] = rest
+            self._pending.move_to_end(table)
+        else:
+            del self._pending[table]
+        self._count -= len(batch)
+        self._in_flight += len(batch)
+        # أقدم صف متبقٍ فعلاً (أول صف في كل جدول هو الأقدم فيه)
+        self._oldest = min(rows[0][2] for rows in self._pending.values()) if self._count else None
+        return table, batch
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._count and (self._closed or self._draining or self._count >= self.batch_size
+                                        or time.monotonic() - self._oldest >= self.interval):
+                        break
+                    if self._closed and not self._count:
+                        return
+                    wait = None if not self._count else self.interval - (time.monotonic() - self._oldest)
+                    self._condition.wait(wait)
+                table, batch = self._take_batch()
+            self._flush(table, batch)
+
+    def _insert(self, table: str, rows: list):
+        """(الصفوف المحفوظة بترتيب rows، الخطأ) لطلب إدخال واحد"""
+        try:
+            saved = self.insert(table, rows) or []
+        except Exception as e:
+            return None, e
+        return [saved[index] if index < len(saved) else row for index, row in enumerate(rows)], None
+
+    def _insert_split(self, table: str, rows: list, error: Exception):
+        """نتيجة (المحفوظ، الخطأ) لكل صف بعد فشل rows بالخطأ error، بتنصيف الدفعة وإعادتها"""
+        if len(rows) == 1:
+            return [(None, error)]
+
+        middle = len(rows) // 2
+        halves = [rows[:middle], rows[middle:]]
+        attempts = [self._insert(table, half) for half in halves]
+        with self._condition:
+            self._stats['retries'] += len(halves)
+
+        # فشل النصفين بالخطأ نفسه لا يخص صفاً بعينه (مثل انقطاع القاعدة): لا داعي لتقسيم أكثر
+        if all(e is not None and type(e) is type(error) and str(e) == str(error) for _, e in attempts):
+            return [(None, error)] * len(rows)
+
+        outcomes = []
+        for half, (saved, e) in zip(halves, attempts):
+            if e is None:
+                outcomes += [(row, None) for row in saved]
+            else:
+                outcomes += self._insert_split(table, half, e)
+        return outcomes
+
+    def _flush(self, table: str, batch: list):
+        rows = [row for row, _, _ in batch]
+        saved, error = self._insert(table, rows)
+        if error is None:
+            outcomes = [(row, None) for row in saved]
+        else:
+            outcomes = self._insert_split(table, rows, error)
+
+        failed = 0
+        for (_, future, _), (row, error) in zip(batch, outcomes):
+            if error is not None:
+                failed += 1
+            if future.cancelled():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(row)
+
+        with self._condition:
+            self._in_flight -= len(batch)
+            self._stats['batches'] += 1
+            self._stats['failed'] += failed
+            self._stats['written'] += len(batch) - failed
+            self._condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """تفريغ كل الصفوف المنتظرة الآن والانتظار حتى تُكتب"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            # ما دام _draining موجباً يفرغ الخيط الخلفي الدفعات دون انتظار interval
+            self._draining += 1
+            self._condition.notify_all()
+            try:
+                while self._count or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._draining -= 1
+        return True
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """إيقاف استقبال الصفوف وكتابة المتبقي (يُستدعى عند إيقاف الخادم)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def get_stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pending'] = self._count
+            stats['in_flight'] = self._in_flight
+            stats['batch_size'] = self.batch_size
+            stats['interval'] = self.interval
+            stats['max_pending'] = self.max_pending
+        return stats
@@ -0,0 +1,91 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CelesTrakClient:
+    """جلسة HTTP مشتركة لتنزيل مجموعات TLE مع طلبات شرطية
+
+    الاتصالات تبقى مفتوحة في مجمّع الجلسة بين الطلبات، ويُرسل مع كل طلب ETag
+    و Last-Modified من آخر استجابة للمجموعة. عند الرد 304 تُعاد النتيجة المحللة
+    السابقة نفسها (الكائن ذاته) دون تنزيل أو تحليل، وإلا تُحلل الاستجابة متدفقة
+    سطراً سطراً بدل تحميل النص كاملاً في الذاكرة.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 15.0, pool_size: int = 4, session=None):
+        self.base_url = base_url
+        # (مهلة الاتصال، مهلة القراءة بين دفعتين)
+        self.timeout = (min(timeout, 5.0), timeout)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+        # لكل مجموعة: {etag، last_modified، value}
+        self._validators = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'downloads': 0, 'not_modified': 0, 'errors': 0}
+
+    def fetch(self, group: str, parse):
+        """نتيجة parse(أسطر المجموعة)، أو النتيجة السابقة نفسها إذا لم تتغير المجموعة
+
+        النتيجة (القيمة، هل تغيرت).
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+            cached = self._validators.get(group)
+
+        headers = {}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            with self.session.get(self.base_url, params={'GROUP': group, 'FORMAT': 'tle'},
+                                  headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304 and cached is not None:
+                    # قراءة الجسم الفارغ تعيد الاتصال للمجمّع بدل إغلاقه
+                    response.content
+                    with self._lock:
+                        self._stats['not_modified'] += 1
+                    return cached['value'], False
+
+                response.raise_for_status()
+                lines = (line.decode('utf-8', errors='ignore') for line in response.iter_lines())
+                value = parse(lines)
+                validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'value': value
+                }
+        except requests.RequestException:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+
+        with self._lock:
+            self._stats['downloads'] += 1
+            # المجموعة غير الموجودة ترد بجسم فارغ: لا نحفظ لها شيئاً
+            if value and (validators['etag'] or validators['last_modified']):
+                self._validators[group] = validators
+            else:
+                self._validators.pop(group, None)
+        return value, True
+
+    def forget(self, group: str = None):
+        """نسيان قيم التحقق لمجموعة (أو للجميع) حتى يُعاد التنزيل كاملاً"""
+        with self._lock:
+            if group is None:
+                self._validators.clear()
+            else:
+                self._validators.pop(group, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['conditional_groups'] = sorted(self._validators)
+        return stats
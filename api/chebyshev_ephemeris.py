@@ -0,0 +1,236 @@
+import math
+import threading
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from orbit_math import propagate, teme_to_ecef
+
+DAY_S = 86400.0
+# أصل ثابت لترقيم المقاطع حتى تتطابق حدودها بين الأقمار والعمليات
+SEGMENT_ORIGIN_TT = 2451545.0
+
+
+class ChebyshevEphemeris:
+    """طبقة إفيميريس للأقمار المهمة: كثيرات حدود Chebyshev لموقع TEME على مقاطع زمنية ثابتة
+
+    كل مقطع (10 دقائق افتراضياً) يُطابق بعينات SGP4 عند عُقد Chebyshev، ثم يُفحص
+    عند منتصفات العُقد؛ إذا تجاوز الخطأ tolerance_km تُرفع الدرجة حتى max_degree.
+    حد الخطأ الموثّق إذاً هو أقصى فرق عن SGP4 عند نقاط الفحص (1 متر افتراضياً)،
+    ويُحفظ لكل مقطع ويظهر في الإحصائيات.
+
+    المقاطع تُبنى مسبقاً لنافذة lookahead_seconds أمام الزمن الحالي (في خيط خلفي
+    عند الاقتراب من نهاية المغطّى) وتُحذف بمجرد أن تصبح في الماضي.
+
+    لكل قمر تُحفظ مقاطع أحدث عصر TLE فقط؛ إذا طُلب عصر أقدم (فهرس آخر محمّل لم
+    يتحدث بعد) يُحسب بـ SGP4 مباشرة بدل هدم مقاطع العصر الأحدث وإعادة بنائها.
+    """
+
+    def __init__(self, segment_seconds: float = 600, lookahead_seconds: float = 3600,
+                 tolerance_km: float = 0.001, degree: int = 10, max_degree: int = 30):
+        self.segment_days = segment_seconds / DAY_S
+        self.lookahead_days = lookahead_seconds / DAY_S
+        self.tolerance_km = tolerance_km
+        self.degree = degree
+        self.max_degree = max_degree
+        # satnum -> {'epoch': عصر TLE، 'segments': {رقم المقطع: (المعاملات، الخطأ، صالح)}}
+        self._satellites = {}
+        self._building = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'segments_built': 0,
+            'evictions': 0,
+            'refits': 0,
+            'prefetches': 0,
+            'sgp4_fallbacks': 0,
+            'max_error_km': 0.0
+        }
+
+    def _segment_index(self, tt):
+        return np.floor((np.asarray(tt, dtype=float) - SEGMENT_ORIGIN_TT) / self.segment_days).astype(int)
+
+    def _segment_start(self, index):
+        return SEGMENT_ORIGIN_TT + np.asarray(index) * self.segment_days
+
+    def _fit(self, satrec, ts, indexes: np.ndarray, degree: int):
+        """مطابقة مقاطع متعددة دفعة واحدة: (المعاملات، أقصى خطأ كم، صلاحية) لكل مقطع"""
+        # عُقد Chebyshev (ضعف عدد المعاملات) ومنتصفاتها للفحص، في المجال [-1, 1]
+        count = 2 * (degree + 1)
+        nodes = np.cos(np.pi * (np.arange(count) + 0.5) / count)[::-1]
+        checks = np.cos(np.pi * np.arange(1, count) / count)[::-1]
+
+        starts = self._segment_start(indexes)
+        half = self.segment_days / 2
+
+        def sample(x):
+            tt = (starts[:, np.newaxis] + half * (x + 1)).ravel()
+            errors, r, _ = propagate([satrec], ts.tt_jd(tt))
+            shape = (len(indexes), len(x))
+            return r[0].reshape(shape + (3,)), (errors[0] == 0).reshape(shape).all(axis=1)
+
+        r_nodes, valid = sample(nodes)
+        # كل مقطع × كل محور عمود مستقل في نفس المطابقة
+        y = r_nodes.transpose(1, 0, 2).reshape(count, -1)
+        coefficients = chebyshev.chebfit(nodes, y, degree).reshape(degree + 1, len(indexes), 3)
+
+        r_checks, valid_checks = sample(checks)
+        # fitted بأبعاد (مقطع، محور، نقطة)
+        fitted = chebyshev.chebval(checks, coefficients)
+        residual = np.linalg.norm(fitted.transpose(0, 2, 1) - r_checks, axis=2).max(axis=1)
+        return coefficients.transpose(1, 0, 2), residual, valid & valid_checks
+
+    def _build(self, satrec, ts, indexes):
+        """بناء المقاطع المطلوبة مع رفع الدرجة للمقاطع التي تتجاوز حد الخطأ"""
+        indexes = np.asarray(sorted(indexes), dtype=int)
+        built = {}
+        degree = self.degree
+        pending = indexes
+        while len(pending):
+            coefficients, residual, valid = self._fit(satrec, ts, pending, degree)
+            ok = (residual <= self.tolerance_km) | ~valid | (degree >= self.max_degree)
+            for i in np.flatnonzero(ok):
+                built[int(pending[i])] = (coefficients[i], float(residual[i]), bool(valid[i]))
+            pending = pending[~ok]
+            if len(pending):
+                degree = min(degree + 4, self.max_degree)
+                with self._lock:
+                    self._stats['refits'] += len(pending)
+        return built
+
+    def ensure(self, satrec, ts, start_tt: float, end_tt: float):
+        """مقاطع تغطي [start_tt, end_tt] لهذا القمر: {رقم المقطع: (المعاملات، الخطأ، صالح)}"""
+        epoch = satrec.jdsatepoch + satrec.jdsatepochF
+        wanted = range(int(self._segment_index(start_tt)), int(self._segment_index(end_tt)) + 1)
+
+        with self._lock:
+            entry = self._satellites.get(satrec.satnum)
+            older = entry is not None and entry['epoch'] > epoch
+            if entry is None or entry['epoch'] < epoch:
+                # TLE أحدث لنفس القمر: كل المقاطع القديمة لم تعد صالحة
+                entry = {'epoch': epoch, 'segments': {}}
+                self._satellites[satrec.satnum] = entry
+        if older:
+            # عصر أقدم من المحفوظ: مقاطع مؤقتة لا تُحفظ
+            return self._build(satrec, ts, list(wanted))
+
+        with self._lock:
+            missing = [index for index in wanted if index not in entry['segments']]
+            if not missing:
+                return {index: entry['segments'][index] for index in wanted}
+
+        built = self._build(satrec, ts, missing)
+        with self._lock:
+            entry['segments'].update(built)
+            self._stats['segments_built'] += len(built)
+            errors = [error for _, error, valid in built.values() if valid]
+            if errors:
+                self._stats['max_error_km'] = max(self._stats['max_error_km'], max(errors))
+            # نأخذ نسخة المقاطع المطلوبة تحت القفل نفسه حتى لا يحذفها evict قبل استخدامها
+            return {index: entry['segments'].get(index, built.get(index)) for index in wanted}
+
+    def evict(self, before_tt: float):
+        """حذف المقاطع التي انتهت قبل before_tt"""
+        current = int(self._segment_index(before_tt))
+        with self._lock:
+            for entry in self._satellites.values():
+                past = [index for index in entry['segments'] if index < current]
+                for index in past:
+                    del entry['segments'][index]
+                self._stats['evictions'] += len(past)
+
+    def _prefetch(self, satrec, ts, now_tt: float):
+        try:
+            self.ensure(satrec, ts, now_tt, now_tt + self.lookahead_days)
+            self.evict(now_tt)
+        finally:
+            with self._lock:
+                self._building.discard(satrec.satnum)
+
+    def _scalar_position(self, satrec, ts, tt: float):
+        """المسار السريع لزمن واحد: مقطع من القاموس مباشرة وقاعدة Chebyshev بحساب عادي"""
+        index = math.floor((tt - SEGMENT_ORIGIN_TT) / self.segment_days)
+        horizon = math.floor((tt + self.lookahead_days / 2 - SEGMENT_ORIGIN_TT) / self.segment_days)
+        epoch = satrec.jdsatepoch + satrec.jdsatepochF
+
+        with self._lock:
+            entry = self._satellites.get(satrec.satnum)
+            segment = None
+            if entry is not None and entry['epoch'] == epoch:
+                segment = entry['segments'].get(index)
+            older = entry is not None and entry['epoch'] > epoch
+        if older:
+            return self._sgp4_position(satrec, ts, tt)
+        if segment is None:
+            segment = self.ensure(satrec, ts, tt, tt)[index]
+
+        self._maybe_prefetch(satrec, ts, tt, horizon, 1)
+
+        coefficients, _, segment_valid = segment
+        x = 2 * (tt - SEGMENT_ORIGIN_TT - index * self.segment_days) / self.segment_days - 1
+        basis = [1.0, x]
+        for _ in range(len(coefficients) - 2):
+            basis.append(2 * x * basis[-1] - basis[-2])
+        return np.dot(basis, coefficients)[np.newaxis], np.array([segment_valid])
+
+    def _sgp4_position(self, satrec, ts, tt):
+        """موقع TEME مباشرة من SGP4 (لعصر TLE أقدم من المقاطع المحفوظة)"""
+        with self._lock:
+            self._stats['sgp4_fallbacks'] += 1
+        errors, r, _ = propagate([satrec], ts.tt_jd(np.atleast_1d(tt)))
+        return r[0], errors[0] == 0
+
+    def _is_older_epoch(self, satrec):
+        with self._lock:
+            entry = self._satellites.get(satrec.satnum)
+            return entry is not None and entry['epoch'] > satrec.jdsatepoch + satrec.jdsatepochF
+
+    def _maybe_prefetch(self, satrec, ts, tt: float, horizon: int, count: int):
+        """بناء مسبق في الخلفية عندما يقترب الزمن من نهاية المغطّى"""
+        with self._lock:
+            self._stats['hits'] += count
+            entry = self._satellites[satrec.satnum]
+            start_prefetch = horizon not in entry['segments'] and satrec.satnum not in self._building
+            if start_prefetch:
+                self._building.add(satrec.satnum)
+                self._stats['prefetches'] += 1
+        if start_prefetch:
+            threading.Thread(target=self._prefetch, args=(satrec, ts, tt), daemon=True).start()
+
+    def teme_position(self, satrec, ts, tt):
+        """موقع TEME (كم) لمصفوفة أزمنة TT بتقييم كثيرات الحدود، مع مؤشر الصلاحية"""
+        if np.ndim(tt) == 0:
+            return self._scalar_position(satrec, ts, float(tt))
+
+        tt = np.atleast_1d(np.asarray(tt, dtype=float))
+        if self._is_older_epoch(satrec):
+            return self._sgp4_position(satrec, ts, tt)
+        segments = self.ensure(satrec, ts, tt.min(), tt.max())
+        horizon = int(self._segment_index(tt.max() + self.lookahead_days / 2))
+        self._maybe_prefetch(satrec, ts, float(tt.min()), horizon, len(tt))
+
+        indexes = self._segment_index(tt)
+        position = np.empty(tt.shape + (3,))
+        valid = np.empty(tt.shape, dtype=bool)
+        for index in np.unique(indexes):
+            coefficients, _, segment_valid = segments[int(index)]
+            mask = indexes == index
+            x = 2 * (tt[mask] - self._segment_start(index)) / self.segment_days - 1
+            position[mask] = chebyshev.chebval(x, coefficients).T
+            valid[mask] = segment_valid
+        return position, valid
+
+    def ecef_position(self, satrec, t):
+        """موقع القمر في الإطار الأرضي الثابت (كم) لزمن skyfield (مفرد أو مصفوفة)"""
+        position, valid = self.teme_position(satrec, t.ts, t.tt)
+        r_ecef, _ = teme_to_ecef(position, None, t)
+        return r_ecef, valid
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['satellites'] = len(self._satellites)
+            stats['segments'] = sum(len(entry['segments']) for entry in self._satellites.values())
+            stats['segment_seconds'] = self.segment_days * DAY_S
+            stats['tolerance_km'] = self.tolerance_km
+        return stats
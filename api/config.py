@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,14 +9,122 @@ class Config:
     SUPABASE_URL = os.getenv('SUPABASE_URL')
     SUPABASE_KEY = os.getenv('SUPABASE_KEY')
     
+    # الكتابة المؤجلة إلى Supabase: حجم الدفعة، أقصى انتظار قبل التفريغ (ثانية)،
+    # أقصى عدد صفوف منتظرة، ومدة انتظار المُرسل عند الامتلاء (ثانية)
+    DB_BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', '100'))
+    DB_FLUSH_INTERVAL = float(os.getenv('DB_FLUSH_INTERVAL', '1.0'))
+    DB_MAX_PENDING = int(os.getenv('DB_MAX_PENDING', '5000'))
+    DB_SUBMIT_TIMEOUT = float(os.getenv('DB_SUBMIT_TIMEOUT', '5'))
+    
+    # مدة صلاحية الإحصائيات المحفوظة في الذاكرة (ثانية)
+    STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', '60'))
+    
+    # ترويسة Cache-Control لمسارات المعلومات الثابتة (/api/iraq/info، /api/developer، /api/location):
+    # المتصفح يعيد التحقق بـ ETag بعد max-age، وحافة Vercel تحتفظ بها s-maxage (تُمسح مع كل نشر)
+    STATIC_CACHE_CONTROL = os.getenv(
+        'STATIC_CACHE_CONTROL',
+        'public, max-age=300, s-maxage=86400, stale-while-revalidate=86400'
+    )
+    
+    # ذاكرة الاستجابات (response_cache.py): طول الفترة الزمنية لـ /api/track (1 إلى 5 ثوانٍ)
+    # ولـ /api/satellites (ثانية)، دقة تقريب موقع الراصد (درجة)، وحدود عدد المدخلات والبايتات
+    RESPONSE_CACHE_TRACK_SECONDS = min(max(float(os.getenv('RESPONSE_CACHE_TRACK_SECONDS', '1')), 1.0), 5.0)
+    RESPONSE_CACHE_SATELLITES_SECONDS = float(os.getenv('RESPONSE_CACHE_SATELLITES_SECONDS', '300'))
+    RESPONSE_CACHE_GRID_DEGREES = float(os.getenv('RESPONSE_CACHE_GRID_DEGREES', '0.01'))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2048'))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+    
     # App Configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'satellite-tracker-iraq-2026')
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
     
     # API Configuration
     CELESTRAK_URL = "https://celestrak.org/NORAD/elements/gp.php"
+    # مهلة طلبات CelesTrak (ثانية) وعدد الاتصالات المفتوحة في مجمّع الجلسة
+    CELESTRAK_TIMEOUT = float(os.getenv('CELESTRAK_TIMEOUT', '15'))
+    CELESTRAK_POOL_SIZE = int(os.getenv('CELESTRAK_POOL_SIZE', '4'))
     N2YO_API_KEY = os.getenv('N2YO_API_KEY', '')
     
+    # TLE Cache Configuration (بالثواني)
+    TLE_CACHE_TTL = int(os.getenv('TLE_CACHE_TTL', '3600'))
+    # أقصى عدد فئات TLE في الذاكرة (الفئة من معامل type في الطلب)
+    TLE_CACHE_MAX_CATEGORIES = int(os.getenv('TLE_CACHE_MAX_CATEGORIES', '32'))
+    
+    # ذاكرة تنبؤات المرور: عدد المدخلات ودقة تقريب موقع الراصد (درجة)
+    PASS_CACHE_SIZE = int(os.getenv('PASS_CACHE_SIZE', '512'))
+    PASS_CACHE_GRID_DEGREES = float(os.getenv('PASS_CACHE_GRID_DEGREES', '0.01'))
+    
+    # عدد عمليات تنبؤ المرور المتوازية (0 أو 1 = تنفيذ تسلسلي) والمهلة القصوى للطلب (ثانية)
+    PASS_POOL_WORKERS = int(os.getenv('PASS_POOL_WORKERS', '0'))
+    PASS_POOL_START_METHOD = os.getenv('PASS_POOL_START_METHOD', 'spawn')
+    PASS_PREDICT_DEADLINE = float(os.getenv('PASS_PREDICT_DEADLINE', '20'))
+    
+    # المرورات المحسوبة مسبقاً في iraq_passes (pass_store.py): طول النافذة (يوم)، حد الارتفاع،
+    # فئات Celestrak للبحث عن TLE غير المخزن، ومدة حفظ جدول التغطية في الذاكرة (ثانية)
+    # مفعّلة افتراضياً فقط عند ضبط Supabase
+    PASS_STORE_ENABLED = os.getenv(
+        'PASS_STORE_ENABLED', 'true' if SUPABASE_URL and SUPABASE_KEY else 'false'
+    ).lower() == 'true'
+    PASS_PRECOMPUTE_DAYS = float(os.getenv('PASS_PRECOMPUTE_DAYS', '7'))
+    PASS_PRECOMPUTE_MIN_ELEVATION = float(os.getenv('PASS_PRECOMPUTE_MIN_ELEVATION', '10'))
+    PASS_PRECOMPUTE_GROUPS = os.getenv('PASS_PRECOMPUTE_GROUPS', 'stations,weather,geo').split(',')
+    PASS_STORE_COVERAGE_TTL = float(os.getenv('PASS_STORE_COVERAGE_TTL', '60'))
+    # أقصى فرق (درجة) بين موقع الطلب وموقع محطة في iraq_stations لاعتبارهما المحطة نفسها
+    PASS_STORE_MATCH_DEGREES = float(os.getenv('PASS_STORE_MATCH_DEGREES', '0.01'))
+    
+    # جداول الشروق والغروب: عدد المدخلات ودقة تقريب الموقع (درجة)
+    SOLAR_CACHE_SIZE = int(os.getenv('SOLAR_CACHE_SIZE', '1024'))
+    SOLAR_GRID_DEGREES = float(os.getenv('SOLAR_GRID_DEGREES', '0.1'))
+    
+    # البث اللحظي للمواقع: طول نافذة المسار المحسوب مسبقاً، أقصى معدل (عينة/ثانية)،
+    # أقصى مدة للاتصال الواحد (ثانية)، ودقة تقريب موقع الراصد (درجة)
+    STREAM_WINDOW_SECONDS = float(os.getenv('STREAM_WINDOW_SECONDS', '600'))
+    STREAM_MAX_RATE = float(os.getenv('STREAM_MAX_RATE', '10'))
+    STREAM_MAX_SECONDS = float(os.getenv('STREAM_MAX_SECONDS', '300'))
+    STREAM_GRID_DEGREES = float(os.getenv('STREAM_GRID_DEGREES', '0.01'))
+    
+    # مقاطع Chebyshev للأقمار المهمة: طول المقطع، مدى البناء المسبق (ثانية)، وحد الخطأ (كم)
+    CHEBYSHEV_SEGMENT_SECONDS = float(os.getenv('CHEBYSHEV_SEGMENT_SECONDS', '600'))
+    CHEBYSHEV_LOOKAHEAD_SECONDS = float(os.getenv('CHEBYSHEV_LOOKAHEAD_SECONDS', '3600'))
+    CHEBYSHEV_TOLERANCE_KM = float(os.getenv('CHEBYSHEV_TOLERANCE_KM', '0.001'))
+    
+    # جدول دوّار الهوائي: أقصى معدل عينات (عينة/ثانية)، مدى السمت الميكانيكي (درجة)،
+    # وأقصى مدة للجدول الواحد (ثانية) للأقمار الثابتة التي لا تغرب
+    ROTATOR_MAX_RATE = float(os.getenv('ROTATOR_MAX_RATE', '10'))
+    ROTATOR_MAX_AZIMUTH = float(os.getenv('ROTATOR_MAX_AZIMUTH', '450'))
+    ROTATOR_MAX_SECONDS = float(os.getenv('ROTATOR_MAX_SECONDS', '1800'))
+    
+    # المسار الأرضي: أقصى عدد عينات للطلب الواحد (مدة ÷ خطوة)
+    GROUND_TRACK_MAX_POINTS = int(os.getenv('GROUND_TRACK_MAX_POINTS', '20000'))
+    
+    # الفهرس المكاني لتغطية العراق: حجم خلية الشبكة (درجة)، أقل فترة تحديث (ثانية)،
+    # وأقصى انجراف مسموح لنقطة القمر بين تحديثين (درجة)
+    COVERAGE_CELL_DEGREES = float(os.getenv('COVERAGE_CELL_DEGREES', '1.0'))
+    COVERAGE_REFRESH_SECONDS = float(os.getenv('COVERAGE_REFRESH_SECONDS', '5'))
+    COVERAGE_TOLERANCE_DEGREES = float(os.getenv('COVERAGE_TOLERANCE_DEGREES', '0.5'))
+    
+    # فحص الاقتراب: خطوة الشبكة الزمنية (ثانية)، أطول نافذة (ساعة)، وأكبر مسافة اقتراب (كم)
+    CONJUNCTION_STEP_SECONDS = float(os.getenv('CONJUNCTION_STEP_SECONDS', '20'))
+    CONJUNCTION_MAX_HOURS = float(os.getenv('CONJUNCTION_MAX_HOURS', '72'))
+    CONJUNCTION_MAX_THRESHOLD_KM = float(os.getenv('CONJUNCTION_MAX_THRESHOLD_KM', '50'))
+    # فحص كل زوج (all=true) عبر HTTP: أطول فترة (ساعة) وأكبر عدد أجسام؛ ما فوقهما من conjunction.py فقط
+    CONJUNCTION_ALL_MAX_HOURS = float(os.getenv('CONJUNCTION_ALL_MAX_HOURS', '1'))
+    CONJUNCTION_ALL_MAX_OBJECTS = int(os.getenv('CONJUNCTION_ALL_MAX_OBJECTS', '500'))
+    
+    # مصدر فهارس TLE: celestrak، أو database (جدول satellites بعد tle_ingest.py مع الرجوع لـ Celestrak)
+    TLE_SOURCE = os.getenv('TLE_SOURCE', 'celestrak')
+    # أقصى عمر (ساعة) لأحدث حقبة في فئة من قاعدة البيانات قبل الرجوع لـ Celestrak (توقف مهمة الإدخال)
+    TLE_DATABASE_MAX_AGE_HOURS = float(os.getenv('TLE_DATABASE_MAX_AGE_HOURS', '48'))
+    # عدد الصفوف في كل طلب upsert أو استعلام أثناء إدخال الفهارس
+    TLE_INGEST_BATCH_SIZE = int(os.getenv('TLE_INGEST_BATCH_SIZE', '500'))
+    
+    # مجلد لقطات TLE المحلية (فارغ = تعطيل اللقطات). الافتراضي تحت مجلد النظام المؤقت
+    # القابل للكتابة، وعلى Vercel لا يبقى إلا ما دامت النسخة نفسها حية (لا ينجو من التشغيل البارد)
+    TLE_SNAPSHOT_DIR = os.getenv(
+        'TLE_SNAPSHOT_DIR',
+        os.path.join(tempfile.gettempdir(), 'iraq-tle-snapshots')
+    )
+    
     # Iraq Default Locations
     IRAQ_LOCATIONS = {
         'baghdad': {'lat': 33.3128, 'lon': 44.3615, 'city': 'بغداد'},
@@ -28,6 +137,30 @@ class Config:
     
     DEFAULT_LOCATION = IRAQ_LOCATIONS['baghdad']
     
+    # حدود العراق التقريبية (lat, lon) باتجاه عقارب الساعة من المثلث الحدودي مع سوريا وتركيا
+    IRAQ_BOUNDARY = [
+        (37.11, 42.36), (37.33, 43.30), (37.38, 44.05), (37.15, 44.79), (36.66, 45.05),
+        (36.00, 45.36), (35.62, 46.00), (35.09, 46.15), (34.55, 45.65), (33.97, 45.43),
+        (33.10, 45.95), (32.47, 47.33), (31.71, 47.85), (30.98, 47.68), (30.99, 48.00),
+        (30.45, 48.02), (29.93, 48.57), (30.03, 47.95), (30.10, 47.20), (29.10, 46.55),
+        (29.18, 44.70), (31.10, 42.08), (32.16, 39.30), (33.37, 38.79), (34.42, 40.99),
+        (35.63, 41.38), (36.36, 41.29), (36.80, 42.10)
+    ]
+    
+    # الحد الأقصى لخلايا طلب التتبع المجمّع (أقمار × رواصد)
+    TRACK_BATCH_MAX_CELLS = int(os.getenv('TRACK_BATCH_MAX_CELLS', '5000'))
+    
+    # الأقمار المهمة للعراق (تُحسب مواقعها من مقاطع Chebyshev محسوبة مسبقاً)
+    IRAQ_IMPORTANT_SATELLITES = {
+        'NOAA 19': {'freq': '137.100 MHz', 'type': 'طقس', 'importance': 'عالية'},
+        'NOAA 18': {'freq': '137.9125 MHz', 'type': 'طقس', 'importance': 'عالية'},
+        'ISS (ZARYA)': {'freq': '145.800 MHz', 'type': 'محطة فضائية', 'importance': 'متوسطة'},
+        'METEOR M2': {'freq': '137.100 MHz', 'type': 'طقس', 'importance': 'عالية'},
+        'SAUDISAT 1C': {'freq': '145.850 MHz', 'type': 'اتصالات', 'importance': 'متوسطة'},
+        'TÜRKSAT 3A': {'freq': '11767 MHz', 'type': 'اتصالات', 'importance': 'متوسطة'},
+        'IRAQ-SAT 1': {'freq': '11958 MHz', 'type': 'اتصالات', 'importance': 'عالية جداً'}
+    }
+    
     # Iraqi Satellites Info
     IRAQI_SATELLITES = {
         'IRAQ-SAT1': {
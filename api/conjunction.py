@@ -0,0 +1,299 @@
+"""فحص الاقتراب بين أجسام فهرس TLE (conjunction screening)
+
+مثال: كل الأجسام التي تقترب أقل من 5 كم من محطة الفضاء خلال 24 ساعة:
+
+    python conjunction.py --group active --target "ISS (ZARYA)" --threshold 5 --hours 24
+
+أو من ملف TLE محلي بدل Celestrak: --tle catalog.txt. بدون --target يُفحص الفهرس كله
+(كل زوج من الأجسام).
+"""
+import argparse
+
+import numpy as np
+from sgp4.api import SatrecArray
+
+DAY_S = 86400.0
+UNIX_EPOCH_JD = 2440587.5
+
+# أقصى سرعة نسبية بين جسمين حول الأرض (كم/ث، تصادم رأسي في مدار منخفض) وأقصى تسارع
+# نسبي (كم/ث²، ضعف جاذبية السطح)؛ منهما يُحسب هامش الفحص بين عينتين زمنيتين
+MAX_RELATIVE_SPEED_KM_S = 16.0
+MAX_RELATIVE_ACCEL_KM_S2 = 0.02
+# هامش تغير الأوج والحضيض خلال نافذة الفحص (سحب الغلاف الجوي)
+SHELL_MARGIN_KM = 25.0
+
+# الخلايا المجاورة "الأمامية" فقط (13 من 26) حتى لا يظهر كل زوج مرتين
+FORWARD_OFFSETS = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+def screening_pad(threshold_km: float, step_seconds: float):
+    """مسافة الفحص عند العينات: أي اقتراب أقل من threshold_km بين عينتين يظهر فيها حتماً"""
+    half = step_seconds / 2
+    return threshold_km + MAX_RELATIVE_SPEED_KM_S * half + MAX_RELATIVE_ACCEL_KM_S2 * half ** 2
+
+
+def radial_bounds(satrecs: list):
+    """نصف قطر الحضيض والأوج (كم) لكل جسم"""
+    radius = np.array([satrec.radiusearthkm for satrec in satrecs])
+    perigee = (1 + np.array([satrec.altp for satrec in satrecs])) * radius
+    apogee = (1 + np.array([satrec.alta for satrec in satrecs])) * radius
+    return perigee, apogee
+
+
+def _expand(source, lo, hi):
+    """كل الأزواج (source[n], m) لكل m في [lo[n], hi[n]) بدون حلقة بايثون"""
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    first = np.repeat(source, counts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    second = np.repeat(lo - starts, counts) + np.arange(total)
+    return first, second
+
+
+def hash_pairs(cells: np.ndarray, groups: np.ndarray):
+    """أزواج المدخلات في نفس الخلية أو خلايا متجاورة وبنفس المجموعة (الخطوة الزمنية)
+
+    cells أرقام خلايا صحيحة بأبعاد E×3 وgroups رقم المجموعة لكل مدخل. النتيجة
+    فهارس المدخلات (a, b). الفرز يتم مرة واحدة لكل المجموعات معاً، والبحث عن
+    الجيران على مستوى الخلايا المشغولة ثم يُوسَّع إلى أزواج مدخلاتها.
+    """
+    low = cells.min(axis=0) - 1
+    span = cells.max(axis=0) - low + 2
+    cx, cy, cz = (cells - low).T
+    keys = ((groups * span[0] + cx) * span[1] + cy) * span[2] + cz
+
+    order = np.argsort(keys, kind='stable')
+    occupied, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    ends = starts + counts
+
+    # نفس الخلية: كل مدخل مع المدخلات التي تليه في خليته
+    firsts, seconds = [], []
+    positions = np.arange(len(keys))
+    first, second = _expand(positions, positions + 1, np.repeat(ends, counts))
+    firsts.append(first)
+    seconds.append(second)
+
+    for dx, dy, dz in FORWARD_OFFSETS:
+        neighbor = occupied + (dx * span[1] + dy) * span[2] + dz
+        found = np.minimum(np.searchsorted(occupied, neighbor), len(occupied) - 1)
+        cell = np.flatnonzero(occupied[found] == neighbor)
+        other = found[cell]
+        # كل مدخل في الخلية × كل مدخل في الخلية المجاورة
+        pair, entry = _expand(np.arange(len(cell)), starts[cell], ends[cell])
+        first, second = _expand(entry, starts[other][pair], ends[other][pair])
+        firsts.append(first)
+        seconds.append(second)
+
+    return order[np.concatenate(firsts)], order[np.concatenate(seconds)]
+
+
+def _broad_phase(r, valid, pad: float, primaries):
+    """المرشحون في دفعة خطوات: (i, j, الخطوة داخل الدفعة، المسافة) لكل زوج أقرب من pad"""
+    if primaries is not None:
+        found = []
+        for n, p in enumerate(primaries):
+            distance = np.linalg.norm(r - r[p], axis=-1)
+            mask = valid & valid[p] & (distance <= pad)
+            mask[p] = False
+            # زوج بين هدفين يُعدّ مرة واحدة فقط
+            mask[primaries[:n]] = False
+            j, k = np.nonzero(mask)
+            found.append((np.full(len(j), p), j, k, distance[j, k]))
+        return [np.concatenate(column) for column in zip(*found)]
+
+    objects, steps = np.nonzero(valid)
+    points = r[objects, steps]
+    a, b = hash_pairs(np.floor(points / pad).astype(np.int64), steps)
+    distance = np.linalg.norm(points[a] - points[b], axis=-1)
+    close = distance <= pad
+    i, j = objects[a[close]], objects[b[close]]
+    return np.minimum(i, j), np.maximum(i, j), steps[a[close]], distance[close]
+
+
+def _local_minima(i, j, k, d):
+    """فهارس العينات التي تكون فيها مسافة الزوج قيمة صغرى محلية بين خطواته المتتالية"""
+    order = np.lexsort((k, j, i))
+    i, j, k, d = i[order], j[order], k[order], d[order]
+    same_prev = np.zeros(len(i), dtype=bool)
+    same_prev[1:] = (i[1:] == i[:-1]) & (j[1:] == j[:-1]) & (k[1:] == k[:-1] + 1)
+    previous = np.where(same_prev, np.roll(d, 1), np.inf)
+    same_next = np.zeros(len(i), dtype=bool)
+    same_next[:-1] = same_prev[1:]
+    following = np.where(same_next, np.roll(d, -1), np.inf)
+    return order[(d <= previous) & (d < following)]
+
+
+def _evaluate(satrecs: list, objects: np.ndarray, jd: float, fr: np.ndarray):
+    """موقع وسرعة كل (جسم، زمن) في قائمة: استدعاء sgp4_array واحد لكل جسم مع كل أزمنته"""
+    r = np.empty((len(objects), 3))
+    v = np.empty((len(objects), 3))
+    ok = np.empty(len(objects), dtype=bool)
+    order = np.argsort(objects, kind='stable')
+    unique, starts = np.unique(objects[order], return_index=True)
+    for obj, group in zip(unique.tolist(), np.split(order, starts[1:])):
+        errors, r[group], v[group] = satrecs[obj].sgp4_array(np.full(len(group), jd), fr[group])
+        ok[group] = errors == 0
+    return r, v, ok
+
+
+def linear_approach(dr, dv, limit: float):
+    """أقرب اقتراب بافتراض حركة نسبية خطية: (الإزاحة الزمنية ث مقيدة بـ ±limit، المسافة كم)"""
+    speed2 = np.einsum('ij,ij->i', dv, dv)
+    closing = np.einsum('ij,ij->i', dr, dv)
+    tau = np.clip(-closing / np.where(speed2 > 0, speed2, 1.0), -limit, limit)
+    return tau, np.linalg.norm(dr + dv * tau[:, np.newaxis], axis=1)
+
+
+def refine(satrecs: list, i, j, jd: float, fr, limit: float, iterations: int = 6,
+           tolerance_seconds: float = 1e-3):
+    """تضييق أزمنة أقرب اقتراب لكل الأزواج معاً بخطوات نيوتن على dr·dv = 0
+
+    النتيجة (fr، المسافة كم، السرعة النسبية كم/ث، صالح) لكل زوج.
+    """
+    fr = np.array(fr, dtype=float)
+    origin = fr.copy()
+    for _ in range(iterations):
+        r_a, v_a, ok_a = _evaluate(satrecs, i, jd, fr)
+        r_b, v_b, ok_b = _evaluate(satrecs, j, jd, fr)
+        tau, _ = linear_approach(r_a - r_b, v_a - v_b, limit)
+        # البقاء قرب العينة الأصلية حتى لا ينتقل الزوج إلى اقتراب آخر
+        fr = np.clip(fr + tau / DAY_S, origin - limit / DAY_S, origin + limit / DAY_S)
+        if np.all(np.abs(tau) < tolerance_seconds):
+            break
+
+    r_a, v_a, ok_a = _evaluate(satrecs, i, jd, fr)
+    r_b, v_b, ok_b = _evaluate(satrecs, j, jd, fr)
+    miss = np.linalg.norm(r_a - r_b, axis=1)
+    speed = np.linalg.norm(v_a - v_b, axis=1)
+    return fr, miss, speed, ok_a & ok_b
+
+
+def screen(satrecs: list, jd: float, fr: float, duration_days: float, threshold_km: float,
+           primaries: list = None, step_seconds: float = 20, chunk_steps: int = 90):
+    """كل الاقترابات الأقل من threshold_km خلال duration_days بدءاً من (jd, fr) بتوقيت UTC
+
+    primaries فهارس الأجسام المستهدفة في satrecs (None = كل زوج في الفهرس).
+    المراحل:
+    - تصفية الأغلفة الشعاعية (للأهداف فقط).
+    - نشر SGP4 مجمّع على شبكة زمنية على دفعات.
+    - فحص أولي عند كل خطوة بهامش screening_pad (مسافة إلى الهدف، أو تقسيم
+      مكاني للفهرس كله)، ثم تقدير خطي لأقرب اقتراب من السرعات يستبعد ما يبقى بعيداً.
+    - تضييق زمن أقرب اقتراب لكل قيمة صغرى محلية.
+
+    النتيجة (الأحداث مرتبة بالمسافة، إحصائيات). كل حدث قاموس فيه i وj (فهرسان
+    في satrecs) وtca (زمن Unix) وmiss_km وrelative_speed.
+    """
+    pad = screening_pad(threshold_km, step_seconds)
+    # خطأ التقدير الخطي خلال خطوة كاملة بسبب التسارع النسبي
+    linear_margin = MAX_RELATIVE_ACCEL_KM_S2 * step_seconds ** 2 / 2
+    indexes = np.arange(len(satrecs))
+    local_primaries = None
+    if primaries is not None:
+        # جسم لا يتقاطع غلافه الشعاعي مع غلاف أي هدف لا يمكن أن يقترب منه
+        perigee, apogee = radial_bounds(satrecs)
+        keep = np.zeros(len(satrecs), dtype=bool)
+        for p in primaries:
+            keep |= ((perigee - SHELL_MARGIN_KM <= apogee[p] + threshold_km)
+                     & (perigee[p] - SHELL_MARGIN_KM <= apogee + threshold_km))
+        keep[primaries] = True
+        indexes = np.flatnonzero(keep)
+        local_primaries = np.searchsorted(indexes, primaries)
+
+    subset = [satrecs[i] for i in indexes]
+    satrec_array = SatrecArray(subset)
+    step_days = step_seconds / DAY_S
+    total_steps = int(np.floor(duration_days / step_days)) + 1
+
+    candidates = []
+    broad = 0
+    for first in range(0, total_steps, chunk_steps):
+        steps = np.arange(first, min(first + chunk_steps, total_steps))
+        errors, r, v = satrec_array.sgp4(np.full(len(steps), jd), fr + steps * step_days)
+        i, j, k, _ = _broad_phase(r, errors == 0, pad, local_primaries)
+        broad += len(i)
+        tau, linear = linear_approach(r[i, k] - r[j, k], v[i, k] - v[j, k], step_seconds)
+        close = linear <= threshold_km + linear_margin
+        candidates.append((i[close], j[close], k[close] + first, linear[close], tau[close]))
+
+    i, j, k, linear, tau = [np.concatenate(column) for column in zip(*candidates)]
+    stats = {
+        'objects': len(satrecs),
+        'screened': len(subset),
+        'steps': total_steps,
+        'pad_km': pad,
+        'candidates': int(broad),
+        'refined': 0
+    }
+    if not len(i):
+        return [], stats
+
+    minima = _local_minima(i, j, k, linear)
+    i, j, k, tau = i[minima], j[minima], k[minima], tau[minima]
+    stats['refined'] = int(len(i))
+
+    tca, miss, speed, ok = refine(subset, i, j, jd, fr + k * step_days + tau / DAY_S, step_seconds)
+    # اقتراب تقع قمته خارج النافذة (قرب طرفيها) ليس ضمنها
+    inside = (tca >= fr) & (tca <= fr + duration_days)
+    hit = np.flatnonzero(ok & inside & (miss <= threshold_km))
+
+    events = []
+    last = {}
+    for n in hit[np.lexsort((tca[hit], j[hit], i[hit]))].tolist():
+        event = {
+            'i': int(indexes[i[n]]),
+            'j': int(indexes[j[n]]),
+            'tca': float(((jd - UNIX_EPOCH_JD) + tca[n]) * DAY_S),
+            'miss_km': float(miss[n]),
+            'relative_speed': float(speed[n])
+        }
+        # قيمتان صغريان متجاورتان لنفس الاقتراب تتقاربان إلى نفس الزمن
+        previous = last.get((event['i'], event['j']))
+        if previous is not None and event['tca'] - previous['tca'] < step_seconds:
+            if event['miss_km'] < previous['miss_km']:
+                previous.update(event)
+            continue
+        last[(event['i'], event['j'])] = event
+        events.append(event)
+
+    return sorted(events, key=lambda e: e['miss_km']), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--group', default='active', help='مجموعة Celestrak')
+    parser.add_argument('--tle', help='ملف TLE محلي (3LE) بدل التنزيل من Celestrak')
+    parser.add_argument('--target', action='append', help='اسم أو رقم NORAD للهدف (يمكن تكراره)')
+    parser.add_argument('--threshold', type=float, default=5.0, help='مسافة الاقتراب (كم)')
+    parser.add_argument('--hours', type=float, default=24.0)
+    parser.add_argument('--step', type=float, default=20.0, help='خطوة الشبكة الزمنية (ثانية)')
+    parser.add_argument('--start', help='زمن البداية ISO 8601 (الآن افتراضياً)')
+    args = parser.parse_args()
+
+    from satellite_utils import tracker
+    from tle_catalog import parse_tle_lines
+
+    if args.tle:
+        with open(args.tle, encoding='utf-8') as f:
+            satellites = parse_tle_lines(f, tracker.ts)
+    else:
+        satellites = tracker.load_tle_from_celestrak(args.group)
+
+    events, stats = tracker.screen_conjunctions(
+        satellites, args.target, args.threshold, args.hours, args.step,
+        tracker.time_from_iso(args.start)
+    )
+    print(f"أجسام: {stats['objects']}، بعد تصفية الأغلفة: {stats['screened']}، "
+          f"خطوات: {stats['steps']}، مرشحون: {stats['candidates']}، تضييق: {stats['refined']}")
+    for event in events:
+        print(f"{event['tca']}  {event['miss_km']:8.3f} km  {event['relative_speed']:7.3f} km/s  "
+              f"{event['primary']}  ↔  {event['secondary']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+import threading
+
+import numpy as np
+from sgp4.api import SatrecArray
+
+from orbit_math import propagate, teme_to_ecef, ecef_to_geodetic
+from visibility_filter import coverage_angle, SIDEREAL_REVS_PER_DAY
+
+DAY_S = 86400.0
+# أطول مدة يبقى فيها موقع قمر دون تحديث حتى لو كان شبه ثابت (ثانية)
+MAX_AGE_SECONDS = 300.0
+
+
+def point_in_polygon(lat, lon, polygon):
+    """اختبار الشعاع لمصفوفة نقاط داخل مضلع (قائمة (lat, lon)) دفعة واحدة"""
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    inside = np.zeros(lat.shape, dtype=bool)
+    vertices = np.asarray(polygon, dtype=float)
+    for (lat1, lon1), (lat2, lon2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        crosses = (lat1 > lat) != (lat2 > lat)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            edge_lon = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+        inside ^= crosses & (lon < edge_lon)
+    return inside
+
+
+def angular_distance(lat1, lon1, lat2, lon2):
+    """الزاوية المركزية (درجة) بين نقاط على الكرة، مع قواعد البث في numpy"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(np.asarray(lon2) - np.asarray(lon1))
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0))))
+
+
+def densify(polygon, spacing: float = 0.25):
+    """نقاط على حدود المضلع كل spacing درجة تقريباً (لحساب أقرب مسافة إلى الحدود)"""
+    vertices = np.asarray(polygon, dtype=float)
+    points = []
+    for start, end in zip(vertices, np.roll(vertices, -1, axis=0)):
+        count = max(int(np.ceil(np.hypot(*(end - start)) / spacing)), 1)
+        alpha = np.arange(count)[:, np.newaxis] / count
+        points.append(start + (end - start) * alpha)
+    return np.concatenate(points)
+
+
+class CoverageIndex:
+    """فهرس مكاني لنقاط أقمار فهرس TLE كامل على شبكة خط عرض/طول
+
+    الموقع المحفوظ لكل قمر يُحدّث فقط عندما يمكن أن تنجرف نقطته أكثر من
+    tolerance_degrees منذ آخر حساب، فالأقمار المنخفضة تُنشر كل بضع ثوانٍ والثابتة
+    كل بضع دقائق، وكل تحديث ينشر الأقمار المستحقة فقط بحساب SGP4 مجمّع واحد.
+    الأقمار التي تقع مواقعها المحفوظة ضمن tolerance_degrees من حد القرار تُنشر
+    من جديد في زمن الاستعلام قبل الإجابة، فلا يُفقد قمر بسبب الانجراف.
+    الخلايا مرتبة حسب رقمها حتى يكون استعلام منطقة صغيرة (العراق) شرائح مباشرة.
+    """
+
+    def __init__(self, records: list, boundary, locations: dict, cell_degrees: float = 1.0,
+                 refresh_seconds: float = 5.0, tolerance_degrees: float = 0.5):
+        self.records = records
+        self.boundary = np.asarray(boundary, dtype=float)
+        self.locations = locations
+        self.cell_degrees = cell_degrees
+        self.tolerance_degrees = tolerance_degrees
+        self._satrecs = [record.satrec for record in records]
+        self._columns = int(np.ceil(360.0 / cell_degrees))
+
+        # أقصى سرعة زاوية لنقطة القمر: حركته المدارية زائد دوران الأرض (درجة/ثانية)
+        revs_per_day = np.array([satrec.no_kozai for satrec in self._satrecs]) * 1440 / (2 * np.pi)
+        ground_rate = (revs_per_day + SIDEREAL_REVS_PER_DAY) * 360.0 / DAY_S
+        self.refresh_days = np.clip(tolerance_degrees / ground_rate, refresh_seconds, MAX_AGE_SECONDS) / DAY_S
+
+        count = len(records)
+        self.lat = np.zeros(count)
+        self.lon = np.zeros(count)
+        self.height = np.zeros(count)
+        self.valid = np.zeros(count, dtype=bool)
+        self.updated_tt = np.full(count, -np.inf)
+        self._order = np.arange(count)
+        self._sorted_cells = np.zeros(count, dtype=int)
+
+        # خلايا الشبكة التي يغطيها مربع حدود المضلع (مع هامش الانجراف)
+        lat_min, lon_min = self.boundary.min(axis=0) - tolerance_degrees
+        lat_max, lon_max = self.boundary.max(axis=0) + tolerance_degrees
+        rows = np.arange(self._row(lat_min), self._row(lat_max) + 1)
+        columns = np.arange(self._column(lon_min), self._column(lon_max) + 1)
+        self._boundary_cells = (rows[:, np.newaxis] * self._columns + columns).ravel()
+        self._boundary_points = densify(self.boundary)
+        self._centroid = self.boundary.mean(axis=0)
+        self._boundary_radius = float(angular_distance(
+            self._centroid[0], self._centroid[1], self._boundary_points[:, 0], self._boundary_points[:, 1]
+        ).max())
+
+        self._lock = threading.Lock()
+        self._stats = {'refreshes': 0, 'propagated': 0, 'queries': 0, 'boundary_propagated': 0}
+
+    def _row(self, lat):
+        return np.floor((np.asarray(lat) + 90.0) / self.cell_degrees).astype(int)
+
+    def _column(self, lon):
+        return np.floor((np.asarray(lon) + 180.0) / self.cell_degrees).astype(int) % self._columns
+
+    def refresh(self, t):
+        """تحديث مواقع الأقمار المستحقة فقط في الزمن t ثم إعادة ترتيب الخلايا"""
+        with self._lock:
+            due = np.flatnonzero(np.abs(t.tt - self.updated_tt) >= self.refresh_days)
+            if not len(due):
+                return 0
+
+            self._propagate(due, t)
+            self._stats['refreshes'] += 1
+            self._stats['propagated'] += len(due)
+            return len(due)
+
+    def _propagate(self, indices, t):
+        # يجب استدعاؤها مع الاحتفاظ بالقفل
+        errors, r, _ = propagate(SatrecArray([self._satrecs[i] for i in indices]), t)
+        r_ecef, _ = teme_to_ecef(r[:, 0], None, t)
+        lat, lon, height = ecef_to_geodetic(r_ecef)
+        self.lat[indices], self.lon[indices], self.height[indices] = lat, lon, height
+        self.valid[indices] = errors[:, 0] == 0
+        self.updated_tt[indices] = t.tt
+
+        cells = self._row(self.lat) * self._columns + self._column(self.lon)
+        self._order = np.argsort(cells, kind='stable')
+        self._sorted_cells = cells[self._order]
+
+    def _propagate_uncertain(self, candidates, uncertain, t):
+        """نشر المرشحين القريبين من حد القرار (ومواقعهم قديمة) في الزمن t، وإرجاع عددهم"""
+        # يجب استدعاؤها مع الاحتفاظ بالقفل
+        due = candidates[uncertain & (self.updated_tt[candidates] != t.tt)]
+        if len(due):
+            self._propagate(due, t)
+            self._stats['boundary_propagated'] += len(due)
+        return len(due)
+
+    def _distance_to_boundary(self, indices):
+        """أقرب مسافة زاوية من نقاط الأقمار إلى حدود المضلع"""
+        return angular_distance(
+            self.lat[indices, np.newaxis], self.lon[indices, np.newaxis],
+            self._boundary_points[:, 0], self._boundary_points[:, 1]
+        ).min(axis=1)
+
+    def _in_cells(self, cells):
+        """فهارس الأقمار التي تقع نقاطها في الخلايا المطلوبة (شرائح من الترتيب)"""
+        starts = np.searchsorted(self._sorted_cells, cells, side='left')
+        ends = np.searchsorted(self._sorted_cells, cells, side='right')
+        if not np.any(ends > starts):
+            return np.zeros(0, dtype=int)
+        return np.concatenate([self._order[a:b] for a, b in zip(starts, ends) if b > a])
+
+    def subpoints_inside(self, t):
+        """الأقمار التي تقع نقطتها تحت القمر داخل المضلع"""
+        self.refresh(t)
+        with self._lock:
+            self._stats['queries'] += 1
+            # الخلايا تشمل هامش الانجراف، فكل قمر قد يكون داخل المضلع الآن موجود بين المرشحين
+            candidates = self._in_cells(self._boundary_cells)
+            candidates = candidates[self.valid[candidates]]
+            near_edge = self._distance_to_boundary(candidates) <= self.tolerance_degrees
+            if self._propagate_uncertain(candidates, near_edge, t):
+                candidates = candidates[self.valid[candidates]]
+            inside = point_in_polygon(self.lat[candidates], self.lon[candidates], self.boundary)
+            return np.sort(candidates[inside])
+
+    def footprints_intersecting(self, t, min_elevation: float = 0):
+        """الأقمار التي تتقاطع دائرة رؤيتها (فوق min_elevation) مع المضلع، ومن أي مدن تُرى
+
+        النتيجة (الفهارس، مصفوفة منطقية أقمار × مدن).
+        """
+        self.refresh(t)
+        with self._lock:
+            self._stats['queries'] += 1
+            lat, lon, height, valid = self.lat, self.lon, self.height, self.valid
+            radius = coverage_angle(height, min_elevation)
+            tolerance = self.tolerance_degrees
+
+            # استبعاد سريع بالمسافة إلى مركز المضلع قبل الحساب على نقاط الحدود
+            to_centroid = angular_distance(lat, lon, self._centroid[0], self._centroid[1])
+            candidates = np.flatnonzero(valid & (to_centroid <= radius + self._boundary_radius + tolerance))
+
+            # القرار محسوم إذا لم يكن انجراف tolerance قادراً على تغييره، وإلا يُنشر القمر في t
+            to_boundary = self._distance_to_boundary(candidates)
+            inside = point_in_polygon(lat[candidates], lon[candidates], self.boundary)
+            certain = (inside & (to_boundary > tolerance)) \
+                | (to_boundary <= radius[candidates] - tolerance) \
+                | (to_boundary > radius[candidates] + tolerance)
+            if self._propagate_uncertain(candidates, ~certain, t):
+                radius = coverage_angle(height, min_elevation)
+                candidates = candidates[valid[candidates]]
+                to_boundary = self._distance_to_boundary(candidates)
+                inside = point_in_polygon(lat[candidates], lon[candidates], self.boundary)
+
+            hit = inside | (to_boundary <= radius[candidates])
+            selected = candidates[hit]
+
+            cities = np.array([[location['lat'], location['lon']] for location in self.locations.values()])
+            seen = angular_distance(
+                lat[selected, np.newaxis], lon[selected, np.newaxis], cities[:, 0], cities[:, 1]
+            ) <= radius[selected, np.newaxis]
+            return selected, seen
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['satellites'] = len(self.records)
+            stats['cell_degrees'] = self.cell_degrees
+            stats['tolerance_degrees'] = self.tolerance_degrees
+        return stats
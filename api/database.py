@@ -1,16 +1,88 @@
-from supabase import create_client, Client
 from config import Config
+import asyncio
+import atexit
 import json
+import threading
+import uuid
 from datetime import datetime
 
+from batch_writer import BatchWriter
+from stats_rollup import StatisticsCache, build_statistics
+
 class SatelliteDatabase:
     def __init__(self):
-        self.supabase: Client = create_client(
-            Config.SUPABASE_URL,
-            Config.SUPABASE_KEY
-        )
+        self._supabase = None
+        self._lock = threading.Lock()
         self.developer = Config.DEVELOPER
         self.year = Config.DEVELOPMENT_YEAR
+        # الأرصاد وسجلات المرور تُجمع وتُكتب كإدخالات متعددة الصفوف في الخلفية
+        self.writer = BatchWriter(
+            self._insert_rows,
+            batch_size=Config.DB_BATCH_SIZE,
+            interval=Config.DB_FLUSH_INTERVAL,
+            max_pending=Config.DB_MAX_PENDING,
+            submit_timeout=Config.DB_SUBMIT_TIMEOUT
+        )
+        atexit.register(self.writer.close)
+        # الإحصائيات من عدادات iraq_stats_counters (تحدّثها المشغلات) مع ذاكرة مؤقتة
+        self._station_names = {}
+        self.statistics = StatisticsCache(self._load_statistics, Config.STATS_CACHE_TTL)
+    
+    @property
+    def supabase(self):
+        """عميل Supabase يُنشأ عند أول استعلام"""
+        if self._supabase is None:
+            with self._lock:
+                if self._supabase is None:
+                    # استيراد مكتبة supabase وحده يستغرق مئات الميلي ثواني، فنؤجله أيضاً
+                    from supabase import create_client
+                    self._supabase = create_client(
+                        Config.SUPABASE_URL,
+                        Config.SUPABASE_KEY
+                    )
+        return self._supabase
+    
+    def _insert_rows(self, table: str, rows: list):
+        """إدخال دفعة صفوف في طلب واحد"""
+        data = self.supabase.table(table).insert(rows).execute().data
+        if table == 'iraq_observations':
+            self.statistics.record_observations(rows, self._station_names)
+        return data
+    
+    def _load_statistics(self):
+        """قراءة العدادات المجمّعة وأسماء المحطات (صفوف بعدد الأنواع والمحطات فقط)"""
+        counters = self.supabase.table('iraq_stats_counters')\
+            .select('metric,dimension,value')\
+            .execute()
+        stations = self.supabase.table('iraq_stations')\
+            .select('id,name')\
+            .execute()
+        self._station_names = {row['id']: row['name'] for row in stations.data}
+        return build_statistics(counters.data, self._station_names)
+    
+    def get_station_locations(self, station_ids: list):
+        """مواقع محطات iraq_stations: {المعرّف كما طُلب: صف}، وتُهمل المعرفات غير الموجودة"""
+        # المعرّف UUID، فالقيم الأخرى لا تُرسل حتى لا يُرفض الاستعلام كله
+        canonical = {}
+        for station_id in station_ids:
+            try:
+                canonical[str(uuid.UUID(str(station_id)))] = station_id
+            except ValueError:
+                pass
+        if not canonical:
+            return {}
+        rows = self.supabase.table('iraq_stations')\
+            .select('id,name,location,latitude,longitude')\
+            .in_('id', list(canonical))\
+            .execute()
+        return {canonical[row['id']]: row for row in rows.data if row['id'] in canonical}
+    
+    async def _write(self, table: str, row: dict, wait: bool):
+        """إضافة صف للكاتب المؤجل: الصفوف المحفوظة، أو مهمة تكتمل بالصف المحفوظ عند wait=False"""
+        write = self.writer.write(table, row)
+        if not wait:
+            return asyncio.ensure_future(write)
+        return [await write]
     
     async def get_iraq_satellites(self):
         """الحصول على الأقمار المهمة للعراق"""
@@ -32,8 +104,8 @@ class SatelliteDatabase:
         
         return satellites
     
-    async def add_iraq_observation(self, observation_data: dict):
-        """إضافة رصد عراقي"""
+    async def add_iraq_observation(self, observation_data: dict, wait: bool = True):
+        """إضافة رصد عراقي (wait=False يعيد تأكيداً قابلاً للانتظار دون انتظار الكتابة)"""
         observation_data.update({
             'country': 'العراق',
             'developer': self.developer,
@@ -41,8 +113,7 @@ class SatelliteDatabase:
             'created_at': datetime.now().isoformat()
         })
         
-        response = self.supabase.table('iraq_observations').insert(observation_data).execute()
-        return response.data
+        return await self._write('iraq_observations', observation_data, wait)
     
     async def get_iraq_stations(self):
         """الحصول على محطات الرصد العراقية"""
@@ -80,8 +151,8 @@ class SatelliteDatabase:
         
         return iraq_stations
     
-    async def log_iraq_pass(self, user_data: dict, satellite_data: dict, pass_data: dict):
-        """تسجيل مرور قمر فوق العراق"""
+    async def log_iraq_pass(self, user_data: dict, satellite_data: dict, pass_data: dict, wait: bool = True):
+        """تسجيل مرور قمر فوق العراق (wait=False يعيد تأكيداً قابلاً للانتظار)"""
         log_entry = {
             'user_location': user_data,
             'satellite_info': satellite_data,
@@ -92,34 +163,16 @@ class SatelliteDatabase:
             'project_year': self.year
         }
         
-        response = self.supabase.table('iraq_satellite_passes').insert(log_entry).execute()
-        return response.data
+        return await self._write('iraq_satellite_passes', log_entry, wait)
     
     async def get_iraq_statistics(self):
         """إحصائيات الرصد العراقي"""
-        stats = {
-            'total_observations': 0,
-            'active_satellites': 0,
-            'iraq_stations': 3,
-            'weather_satellites': 3,
-            'communication_satellites': 4,
+        stats = self.statistics.get()
+        stats.update({
             'developer': self.developer,
             'year': self.year,
-            'country': 'العراق',
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        try:
-            # محاولة الحصول على إحصائيات حقيقية من قاعدة البيانات
-            obs_response = self.supabase.table('iraq_observations')\
-                .select('id', count='exact')\
-                .execute()
-            
-            if hasattr(obs_response, 'count'):
-                stats['total_observations'] = obs_response.count
-        except:
-            pass
-        
+            'country': 'العراق'
+        })
         return stats
 
 # إنشاء نسخة عامة
@@ -0,0 +1,99 @@
+import numpy as np
+
+from orbit_math import propagate, teme_to_ecef, ecef_to_geodetic
+from visibility_filter import coverage_angle
+
+DAY_S = 86400.0
+
+
+def subpoints(satrec, ts, tt):
+    """نقطة القمر على الأرض لمصفوفة أزمنة TT بنشر SGP4 واحد: (خط العرض، خط الطول، الارتفاع كم، صالح)"""
+    t = ts.tt_jd(tt)
+    errors, r, _ = propagate([satrec], t)
+    r_ecef, _ = teme_to_ecef(r[0], None, t)
+    lat, lon, height = ecef_to_geodetic(r_ecef)
+    return lat, lon, height, errors[0] == 0
+
+
+def split_antimeridian(lon):
+    """حدود المقاطع (بداية، نهاية) حيث يقفز خط الطول عبر ±180 حتى لا يرسم الخط عرض الخريطة"""
+    breaks = np.flatnonzero(np.abs(np.diff(lon)) > 180.0) + 1
+    edges = np.concatenate(([0], breaks, [len(lon)]))
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def simplify(points: np.ndarray, tolerance: float):
+    """تبسيط خط بخوارزمية Douglas–Peucker: قناع النقاط المحتفظ بها
+
+    points مصفوفة N×2 (خط العرض، خط الطول)، والمسافة العمودية بالدرجات على
+    مستوى الخريطة. كل خطوة تحسب مسافات المقطع كله دفعة واحدة بـ numpy.
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    if len(points) <= 2 or tolerance <= 0:
+        keep[:] = True
+        return keep
+
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1:last] - start
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            distance = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distance = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+
+        farthest = int(np.argmax(distance))
+        if distance[farthest] > tolerance:
+            index = first + 1 + farthest
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return keep
+
+
+def footprint(lat: float, lon: float, height_km: float, min_elevation: float = 0, points: int = 72):
+    """دائرة الرؤية حول نقطة القمر: المواقع التي يُرى منها فوق min_elevation
+
+    نصف القطر الزاوي من coverage_angle، والدائرة تُرسم على كرة (فرق الشكل
+    البيضاوي أقل من دقة الرسم). النتيجة (نصف القطر بالدرجات، خطوط العرض، خطوط الطول).
+    """
+    radius = float(coverage_angle(height_km, min_elevation))
+    delta = np.radians(radius)
+    phi = np.radians(lat)
+    bearing = np.linspace(0.0, 2 * np.pi, points + 1)
+
+    ring_lat = np.arcsin(np.sin(phi) * np.cos(delta) + np.cos(phi) * np.sin(delta) * np.cos(bearing))
+    ring_lon = np.radians(lon) + np.arctan2(
+        np.sin(bearing) * np.sin(delta) * np.cos(phi),
+        np.cos(delta) - np.sin(phi) * np.sin(ring_lat)
+    )
+    ring_lon = (np.degrees(ring_lon) + 180.0) % 360.0 - 180.0
+    return radius, np.degrees(ring_lat), ring_lon
+
+
+def ground_track(satrec, ts, start_tt: float, end_tt: float, step_seconds: float = 30,
+                 tolerance: float = 0.0):
+    """المسار الأرضي للقمر على [start_tt, end_tt] مقسماً عند خط الطول ±180
+
+    النتيجة قائمة مقاطع، كل مقطع قائمة نقاط [خط العرض، خط الطول، ثوانٍ منذ البداية]،
+    مع عدد النقاط قبل التبسيط وبعده. tolerance بالدرجات (0 = بدون تبسيط).
+    """
+    count = int(np.floor((end_tt - start_tt) * DAY_S / step_seconds)) + 1
+    offsets = np.arange(count) * step_seconds
+    lat, lon, _, valid = subpoints(satrec, ts, start_tt + offsets / DAY_S)
+    lat, lon, offsets = lat[valid], lon[valid], offsets[valid]
+
+    segments = []
+    kept = 0
+    for first, last in split_antimeridian(lon):
+        points = np.column_stack([lat[first:last], lon[first:last], offsets[first:last]])
+        mask = simplify(points[:, :2], tolerance)
+        kept += int(np.count_nonzero(mask))
+        segments.append(np.round(points[mask], 4).tolist())
+    return segments, int(len(lat)), kept
@@ -0,0 +1,208 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from orbit_math import HermiteEphemeris, look_angles, ecef_to_geodetic
+
+DAY_S = 86400.0
+
+
+class TrajectoryCache:
+    """نوافذ مسارات قصيرة (HermiteEphemeris) لكل قمر، مشتركة بين كل الرواصد
+
+    المسار في الإطار الأرضي لا يعتمد على الراصد، فتحسبه SGP4 مرة واحدة لكل نافذة
+    ويُستوفى منه الموقع لكل مدينة ولكل عينة.
+    """
+
+    def __init__(self, window_seconds: float = 600, max_entries: int = 64):
+        self.window_days = window_seconds / DAY_S
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'builds': 0, 'hits': 0}
+
+    def get(self, satrec, ts, tt: float):
+        """نافذة مسار تغطي الزمن tt (تُبنى نافذة جديدة تبدأ من tt عند الحاجة)"""
+        key = (satrec.satnum, satrec.jdsatepoch + satrec.jdsatepochF)
+
+        with self._lock:
+            ephemeris = self._entries.get(key)
+            if ephemeris is not None and ephemeris.start_tt <= tt <= ephemeris.end_tt:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return ephemeris
+
+        ephemeris = HermiteEphemeris(satrec, ts, tt, tt + self.window_days)
+
+        with self._lock:
+            self._stats['builds'] += 1
+            self._entries[key] = ephemeris
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return ephemeris
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
+
+
+class LiveChannel:
+    """قناة بث لقمر واحد من موقع واحد بمعدل ثابت: منتج واحد وعدد من المشتركين"""
+
+    def __init__(self, key, compute, interval: float):
+        self.key = key
+        self.compute = compute
+        self.interval = interval
+        self.subscribers = 0
+        self.sample = None
+        self.sequence = 0
+        self.stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            try:
+                sample = self.compute()
+            except Exception as e:
+                sample = {'error': str(e)}
+
+            with self._condition:
+                if self.stopped:
+                    return
+                self.sample = sample
+                self.sequence += 1
+                self._condition.notify_all()
+
+            # جدول زمني ثابت لا ينجرف مع زمن الحساب
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            with self._condition:
+                if self._condition.wait_for(lambda: self.stopped, timeout=delay):
+                    return
+
+    def wait_next(self, after: int, timeout: float):
+        """انتظار عينة أحدث من التسلسل after؛ يُرجع (العينة، التسلسل)"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.sequence > after or self.stopped, timeout=timeout)
+            return self.sample, self.sequence
+
+    def stop(self):
+        with self._condition:
+            self.stopped = True
+            self._condition.notify_all()
+
+
+class LiveBroadcaster:
+    """بث مواقع الأقمار لحظياً: حساب واحد لكل (قمر، موقع مقرّب، معدل) يوزَّع على كل المشتركين"""
+
+    def __init__(self, window_seconds: float = 600, grid_degrees: float = 0.01, solar=None,
+                 chebyshev=None, hot_names=()):
+        self.trajectories = TrajectoryCache(window_seconds)
+        # الأقمار المهمة تُقرأ من مقاطع Chebyshev المشتركة مع calculate_position
+        self.chebyshev = chebyshev
+        self.hot_names = set(hot_names)
+        self.grid_degrees = grid_degrees
+        self.solar = solar
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._stats = {'samples_computed': 0, 'samples_delivered': 0, 'subscriptions': 0}
+
+    def quantize(self, lat: float, lon: float):
+        """تقريب موقع الراصد حتى يتشارك المشتركون المتقاربون نفس القناة"""
+        if self.grid_degrees <= 0:
+            return lat, lon
+        step = self.grid_degrees
+        return round(round(lat / step) * step, 6), round(round(lon / step) * step, 6)
+
+    def _sampler(self, satrec, ts, name: str, lat: float, lon: float, alt: float):
+        hot = self.chebyshev is not None and name in self.hot_names
+
+        def compute():
+            t = ts.now()
+            if hot:
+                r_ecef, valid = self.chebyshev.ecef_position(satrec, t)
+            else:
+                ephemeris = self.trajectories.get(satrec, ts, t.tt)
+                r_ecef, valid = ephemeris.ecef_position(np.array([t.tt]))
+            az, el, distance = look_angles(r_ecef[0], lat, lon, alt)
+            sub_lat, sub_lon, height = ecef_to_geodetic(r_ecef[0])
+            moment = t.utc_datetime()
+
+            with self._lock:
+                self._stats['samples_computed'] += 1
+            sample = {
+                'satellite': name,
+                'timestamp': moment.isoformat(),
+                'azimuth': float(az),
+                'altitude': float(el),
+                'satellite_height': float(distance),
+                'is_visible': bool(valid[0] and el > 0),
+                'subpoint': {
+                    'latitude': float(sub_lat),
+                    'longitude': float(sub_lon),
+                    'height_km': float(height)
+                }
+            }
+            if self.solar is not None:
+                sample['daytime'] = self.solar.is_daytime(lat, lon, moment)
+            return sample
+        return compute
+
+    def subscribe(self, satrec, ts, name: str, lat: float, lon: float, alt: float = 0,
+                  rate: float = 1.0, duration: float = 60):
+        """مولّد عينات الموقع بمعدل rate (عينة/ثانية) لمدة duration ثانية"""
+        lat, lon = self.quantize(lat, lon)
+        key = (satrec.satnum, satrec.jdsatepoch + satrec.jdsatepochF, lat, lon, float(alt), float(rate))
+
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = LiveChannel(key, self._sampler(satrec, ts, name, lat, lon, alt), 1.0 / rate)
+                self._channels[key] = channel
+                channel.start()
+            channel.subscribers += 1
+            self._stats['subscriptions'] += 1
+
+        try:
+            deadline = time.monotonic() + duration
+            sequence = 0
+            while time.monotonic() < deadline:
+                sample, latest = channel.wait_next(sequence, timeout=min(channel.interval * 2 + 1, 5))
+                if channel.stopped:
+                    return
+                if latest == sequence:
+                    continue
+                sequence = latest
+                with self._lock:
+                    self._stats['samples_delivered'] += 1
+                yield sample
+        finally:
+            # آخر مشترك يغلق القناة ويوقف المنتج
+            with self._lock:
+                channel.subscribers -= 1
+                if channel.subscribers == 0 and self._channels.get(key) is channel:
+                    del self._channels[key]
+                    channel.stop()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['channels'] = len(self._channels)
+            stats['subscribers'] = sum(channel.subscribers for channel in self._channels.values())
+            computed = stats['samples_computed']
+            stats['fan_out'] = stats['samples_delivered'] / computed if computed else 0.0
+        stats['trajectories'] = self.trajectories.get_stats()
+        return stats
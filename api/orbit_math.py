@@ -0,0 +1,195 @@
+import numpy as np
+from sgp4.api import SatrecArray
+from skyfield.sgp4lib import theta_GMST1982
+
+# ثوابت WGS84 (كم)
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+DAY_S = 86400.0
+
+
+def sgp4_time_arrays(t):
+    """تحويل زمن skyfield (مفرد أو مصفوفة) إلى (jd, fr) بتوقيت UTC كما يتوقعه SGP4"""
+    jd = np.atleast_1d(np.asarray(t.whole, dtype=float))
+    tai_fraction = np.atleast_1d(np.asarray(t.tai_fraction, dtype=float))
+    fr = tai_fraction - leap_offsets(t.ts, jd + tai_fraction) / DAY_S
+    return jd, fr
+
+
+def leap_offsets(ts, tai_jd):
+    """فرق TAI-UTC بالثواني لأزمنة TAI (يوم جولياني) من جداول الثواني الكبيسة العامة في skyfield"""
+    dates = np.asarray(ts.leap_dates, dtype=float)
+    offsets = np.asarray(ts.leap_offsets, dtype=float)
+    if np.isinf(dates[-1]):
+        # الصيغة القديمة لملف الثواني الكبيسة (بحدود لانهائية) كما يعالجها skyfield
+        dates, offsets = dates[2:-1], offsets[3:]
+    # بداية كل فرق بتوقيت TAI بدل UTC
+    starts = dates + offsets / DAY_S
+    index = np.searchsorted(starts, tai_jd, side='right') - 1
+    # قبل أول ثانية كبيسة في الجدول يبقى الفرق أقل منها بثانية (10 ثوانٍ في 1972)
+    return np.where(index >= 0, offsets[np.maximum(index, 0)], offsets[0] - 1)
+
+
+def propagate(satrecs, t):
+    """نشر مجموعة أقمار دفعة واحدة: (أخطاء N×T، مواقع N×T×3، سرعات N×T×3) في إطار TEME"""
+    if not isinstance(satrecs, SatrecArray):
+        satrecs = SatrecArray(list(satrecs))
+    jd, fr = sgp4_time_arrays(t)
+    return satrecs.sgp4(jd, fr)
+
+
+def teme_to_ecef(r, v, t):
+    """تدوير مواقع وسرعات TEME إلى الإطار الأرضي الثابت (PEF) عبر GMST"""
+    theta, theta_dot = theta_GMST1982(
+        np.atleast_1d(np.asarray(t.whole, dtype=float)),
+        np.atleast_1d(np.asarray(t.ut1_fraction, dtype=float))
+    )
+    return rotate_teme(r, v, theta, theta_dot)
+
+
+def rotate_teme(r, v, theta, theta_dot):
+    """الدوران حول المحور z بزاوية GMST (بالراديان) وسرعتها (راديان/يوم)"""
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    omega = theta_dot / DAY_S
+
+    x = cos_t * r[..., 0] + sin_t * r[..., 1]
+    y = -sin_t * r[..., 0] + cos_t * r[..., 1]
+    r_ecef = np.stack([x, y, r[..., 2]], axis=-1)
+
+    if v is None:
+        return r_ecef, None
+
+    vx = cos_t * v[..., 0] + sin_t * v[..., 1] + omega * y
+    vy = -sin_t * v[..., 0] + cos_t * v[..., 1] - omega * x
+    v_ecef = np.stack([vx, vy, v[..., 2]], axis=-1)
+    return r_ecef, v_ecef
+
+
+def observer_ecef(lat, lon, alt_m=0.0):
+    """موقع الراصد (خط العرض/الطول الجيوديسي) في الإطار الأرضي بالكيلومتر"""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    alt_km = np.asarray(alt_m, dtype=float) / 1000.0
+
+    sin_lat = np.sin(lat)
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)
+    return np.stack([
+        (n + alt_km) * np.cos(lat) * np.cos(lon),
+        (n + alt_km) * np.cos(lat) * np.sin(lon),
+        (n * (1 - WGS84_E2) + alt_km) * sin_lat
+    ], axis=-1)
+
+
+def ecef_to_geodetic(r_ecef):
+    """خط العرض والطول الجيوديسي (درجة) والارتفاع (كم) لموقع في الإطار الأرضي"""
+    x, y, z = r_ecef[..., 0], r_ecef[..., 1], r_ecef[..., 2]
+    p = np.sqrt(x ** 2 + y ** 2)
+    lon = np.arctan2(y, x)
+
+    # تكرار قصير على خط العرض (يتقارب إلى أقل من مليمتر خلال ثلاث خطوات)
+    lat = np.arctan2(z, p * (1 - WGS84_E2))
+    for _ in range(3):
+        sin_lat = np.sin(lat)
+        n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)
+        lat = np.arctan2(z + WGS84_E2 * n * sin_lat, p)
+
+    sin_lat = np.sin(lat)
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)
+    cos_lat = np.cos(lat)
+    height = np.where(
+        np.abs(cos_lat) > 1e-9,
+        p / np.where(np.abs(cos_lat) > 1e-9, cos_lat, 1.0) - n,
+        np.abs(z) - n * (1 - WGS84_E2)
+    )
+    return np.degrees(lat), np.degrees(lon), height
+
+
+def look_angles(r_ecef, lat, lon, alt_m=0.0, v_ecef=None):
+    """السمت والارتفاع والمسافة (ومعدل تغير المسافة) من راصد أرضي
+
+    الأبعاد تتبع قواعد numpy للبث: يمكن تمرير راصد واحد أو مصفوفة رواصد
+    بأبعاد متوافقة مع مصفوفة المواقع (بدون المحور الأخير).
+    """
+    obs = observer_ecef(lat, lon, alt_m)
+    lat_r = np.radians(np.asarray(lat, dtype=float))
+    lon_r = np.radians(np.asarray(lon, dtype=float))
+
+    d = r_ecef - obs
+    sin_lat, cos_lat = np.sin(lat_r), np.cos(lat_r)
+    sin_lon, cos_lon = np.sin(lon_r), np.cos(lon_r)
+
+    east = -sin_lon * d[..., 0] + cos_lon * d[..., 1]
+    north = (-sin_lat * cos_lon * d[..., 0] - sin_lat * sin_lon * d[..., 1]
+             + cos_lat * d[..., 2])
+    up = (cos_lat * cos_lon * d[..., 0] + cos_lat * sin_lon * d[..., 1]
+          + sin_lat * d[..., 2])
+
+    distance = np.sqrt(east ** 2 + north ** 2 + up ** 2)
+    elevation = np.degrees(np.arcsin(np.clip(up / distance, -1.0, 1.0)))
+    azimuth = np.degrees(np.arctan2(east, north)) % 360.0
+
+    if v_ecef is None:
+        return azimuth, elevation, distance
+
+    range_rate = np.sum(d * v_ecef, axis=-1) / distance
+    return azimuth, elevation, distance, range_rate
+
+
+class HermiteEphemeris:
+    """مسار قمر واحد محسوب مرة واحدة بـ SGP4 على عُقد زمنية، ويُقيَّم بين العُقد
+    باستيفاء هيرمايت التكعيبي (من الموقع والسرعة) في إطار TEME.
+
+    بخطوة 1% من الدورة المدارية يكون خطأ الاستيفاء أقل من متر تقريباً،
+    فيمكن تقييم الموقع لآلاف الأزمنة بدون استدعاء SGP4 من جديد.
+    """
+
+    def __init__(self, satrec, ts, start_tt: float, end_tt: float, step_days: float = None):
+        if step_days is None:
+            orbits_per_day = satrec.no_kozai / (2 * np.pi) * 1440
+            step_days = min(0.01 / max(orbits_per_day, 1.0), 1 / 24)
+
+        self.start_tt = start_tt
+        self.end_tt = end_tt
+        count = int(np.ceil((end_tt - start_tt) / step_days)) + 5
+        self.knots = start_tt - 2 * step_days + np.arange(count) * step_days
+        t = ts.tt_jd(self.knots)
+        errors, r, v = propagate([satrec], t)
+        self.valid = errors[0] == 0
+        self.r = r[0]
+        # السرعة بوحدة كم/يوم لتتوافق مع الزمن بالأيام
+        self.v = v[0] * DAY_S
+        # الفرق UT1 - TT يتغير ببطء شديد، فيكفي استيفاؤه خطياً
+        self.ut1_offset = np.asarray(t.ut1 - t.tt, dtype=float)
+
+    def teme_position(self, tt):
+        """موقع TEME (كم) لأي مصفوفة أزمنة TT داخل نطاق العُقد"""
+        tt = np.asarray(tt, dtype=float)
+        i = np.clip(np.searchsorted(self.knots, tt) - 1, 0, len(self.knots) - 2)
+        h = self.knots[i + 1] - self.knots[i]
+        s = ((tt - self.knots[i]) / h)[..., np.newaxis]
+        s2 = s * s
+        s3 = s2 * s
+        position = ((2 * s3 - 3 * s2 + 1) * self.r[i]
+                    + (s3 - 2 * s2 + s) * h[..., np.newaxis] * self.v[i]
+                    + (-2 * s3 + 3 * s2) * self.r[i + 1]
+                    + (s3 - s2) * h[..., np.newaxis] * self.v[i + 1])
+        return position, self.valid[i] & self.valid[i + 1]
+
+    def ecef_position(self, tt):
+        """موقع القمر في الإطار الأرضي الثابت (كم) مع مؤشر صلاحية النشر"""
+        tt = np.asarray(tt, dtype=float)
+        position, valid = self.teme_position(tt)
+        ut1 = tt + np.interp(tt, self.knots, self.ut1_offset)
+        whole = np.floor(ut1)
+        theta, theta_dot = theta_GMST1982(whole, ut1 - whole)
+        r_ecef, _ = rotate_teme(position, None, theta, theta_dot)
+        return r_ecef, valid
+
+    def elevations(self, tt, lat, lon, alt_m=0.0):
+        """ارتفاع القمر (درجة) من راصد أو عدة رواصد؛ الأبعاد تتبع قواعد البث"""
+        r_ecef, valid = self.ecef_position(tt)
+        _, el, _ = look_angles(r_ecef, lat, lon, alt_m)
+        return np.where(valid, el, -90.0)
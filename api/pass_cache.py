@@ -0,0 +1,174 @@
+import threading
+from collections import OrderedDict
+
+
+class PassCache:
+    """ذاكرة مؤقتة LRU لأحداث المرور حسب (NORAD، عصر TLE، موقع مقرّب، أدنى ارتفاع، المحرك)
+
+    كل مدخل يحفظ قائمة أحداث (زمن TT، رمز الحدث) ونافذة التغطية [start, end].
+    عند طلب نافذة تتجاوز نهاية المدخل يُمدّد المدخل بحساب الجزء الجديد فقط.
+    المحرك ('skyfield' لـ find_events أو 'hermite' لـ pass_engine) جزء من المفتاح،
+    لأن أزمنة المحركين تختلف قليلاً ولا يجوز أن يخدم أحدهما طلبات الآخر.
+    """
+
+    def __init__(self, max_entries: int = 512, grid_degrees: float = 0.01):
+        self.max_entries = max_entries
+        self.grid_degrees = grid_degrees
+        self._entries = OrderedDict()
+        self._latest_epochs = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'extensions': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def quantize(self, lat: float, lon: float):
+        """تقريب موقع الراصد إلى شبكة الذاكرة المؤقتة"""
+        if self.grid_degrees <= 0:
+            return lat, lon
+        step = self.grid_degrees
+        return round(round(lat / step) * step, 6), round(round(lon / step) * step, 6)
+
+    def get_events(self, norad_id: int, epoch: float, lat: float, lon: float,
+                   min_elevation: float, start: float, end: float, compute, engine: str = 'skyfield'):
+        """أحداث المرور في النافذة [start, end] (أيام TT)
+
+        compute(start, end) يُرجع قائمة (زمن TT، رمز الحدث) لنافذة جديدة.
+        """
+        key = (norad_id, epoch, lat, lon, float(min_elevation), engine)
+
+        with self._lock:
+            self._invalidate_older_epochs(norad_id, epoch)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None and entry['start'] <= start:
+            if entry['end'] >= end:
+                with self._lock:
+                    self._stats['hits'] += 1
+                return self._slice(entry['events'], start, end)
+
+            if entry['end'] >= start:
+                events = self._extend(entry, start, end, compute)
+                with self._lock:
+                    self._stats['extensions'] += 1
+                return self._slice(events, start, end)
+
+        events = compute(start, end)
+        with self._lock:
+            self._stats['misses'] += 1
+            self._store(key, {'start': start, 'end': end, 'events': events})
+        return list(events)
+
+    def lookup(self, norad_id: int, epoch: float, lat: float, lon: float,
+               min_elevation: float, start: float, end: float, engine: str = 'skyfield'):
+        """ما في الذاكرة للنافذة بدون حساب: (الأحداث، زمن الاستئناف)
+
+        النافذة مغطاة بالكامل: (أحداثها، None). مدخل يغطي start فقط: (الأحداث المحفوظة
+        حتى آخر اختفاء، الزمن الذي يجب الحساب منه حتى end). لا مدخل: ([], start).
+        النتيجة تُحفظ بعد الحساب عبر store(..., kept=الأحداث، resume_from=زمن الاستئناف).
+        """
+        key = (norad_id, epoch, lat, lon, float(min_elevation), engine)
+
+        with self._lock:
+            self._invalidate_older_epochs(norad_id, epoch)
+            entry = self._entries.get(key)
+            if entry is None or entry['start'] > start or entry['end'] < start:
+                return [], start
+            self._entries.move_to_end(key)
+            if entry['end'] >= end:
+                self._stats['hits'] += 1
+                return self._slice(entry['events'], start, end), None
+        return self._resume_point(entry['events'], start)
+
+    def store(self, norad_id: int, epoch: float, lat: float, lon: float,
+              min_elevation: float, start: float, end: float, events: list, engine: str = 'skyfield',
+              kept: list = None, resume_from: float = None):
+        """حفظ أحداث نافذة محسوبة خارج get_events (مثل عمال المعالجة المتوازية)
+
+        events محسوبة من resume_from (أو start) حتى end، وkept ما أرجعته lookup قبلها.
+        النتيجة أحداث النافذة [start, end] كاملة.
+        """
+        key = (norad_id, epoch, lat, lon, float(min_elevation), engine)
+        events = self._merge(kept or [], events, start if resume_from is None else resume_from)
+
+        with self._lock:
+            self._invalidate_older_epochs(norad_id, epoch)
+            self._stats['extensions' if kept else 'misses'] += 1
+            self._store(key, {'start': start, 'end': end, 'events': events})
+        return list(events)
+
+    def _resume_point(self, events, start: float):
+        """(الأحداث المحفوظة من start حتى آخر اختفاء، زمن استئناف الحساب)"""
+        # نعيد الحساب من بعد آخر حدث اختفاء، حتى لا يُقطع مرور جارٍ عند حافة النافذة
+        for i in range(len(events) - 1, -1, -1):
+            if events[i][0] < start:
+                break
+            if events[i][1] == 2:
+                return [event for event in events[:i + 1] if event[0] >= start], events[i][0]
+        return [], start
+
+    def _merge(self, kept: list, new_events: list, resume_from: float):
+        if not kept:
+            return [event for event in new_events if event[0] >= resume_from]
+        # بعد آخر اختفاء محفوظ يبدأ الجزء الجديد بظهور؛ ما قبله تكرار لذلك الاختفاء
+        # بفارق تقريب صغير عند حافة الحساب الجديد
+        new_events = [event for event in new_events if event[0] > resume_from]
+        first_rise = next((i for i, event in enumerate(new_events) if event[1] == 0), len(new_events))
+        return kept + new_events[first_rise:]
+
+    def _extend(self, entry: dict, start: float, end: float, compute):
+        kept, resume_from = self._resume_point(entry['events'], start)
+        updated = self._merge(kept, compute(resume_from, end), resume_from)
+        # نستبدل القائمة بدل تعديلها في مكانها، لأن طلبات أخرى قد تقرأ القائمة القديمة الآن
+        with self._lock:
+            entry['events'] = updated
+            entry['start'] = start
+            entry['end'] = end
+        return updated
+
+    def _slice(self, events, start: float, end: float):
+        return [event for event in events if start <= event[0] <= end]
+
+    def _store(self, key, entry: dict):
+        # يجب استدعاؤها مع الاحتفاظ بالقفل
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _invalidate_older_epochs(self, norad_id: int, epoch: float):
+        # يجب استدعاؤها مع الاحتفاظ بالقفل
+        latest = self._latest_epochs.get(norad_id)
+        if latest is not None and epoch <= latest:
+            return
+
+        self._latest_epochs[norad_id] = epoch
+        if latest is None:
+            return
+
+        stale_keys = [key for key in self._entries if key[0] == norad_id and key[1] < epoch]
+        for key in stale_keys:
+            del self._entries[key]
+        self._stats['invalidations'] += len(stale_keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest_epochs.clear()
+
+    def get_stats(self):
+        """إحصائيات الإصابة والتمديد والإخلاء"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['extensions'] + stats['misses']
+            stats['hit_rate'] = (stats['hits'] + stats['extensions']) / lookups if lookups else 0.0
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            stats['grid_degrees'] = self.grid_degrees
+        return stats
@@ -0,0 +1,107 @@
+import numpy as np
+
+from orbit_math import HermiteEphemeris
+
+# حدث الظهور والذروة والاختفاء بنفس رموز skyfield.find_events
+RISE, CULMINATE, SET = 0, 1, 2
+
+DAY_S = 86400.0
+HALF_SECOND = 0.5 / DAY_S
+
+
+def _refine_maxima(ephemeris, a, b, lat, lon, alt, num=12):
+    """تضييق فترات القمم [a, b] بأخذ num عينة في كل دورة (لكل القمم دفعة واحدة)"""
+    alpha = np.linspace(0.0, 1.0, num)
+    rows = np.arange(len(a))
+    while True:
+        samples = a[:, np.newaxis] + (b - a)[:, np.newaxis] * alpha
+        el = ephemeris.elevations(samples, lat[:, np.newaxis], lon[:, np.newaxis], alt[:, np.newaxis])
+        best = np.argmax(el, axis=1)
+        if np.all(b - a <= HALF_SECOND):
+            return samples[rows, best], el[rows, best]
+        a = samples[rows, np.maximum(best - 1, 0)]
+        b = samples[rows, np.minimum(best + 1, num - 1)]
+
+
+def _refine_transitions(ephemeris, a, b, lat, lon, alt, min_elevation, num=8):
+    """تضييق فترات عبور الحد الأدنى [a, b] حتى نصف ثانية (لكل العبورات دفعة واحدة)"""
+    alpha = np.linspace(0.0, 1.0, num)
+    rows = np.arange(len(a))
+    while np.any(b - a > HALF_SECOND):
+        samples = a[:, np.newaxis] + (b - a)[:, np.newaxis] * alpha
+        below = ephemeris.elevations(samples, lat[:, np.newaxis], lon[:, np.newaxis], alt[:, np.newaxis]) < min_elevation
+        # أول عينة تختلف حالتها عن بداية الفترة
+        change = np.argmax(below != below[:, :1], axis=1)
+        change = np.where(change == 0, num - 1, change)
+        a = samples[rows, change - 1]
+        b = samples[rows, change]
+    return b
+
+
+def predict_passes_multi(satrec, observers, ts, start_tt: float, end_tt: float,
+                         min_elevation: float = 10):
+    """أحداث المرور لعدة رواصد من مسار مداري واحد مشترك
+
+    observers قائمة من (lat, lon, alt_m). يتبع نفس خوارزمية skyfield.find_events
+    (البحث عن القمم ثم الظهور والاختفاء حولها)، لكن القمر يُنشر بـ SGP4 مرة
+    واحدة على النافذة كلها (HermiteEphemeris)، وجميع الرواصد وخطوات التحسين
+    تُقيَّم من هذا المسار المشترك بالاستيفاء.
+
+    النتيجة: قائمة لكل راصد من (زمن TT، رمز الحدث) مرتبة زمنياً.
+    """
+    obs = np.asarray(observers, dtype=float).reshape(-1, 3)
+    lat, lon, alt = obs[:, 0], obs[:, 1], obs[:, 2]
+    n_obs = len(obs)
+    events = [[] for _ in range(n_obs)]
+
+    # نفس خطوة skyfield: 5% من الدورة المدارية، وبحد أقصى ربع يوم
+    orbits_per_day = satrec.no_kozai / (2 * np.pi) * 24 * 60
+    step = min(0.05 / max(orbits_per_day, 1.0), 0.25)
+    steps = int((end_tt - start_tt) / step) + 3
+    real_step = (end_tt - start_tt) / steps
+    grid = np.linspace(start_tt - real_step, end_tt + real_step, steps + 2)
+
+    ephemeris = HermiteEphemeris(satrec, ts, grid[0], grid[-1])
+    el = ephemeris.elevations(grid[np.newaxis, :], lat[:, np.newaxis], lon[:, np.newaxis], alt[:, np.newaxis])
+
+    # القمم المحلية على الشبكة (مع عينة إضافية خارج كل طرف)
+    interior = el[:, 1:-1]
+    peak_obs, peak_k = np.nonzero((interior > el[:, :-2]) & (interior >= el[:, 2:]))
+    peak_k = peak_k + 1
+    if not len(peak_k):
+        return events
+
+    peak_tt, peak_el = _refine_maxima(
+        ephemeris, grid[peak_k - 1], grid[peak_k + 1],
+        lat[peak_obs], lon[peak_obs], alt[peak_obs]
+    )
+    keep = (peak_tt >= start_tt) & (peak_tt <= end_tt) & (peak_el >= min_elevation)
+    peak_obs, peak_tt = peak_obs[keep], peak_tt[keep]
+
+    # نقاط الفحص لكل راصد: البداية، القمم، منتصف ما بين القمم، النهاية
+    check_tt, check_obs = [], []
+    for o in range(n_obs):
+        maxima = np.sort(peak_tt[peak_obs == o])
+        events[o].extend((tt, CULMINATE) for tt in maxima.tolist())
+        doublets = np.repeat(np.concatenate(([start_tt], maxima, [end_tt])), 2)
+        check_tt.append((doublets[:-1] + doublets[1:]) / 2)
+        check_obs.append(np.full(len(doublets) - 1, o))
+
+    check_tt = np.concatenate(check_tt)
+    check_obs = np.concatenate(check_obs)
+    below = ephemeris.elevations(check_tt, lat[check_obs], lon[check_obs], alt[check_obs]) < min_elevation
+
+    transition = (below[1:] != below[:-1]) & (check_obs[1:] == check_obs[:-1])
+    idx = np.flatnonzero(transition)
+    if len(idx):
+        o = check_obs[idx]
+        crossing_tt = _refine_transitions(
+            ephemeris, check_tt[idx], check_tt[idx + 1],
+            lat[o], lon[o], alt[o], min_elevation
+        )
+        for observer, tt, was_below in zip(o.tolist(), crossing_tt.tolist(), below[idx].tolist()):
+            events[observer].append((tt, RISE if was_below else SET))
+
+    for observer_events in events:
+        observer_events.sort()
+    return events
@@ -0,0 +1,101 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from sgp4.api import Satrec
+from skyfield.api import load
+
+from pass_engine import predict_passes_multi
+
+# مقياس الزمن داخل كل عملية عامل (يُحمَّل مرة واحدة عند بدء العامل)
+_worker_ts = None
+
+
+def _init_worker():
+    global _worker_ts
+    _worker_ts = load.timescale()
+
+
+def predict_from_lines(tle1: str, tle2: str, observers: list, start_tt: float,
+                       end_tt: float, min_elevation: float, ts=None):
+    """حساب أحداث المرور من أسطر TLE مباشرة (يُنفَّذ داخل عملية العامل)
+
+    نرسل للعامل أسطر TLE فقط بدل كائنات skyfield، فهي صغيرة وسهلة النقل بين العمليات.
+    """
+    satrec = Satrec.twoline2rv(tle1, tle2)
+    return predict_passes_multi(satrec, observers, ts or _worker_ts, start_tt, end_tt, min_elevation)
+
+
+class PassWorkerPool:
+    """مجموعة عمليات لتوزيع تنبؤات المرور على أنوية المعالج (قمر لكل مهمة)"""
+
+    def __init__(self, workers: int = 0, start_method: str = 'spawn'):
+        self.workers = workers
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {'batches': 0, 'tasks': 0, 'timed_out': 0}
+
+    @property
+    def enabled(self):
+        return self.workers > 1
+
+    def _get_executor(self):
+        # إنشاء العمليات عند أول طلب فقط، حتى لا يتأخر تشغيل التطبيق
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def predict(self, jobs: list, observers: list, start_tt: float, end_tt: float,
+                min_elevation: float = 10, timeout: float = None, starts: dict = None):
+        """توزيع jobs = [(key, tle1, tle2)] على العمال
+
+        starts اختياري {key: بداية النافذة} لمهام تكمل نافذة محفوظة جزئياً بدل start_tt.
+
+        النتيجة (results, timed_out): results قاموس بترتيب jobs نفسه مهما كان ترتيب
+        انتهاء العمال، وtimed_out مفاتيح المهام التي لم تنتهِ قبل المهلة.
+        """
+        executor = self._get_executor()
+        futures = [
+            (key, executor.submit(predict_from_lines, tle1, tle2, observers,
+                                  (starts or {}).get(key, start_tt), end_tt, min_elevation))
+            for key, tle1, tle2 in jobs
+        ]
+        done, not_done = wait([future for _, future in futures], timeout=timeout)
+
+        # المهام التي لم تبدأ تُلغى؛ الجارية تكمل في الخلفية وتُهمل نتيجتها
+        for future in not_done:
+            future.cancel()
+
+        results = {}
+        timed_out = []
+        for key, future in futures:
+            if future in done:
+                results[key] = future.result()
+            else:
+                timed_out.append(key)
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['tasks'] += len(jobs)
+            self._stats['timed_out'] += len(timed_out)
+        return results, timed_out
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['workers'] = self.workers
+            stats['enabled'] = self.enabled
+            stats['started'] = self._executor is not None
+        return stats
@@ -0,0 +1,369 @@
+"""حساب مسبق لمرورات الأقمار المهمة فوق محطات العراق وتخزينها في iraq_passes
+
+كل تشغيل يمدّ النافذة المغطاة لكل (قمر، محطة) حتى الآن + days يوماً، ويحسب
+فقط الجزء الجديد (أو النافذة كلها إذا تغيرت حقبة TLE):
+
+    python pass_store.py --days 7
+    python pass_store.py --days 7 --every 3600
+"""
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from orbit_math import propagate, teme_to_ecef, look_angles
+from pass_engine import predict_passes_multi, RISE, CULMINATE, SET
+from tle_catalog import TLERecord
+from tle_ingest import epoch_iso
+
+DAY_S = 86400.0
+# هامش قبل ظهور مرور لم يكتمل في نهاية النافذة، يبدأ منه التشغيل التالي
+RESUME_MARGIN_DAYS = 60.0 / DAY_S
+
+logger = logging.getLogger(__name__)
+
+
+def pair_passes(events: list):
+    """تجميع أحداث (TT، رمز) في مرورات كاملة: (ظهور، أزمنة الذروة، اختفاء)
+
+    النتيجة (المرورات، زمن ظهور مرور لم يكتمل قبل نهاية النافذة، زمن اختفاء مرور
+    بدأ قبل بداية النافذة)، والأخيران None إن لم يوجدا. المرور الناقص لا يُخزن.
+    """
+    passes = []
+    rise, culminations = None, []
+    leading_set = None
+    for tt, event in events:
+        if event == RISE:
+            rise, culminations = tt, []
+        elif event == CULMINATE and rise is not None:
+            culminations.append(tt)
+        elif event == SET:
+            if rise is not None:
+                passes.append((rise, culminations or [(rise + tt) / 2], tt))
+                rise = None
+            elif not passes:
+                leading_set = tt
+    return passes, rise, leading_set
+
+
+def elevations_at(satrec, ts, tt, lat: float, lon: float, alt_m: float = 0.0):
+    """ارتفاع القمر (درجة) من راصد واحد لمصفوفة أزمنة TT"""
+    t = ts.tt_jd(np.asarray(tt, dtype=float))
+    _, r, _ = propagate([satrec], t)
+    r_ecef, _ = teme_to_ecef(r[0], None, t)
+    _, elevation, _ = look_angles(r_ecef, lat, lon, alt_m)
+    return elevation
+
+
+def _iso(ts, tt):
+    return [moment.isoformat() for moment in ts.tt_jd(np.asarray(tt, dtype=float)).utc_datetime()]
+
+
+def _tt(ts, values):
+    return ts.from_datetimes([datetime.fromisoformat(value) for value in values]).tt
+
+
+def station_passes(satrec, ts, events: list, lat: float, lon: float, alt_m: float = 0.0):
+    """صفوف المرورات الكاملة لمحطة واحدة مع أعلى ارتفاع، وحدود المرورين الناقصين (انظر pair_passes)"""
+    passes, trailing_rise, leading_set = pair_passes(events)
+    if not passes:
+        return [], trailing_rise, leading_set
+
+    culmination_tt = [tt for _, culminations, _ in passes for tt in culminations]
+    elevation = elevations_at(satrec, ts, culmination_tt, lat, lon, alt_m)
+
+    rows = []
+    index = 0
+    rises = _iso(ts, [rise for rise, _, _ in passes])
+    sets = _iso(ts, [end for _, _, end in passes])
+    for (rise, culminations, end), rise_iso, set_iso in zip(passes, rises, sets):
+        candidates = elevation[index:index + len(culminations)]
+        best = int(np.argmax(candidates))
+        rows.append({
+            'pass_start': rise_iso,
+            'pass_end': set_iso,
+            'culmination_tt': culminations[best],
+            'max_elevation': round(float(candidates[best]), 2),
+            'duration_minutes': int(round((end - rise) * 1440))
+        })
+        index += len(culminations)
+
+    culmination_iso = _iso(ts, [row.pop('culmination_tt') for row in rows])
+    for row, value in zip(rows, culmination_iso):
+        row['culmination_time'] = value
+    return rows, trailing_rise, leading_set
+
+
+def find_tle(tracker, row: dict, groups: list):
+    """سجل TLE للقمر: من جدول satellites إن وُجد، وإلا بالبحث في فئات Celestrak برقم NORAD أو الاسم"""
+    if row.get('tle_line1') and row.get('tle_line2'):
+        return TLERecord(row['name'], row['tle_line1'], row['tle_line2'], tracker.ts)
+
+    for group in groups:
+        satellites = tracker.load_tle_from_celestrak(group)
+        if row['name'] in satellites:
+            return satellites[row['name']]
+        for record in satellites.values():
+            if record.norad_id.lstrip('0') == str(row['norad_id']).lstrip('0'):
+                return record
+    return None
+
+
+def precompute_passes(client, tracker, satellites_info: dict, days: float, min_elevation: float = 10,
+                      groups: list = (), now_tt: float = None, batch_size: int = 500,
+                      retention_days: float = 1.0):
+    """مدّ تغطية iraq_passes لكل (قمر من satellites_info، محطة من iraq_stations) حتى now + days
+
+    satellites_info بصيغة IRAQ_IMPORTANT_SATELLITES (الاسم: {'freq': ...}).
+    """
+    ts = tracker.ts
+    now_tt = ts.now().tt if now_tt is None else now_tt
+    end_tt = now_tt + days
+    now_iso = _iso(ts, [now_tt])[0]
+
+    stations = client.table('iraq_stations').select('id,location,latitude,longitude').execute().data
+    satellites = client.table('satellites')\
+        .select('id,name,norad_id,tle_line1,tle_line2')\
+        .in_('name', list(satellites_info))\
+        .execute().data
+    coverage = {
+        (row['satellite_id'], row['station_id']): row
+        for row in client.table('iraq_pass_coverage').select('*').execute().data
+    }
+
+    stats = {'satellites': 0, 'stations': len(stations), 'computed_pairs': 0, 'reset_pairs': 0,
+             'passes': 0, 'missing_tle': []}
+    pass_rows, coverage_rows = [], []
+
+    for satellite in satellites:
+        record = find_tle(tracker, satellite, groups)
+        if record is None:
+            stats['missing_tle'].append(satellite['name'])
+            continue
+        stats['satellites'] += 1
+        epoch = datetime.fromisoformat(epoch_iso(record.tle1))
+
+        # بداية الحساب لكل محطة: نهاية التغطية السابقة، أو الآن إذا تغيرت حقبة TLE أو حد الارتفاع
+        starts = {}
+        for station in stations:
+            previous = coverage.get((satellite['id'], station['id']))
+            valid = (
+                previous is not None
+                and datetime.fromisoformat(previous['tle_epoch']) == epoch
+                and float(previous['min_elevation']) == float(min_elevation)
+            )
+            covered_until = _tt(ts, [previous['covered_until']])[0] if valid else None
+            if valid and covered_until > now_tt:
+                starts[station['id']] = (covered_until, previous['covered_from'])
+            else:
+                if previous is not None and not valid:
+                    # مرورات محسوبة من TLE قديم أو بحد ارتفاع مختلف تُحذف من الآن فصاعداً
+                    client.table('iraq_passes').delete()\
+                        .eq('satellite_id', satellite['id'])\
+                        .eq('station_id', station['id'])\
+                        .gte('pass_start', now_iso)\
+                        .execute()
+                    stats['reset_pairs'] += 1
+                starts[station['id']] = (now_tt, None)
+
+        # المحطات التي تبدأ من الزمن نفسه تتشارك مساراً مدارياً واحداً
+        by_start = {}
+        for station in stations:
+            start_tt, _ = starts[station['id']]
+            if end_tt - start_tt > RESUME_MARGIN_DAYS:
+                by_start.setdefault(start_tt, []).append(station)
+
+        for start_tt, group in by_start.items():
+            observers = [(float(s['latitude']), float(s['longitude']), 0.0) for s in group]
+            events = predict_passes_multi(record.satrec, observers, ts, start_tt, end_tt, min_elevation)
+            for station, station_events, (lat, lon, alt) in zip(group, events, observers):
+                rows, trailing_rise, leading_set = station_passes(record.satrec, ts, station_events, lat, lon, alt)
+                for row in rows:
+                    row.update({
+                        'satellite_id': satellite['id'],
+                        'station_id': station['id'],
+                        'min_elevation': min_elevation,
+                        'frequency': satellites_info.get(satellite['name'], {}).get('freq'),
+                        'city': station['location']
+                    })
+                pass_rows.extend(rows)
+
+                # التغطية الجديدة تبدأ بعد مرور جارٍ عند بدايتها، وتنتهي قبل مرور لم يكتمل
+                covered_from = starts[station['id']][1]
+                if covered_from is None:
+                    covered_from = _iso(ts, [start_tt if leading_set is None else leading_set])[0]
+                covered_until = end_tt if trailing_rise is None else max(trailing_rise - RESUME_MARGIN_DAYS, start_tt)
+                coverage_rows.append({
+                    'satellite_id': satellite['id'],
+                    'station_id': station['id'],
+                    'covered_from': covered_from,
+                    'covered_until': _iso(ts, [covered_until])[0],
+                    'min_elevation': min_elevation,
+                    'tle_epoch': epoch.isoformat()
+                })
+                stats['computed_pairs'] += 1
+
+    for start in range(0, len(pass_rows), batch_size):
+        client.table('iraq_passes')\
+            .upsert(pass_rows[start:start + batch_size], on_conflict='satellite_id,station_id,pass_start',
+                    ignore_duplicates=True, returning='minimal')\
+            .execute()
+    if coverage_rows:
+        client.table('iraq_pass_coverage')\
+            .upsert(coverage_rows, on_conflict='satellite_id,station_id', returning='minimal')\
+            .execute()
+
+    # المرورات المنتهية منذ أكثر من retention_days لا يحتاجها أي طلب
+    client.table('iraq_passes').delete()\
+        .lt('pass_end', _iso(ts, [now_tt - retention_days])[0])\
+        .execute()
+
+    stats['passes'] = len(pass_rows)
+    return stats
+
+
+class PassStore:
+    """قراءة المرورات المحسوبة مسبقاً لطلبات /api/predict
+
+    جدول التغطية صغير (أقمار × محطات) فيُحفظ في الذاكرة لمدة coverage_ttl ثانية،
+    فالطلب غير المغطى لا يكلف استعلاماً. الطلب المغطى (كل راصد يطابق محطة وكل قمر
+    له تغطية تشمل النافذة بالحد نفسه للارتفاع) يُجاب باستعلام واحد على مدى زمني.
+    """
+
+    def __init__(self, ts_getter, match_degrees: float = 0.01, coverage_ttl: float = 60):
+        self.ts_getter = ts_getter
+        self.match_degrees = match_degrees
+        self.coverage_ttl = coverage_ttl
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'lookups': 0, 'covered': 0, 'coverage_loads': 0, 'errors': 0}
+
+    def _coverage(self, get_client):
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._loaded_at < self.coverage_ttl:
+                return self._snapshot
+
+        ts = self.ts_getter()
+        try:
+            client = get_client()
+            stations = client.table('iraq_stations').select('id,latitude,longitude').execute().data
+            # اسم القمر من جدول satellites عبر المفتاح الأجنبي (أقمار التغطية فقط)
+            rows = client.table('iraq_pass_coverage')\
+                .select('satellite_id,station_id,covered_from,covered_until,min_elevation,satellites(name)')\
+                .execute().data
+            covered_from = _tt(ts, [row['covered_from'] for row in rows]) if rows else []
+            covered_until = _tt(ts, [row['covered_until'] for row in rows]) if rows else []
+            snapshot = {
+                'stations': [(s['id'], float(s['latitude']), float(s['longitude'])) for s in stations],
+                'satellites': {row['satellites']['name']: row['satellite_id'] for row in rows},
+                'coverage': {
+                    (row['satellite_id'], row['station_id']): (start, end, float(row['min_elevation']))
+                    for row, start, end in zip(rows, covered_from, covered_until)
+                }
+            }
+        except Exception:
+            # قاعدة البيانات غير متاحة (أو العميل لا يُنشأ): لا تغطية حتى المحاولة التالية بعد coverage_ttl
+            logger.warning('تعذر تحميل تغطية iraq_passes، المحاولة التالية بعد %s ثانية',
+                           self.coverage_ttl, exc_info=True)
+            snapshot = {'stations': [], 'satellites': {}, 'coverage': {}}
+            with self._lock:
+                self._stats['errors'] += 1
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+            self._stats['coverage_loads'] += 1
+        return snapshot
+
+    def _station(self, snapshot, lat: float, lon: float):
+        for station_id, station_lat, station_lon in snapshot['stations']:
+            if abs(station_lat - lat) <= self.match_degrees and abs(station_lon - lon) <= self.match_degrees:
+                return station_id
+        return None
+
+    def lookup(self, get_client, names: list, observers: list, start_tt: float, end_tt: float,
+               min_elevation: float = 10):
+        """أحداث المرور {الاسم: [قائمة (TT، رمز) لكل راصد]} من الجدول، أو None إذا لم تكن مغطاة
+
+        get_client() يُرجع عميل Supabase ولا يُستدعى إلا عند تحديث التغطية أو عندما
+        تكون النافذة مغطاة، فلا يُعاد إنشاء عميل فاشل مع كل طلب.
+        """
+        with self._lock:
+            self._stats['lookups'] += 1
+        snapshot = self._coverage(get_client)
+
+        station_ids = [self._station(snapshot, lat, lon) for lat, lon, _ in observers]
+        satellite_ids = [snapshot['satellites'].get(name) for name in names]
+        if not names or None in station_ids or None in satellite_ids:
+            return None
+        for satellite_id in satellite_ids:
+            for station_id in station_ids:
+                covered = snapshot['coverage'].get((satellite_id, station_id))
+                if covered is None or covered[0] > start_tt or covered[1] < end_tt \
+                        or covered[2] != float(min_elevation):
+                    return None
+
+        ts = self.ts_getter()
+        start_iso, end_iso = _iso(ts, [start_tt, end_tt])
+        rows = get_client().table('iraq_passes')\
+            .select('satellite_id,station_id,pass_start,culmination_time,pass_end')\
+            .in_('station_id', sorted(set(station_ids)))\
+            .in_('satellite_id', sorted(set(satellite_ids)))\
+            .gte('pass_end', start_iso)\
+            .lte('pass_start', end_iso)\
+            .order('pass_start')\
+            .execute().data
+
+        events = {}
+        if rows:
+            times = _tt(ts, [row[key] for row in rows for key in ('pass_start', 'culmination_time', 'pass_end')])
+            times = times.reshape(-1, 3)
+            for row, (rise, culmination, end) in zip(rows, times):
+                pair_events = events.setdefault((row['satellite_id'], row['station_id']), [])
+                pair_events.extend(
+                    (float(tt), code) for tt, code in ((rise, RISE), (culmination, CULMINATE), (end, SET))
+                    if start_tt <= tt <= end_tt
+                )
+
+        with self._lock:
+            self._stats['covered'] += 1
+        return {
+            name: [events.get((satellite_id, station_id), []) for station_id in station_ids]
+            for name, satellite_id in zip(names, satellite_ids)
+        }
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['coverage_ttl'] = self.coverage_ttl
+            if self._snapshot is not None:
+                stats['covered_pairs'] = len(self._snapshot['coverage'])
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=float, default=None, help='طول النافذة المغطاة من الآن (يوم)')
+    parser.add_argument('--every', type=float, default=0, help='إعادة التشغيل كل N ثانية (0 = مرة واحدة)')
+    args = parser.parse_args()
+
+    from satellite_utils import tracker
+
+    while True:
+        stats = tracker.precompute_passes(args.days)
+        print(f"{datetime.now().isoformat(timespec='seconds')}: {stats}")
+        if args.every <= 0:
+            return
+        time.sleep(args.every)
+
+
+if __name__ == '__main__':
+    main()
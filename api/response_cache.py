@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """حساب جارٍ لمفتاح واحد ينتظره بقية الطلبات المتزامنة"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    """ذاكرة LRU لأجسام استجابات JSON حسب (مفتاح، فترة زمنية)
+
+    الفترة bucket_seconds مرتبطة بساعة النظام، فكل الطلبات داخل الفترة نفسها
+    تأخذ الجسم نفسه وينتهي المدخل مع نهايتها. الطلبات المتزامنة لمفتاح غير
+    محفوظ تنتظر حساباً واحداً (single-flight). الحجم محدود بعدد المدخلات
+    وبمجموع البايتات، ويُخلى الأقدم استخداماً أولاً.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 16 * 1024 * 1024, grid_degrees: float = 0.01):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.grid_degrees = grid_degrees
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._bytes = 0
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'uncached': 0,
+            'expired': 0,
+            'evictions': 0
+        }
+
+    def quantize(self, lat: float, lon: float):
+        """تقريب موقع الراصد إلى شبكة الذاكرة حتى تشترك المواقع المتقاربة في المدخل نفسه"""
+        if self.grid_degrees <= 0:
+            return lat, lon
+        step = self.grid_degrees
+        return round(round(lat / step) * step, 6), round(round(lon / step) * step, 6)
+
+    def get(self, key, bucket_seconds: float, compute):
+        """(الجسم، الحالة، المصدر) لمفتاح في الفترة الحالية
+
+        compute() يُرجع (جسم بايتات، رمز HTTP) ويُحفظ فقط إذا كان الرمز 200.
+        المصدر 'hit' أو 'miss' أو 'coalesced' (انتظر حساب طلب آخر).
+        """
+        now = time.time()
+        bucket = int(now // bucket_seconds)
+        full_key = (key, bucket_seconds, bucket)
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+                self._stats['hits'] += 1
+                return entry['body'], entry['status'], 'hit'
+
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = _Flight()
+                self._stats['misses'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            body, status = flight.result
+            return body, status, 'coalesced'
+
+        try:
+            body, status = flight.result = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(full_key, None)
+            flight.event.set()
+
+        with self._lock:
+            if status == 200 and len(body) <= self.max_bytes:
+                self._store(full_key, body, status, (bucket + 1) * bucket_seconds)
+            else:
+                self._stats['uncached'] += 1
+        return body, status, 'miss'
+
+    def _store(self, full_key, body: bytes, status: int, expires_at: float):
+        # يجب استدعاؤها مع الاحتفاظ بالقفل
+        now = time.time()
+        if now - self._last_sweep >= 1.0:
+            self._last_sweep = now
+            for expired_key in [k for k, e in self._entries.items() if e['expires_at'] <= now]:
+                self._bytes -= len(self._entries.pop(expired_key)['body'])
+                self._stats['expired'] += 1
+
+        previous = self._entries.pop(full_key, None)
+        if previous is not None:
+            self._bytes -= len(previous['body'])
+        self._entries[full_key] = {'body': body, 'status': status, 'expires_at': expires_at}
+        self._bytes += len(body)
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted['body'])
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """إحصائيات الإصابة والدمج والإخلاء والذاكرة المستخدمة"""
+        with self._lock:
+            stats = dict(self._stats)
+            served = stats['hits'] + stats['coalesced']
+            lookups = served + stats['misses']
+            stats['hit_rate'] = served / lookups if lookups else 0.0
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max_entries'] = self.max_entries
+            stats['max_bytes'] = self.max_bytes
+            stats['grid_degrees'] = self.grid_degrees
+            stats['in_flight'] = len(self._flights)
+        return stats
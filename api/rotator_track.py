@@ -0,0 +1,123 @@
+"""جدول دوّار الهوائي لمرور كامل: سمت وارتفاع بمعدل ثابت مع معدل تغير المسافة وتردد دوبلر
+
+الصيغة الثنائية: ترويسة 16 بايت (little-endian) ثم سجل 32 بايت لكل عينة.
+
+    الترويسة: magic 'IQRT' | uint16 الإصدار | uint16 حجم السجل | uint32 عدد العينات | uint32 رقم NORAD
+    السجل:   float64 زمن Unix | float32 السمت | float32 الارتفاع | float32 المسافة كم
+             | float32 معدل تغير المسافة كم/ث | float64 التردد المصحح هرتز
+"""
+import io
+import re
+import struct
+from datetime import datetime, timezone
+
+import numpy as np
+
+from orbit_math import propagate, teme_to_ecef, look_angles, sgp4_time_arrays
+
+# سرعة الضوء (كم/ث)
+LIGHT_SPEED_KM_S = 299792.458
+UNIX_EPOCH_JD = 2440587.5
+DAY_S = 86400.0
+
+BINARY_MAGIC = b'IQRT'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHHII')
+
+TRACK_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('azimuth', '<f4'),
+    ('elevation', '<f4'),
+    ('range_km', '<f4'),
+    ('range_rate', '<f4'),
+    ('frequency_hz', '<f8')
+])
+
+CSV_HEADER = 'time_unix,azimuth,elevation,range_km,range_rate_km_s,frequency_hz'
+CSV_FORMAT = ['%.3f', '%.3f', '%.3f', '%.3f', '%.5f', '%.1f']
+
+FREQUENCY_UNITS = {'hz': 1.0, 'khz': 1e3, 'mhz': 1e6, 'ghz': 1e9}
+
+
+def parse_frequency(text: str):
+    """تحويل نص تردد مثل '137.100 MHz' إلى هرتز (None إذا لم يكن تردداً معروفاً)"""
+    match = re.match(r'\s*([\d.]+)\s*([kKmMgG]?[hH][zZ])\s*$', text or '')
+    if match is None:
+        return None
+    return float(match.group(1)) * FREQUENCY_UNITS[match.group(2).lower()]
+
+
+def unix_seconds(t):
+    """زمن Unix (ثانية UTC) لزمن skyfield مفرد أو مصفوفة"""
+    jd, fr = sgp4_time_arrays(t)
+    return ((jd - UNIX_EPOCH_JD) + fr) * DAY_S
+
+
+def unwrap_azimuth(azimuth, max_azimuth: float = 450.0):
+    """سمت متصل عبر الشمال (بدون قفزة 360 → 0) ضمن مدى الدوّار [0, max_azimuth] إن أمكن
+
+    السمت بعد فك الالتفاف يُزاح بمضاعفات 360 بحيث تكون أصغر قيمة فيه بين 0 و 360،
+    فمرور يعبر الشمال من 350 إلى 20 يصبح 350 → 380 بدل القفز إلى الصفر. النتيجة
+    الثانية تبين هل يستطيع الدوّار تتبع المرور كله دون التفاف عكسي.
+    """
+    if not len(azimuth):
+        # مسار بلا عينات (لا مرور ضمن النافذة) يتسع لأي دوّار
+        return np.asarray(azimuth, dtype=float), True
+    unwrapped = np.degrees(np.unwrap(np.radians(azimuth)))
+    unwrapped = unwrapped - 360.0 * np.floor(unwrapped.min() / 360.0)
+    return unwrapped, bool(unwrapped.max() <= max_azimuth)
+
+
+def compute_track(satrec, ts, start_unix: float, end_unix: float, lat: float, lon: float,
+                  alt_m: float = 0.0, rate: float = 1.0, frequency_hz: float = None,
+                  max_azimuth: float = 450.0):
+    """عينات الدوّار من start_unix إلى end_unix بمعدل rate (عينة/ثانية) في حساب متجه واحد
+
+    العينات تبدأ عند ثانية كاملة حتى تتطابق جداول المحطات المختلفة. النتيجة
+    (مصفوفة TRACK_DTYPE، هل يتسع المسار لمدى الدوّار).
+    """
+    step = 1.0 / rate
+    first = np.ceil(start_unix)
+    seconds = first + np.arange(int(np.floor((end_unix - first) * rate)) + 1) * step
+
+    # الثواني من منتصف ليل يوم البداية حتى يطبّق skyfield الثواني الكبيسة لذلك اليوم
+    midnight = np.floor(first / DAY_S) * DAY_S
+    day = datetime.fromtimestamp(midnight, timezone.utc)
+    t = ts.utc(day.year, day.month, day.day, 0, 0, seconds - midnight)
+    errors, r, v = propagate([satrec], t)
+    r_ecef, v_ecef = teme_to_ecef(r[0], v[0], t)
+    azimuth, elevation, distance, range_rate = look_angles(r_ecef, lat, lon, alt_m, v_ecef)
+    azimuth, fits = unwrap_azimuth(azimuth, max_azimuth)
+
+    track = np.empty(len(seconds), dtype=TRACK_DTYPE)
+    track['time'] = seconds
+    track['azimuth'] = azimuth
+    track['elevation'] = elevation
+    track['range_km'] = distance
+    track['range_rate'] = range_rate
+    # تردد الاستقبال بعد إزاحة دوبلر (تقريب الدرجة الأولى، كافٍ للمدارات المنخفضة)
+    track['frequency_hz'] = frequency_hz * (1 - range_rate / LIGHT_SPEED_KM_S) if frequency_hz else np.nan
+    # عينات فشل فيها SGP4 (قمر متحلل) تُستبعد
+    return track[errors[0] == 0], fits
+
+
+def to_csv(track: np.ndarray):
+    """جدول CSV مضغوط: سطر عناوين ثم سطر لكل عينة"""
+    buffer = io.StringIO()
+    columns = np.column_stack([track[name].astype(float) for name in TRACK_DTYPE.names])
+    np.savetxt(buffer, columns, fmt=CSV_FORMAT, delimiter=',', header=CSV_HEADER, comments='')
+    return buffer.getvalue()
+
+
+def to_binary(track: np.ndarray, norad_id: int = 0):
+    """الصيغة الثنائية (ترويسة + سجلات ثابتة الحجم) الموثقة أعلى الوحدة"""
+    header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, TRACK_DTYPE.itemsize, len(track), norad_id)
+    return header + track.astype(TRACK_DTYPE, copy=False).tobytes()
+
+
+def from_binary(data: bytes):
+    """قراءة الصيغة الثنائية: (رقم NORAD، مصفوفة TRACK_DTYPE)"""
+    magic, version, record_size, count, norad_id = BINARY_HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION or record_size != TRACK_DTYPE.itemsize:
+        raise ValueError('ملف جدول دوّار غير مدعوم')
+    return norad_id, np.frombuffer(data, dtype=TRACK_DTYPE, count=count, offset=BINARY_HEADER.size)
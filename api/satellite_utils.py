@@ -1,107 +1,698 @@
 from skyfield.api import load, Topos, EarthSatellite
-from skyfield import almanac
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
 import requests
 import json
+import logging
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from sgp4.api import SatrecArray
+from config import Config
+from tle_cache import TLECatalogCache
+from celestrak_client import CelesTrakClient
+from pass_cache import PassCache
+from tle_snapshot import snapshot_path, write_snapshot, load_snapshot
+from tle_catalog import TLERecord, catalog_from_snapshot, parse_tle_lines
+from tle_ingest import ingest_catalog, load_catalog
+from database import db
+from orbit_math import propagate, teme_to_ecef, look_angles, sgp4_time_arrays
+from pass_engine import predict_passes_multi, RISE, SET
+from pass_pool import PassWorkerPool
+from pass_store import PassStore, precompute_passes
+from solar import SolarTable, UNIX_EPOCH_JD
+from live_stream import LiveBroadcaster
+from chebyshev_ephemeris import ChebyshevEphemeris
+from conjunction import screen
+from coverage_index import CoverageIndex
+from ground_track import ground_track, subpoints, footprint
+from rotator_track import compute_track, unix_seconds
+from visibility_filter import visibility_mask, element_arrays, satrec_elements
+
+logger = logging.getLogger(__name__)
 
 class SatelliteTracker:
     def __init__(self):
-        self.ts = load.timescale()
-        self.eph = load('de421.bsp')
+        # مقياس الزمن وبقية المكونات (مجمّع العمليات، iraq_passes، جداول الشروق، مقاطع
+        # Chebyshev، البث، جلسة Celestrak) تُنشأ عند أول استخدام فقط، حتى لا يدفع
+        # كل تشغيل بارد (مثل /health) كلفتها. حالة النهار والليل من SolarTable، فلا
+        # يُحمّل ملف إفيميريس (DE421) إطلاقاً
+        self._ts = None
+        self._components = {}
+        self._resource_lock = threading.RLock()
+        self.snapshot_dir = Config.TLE_SNAPSHOT_DIR
+        self._satrec_arrays = OrderedDict()
+        self._catalog_elements = OrderedDict()
+        self._coverage_indexes = OrderedDict()
+        self.pass_cache = PassCache(Config.PASS_CACHE_SIZE, Config.PASS_CACHE_GRID_DEGREES)
+        self.tle_cache = TLECatalogCache(
+            self._fetch_tle_catalog,
+            Config.TLE_CACHE_TTL,
+            seed=self._load_tle_snapshot if self.snapshot_dir else None,
+            max_entries=Config.TLE_CACHE_MAX_CATEGORIES
+        )
         
+    @property
+    def ts(self):
+        """مقياس الزمن في skyfield (يُحمّل عند أول طلب)"""
+        if self._ts is None:
+            with self._resource_lock:
+                if self._ts is None:
+                    self._ts = load.timescale()
+        return self._ts
+    
+    def _component(self, name: str, factory):
+        """مكوّن يُنشأ مرة واحدة عند أول استخدام"""
+        component = self._components.get(name)
+        if component is None:
+            with self._resource_lock:
+                component = self._components.get(name)
+                if component is None:
+                    component = self._components[name] = factory()
+        return component
+    
+    @property
+    def pass_pool(self):
+        return self._component('pass_pool', lambda: PassWorkerPool(
+            Config.PASS_POOL_WORKERS, Config.PASS_POOL_START_METHOD
+        ))
+    
+    @property
+    def pass_store(self):
+        return self._component('pass_store', lambda: PassStore(
+            lambda: self.ts, Config.PASS_STORE_MATCH_DEGREES, Config.PASS_STORE_COVERAGE_TTL
+        ))
+    
+    @property
+    def solar(self):
+        """جدول الشروق والغروب، مسخّن لمدن العراق عند أول استخدام"""
+        def build():
+            solar = SolarTable(Config.SOLAR_CACHE_SIZE, Config.SOLAR_GRID_DEGREES)
+            solar.warm(Config.IRAQ_LOCATIONS.values())
+            return solar
+        return self._component('solar', build)
+    
+    @property
+    def chebyshev(self):
+        return self._component('chebyshev', lambda: ChebyshevEphemeris(
+            Config.CHEBYSHEV_SEGMENT_SECONDS,
+            Config.CHEBYSHEV_LOOKAHEAD_SECONDS,
+            Config.CHEBYSHEV_TOLERANCE_KM
+        ))
+    
+    @property
+    def live(self):
+        return self._component('live', lambda: LiveBroadcaster(
+            Config.STREAM_WINDOW_SECONDS, Config.STREAM_GRID_DEGREES, self.solar,
+            chebyshev=self.chebyshev, hot_names=Config.IRAQ_IMPORTANT_SATELLITES
+        ))
+    
+    @property
+    def celestrak(self):
+        return self._component('celestrak', lambda: CelesTrakClient(
+            Config.CELESTRAK_URL, Config.CELESTRAK_TIMEOUT, Config.CELESTRAK_POOL_SIZE
+        ))
+    
+    @celestrak.setter
+    def celestrak(self, client):
+        self._components['celestrak'] = client
+    
     def load_tle_from_celestrak(self, category='stations'):
-        """تحميل بيانات TLE من Celestrak"""
-        url = f"https://celestrak.org/NORAD/elements/gp.php?GROUP={category}&FORMAT=tle"
-        response = requests.get(url)
-        
-        satellites = {}
-        lines = response.text.strip().split('\n')
-        
-        for i in range(0, len(lines), 3):
-            if i + 2 < len(lines):
-                name = lines[i].strip()
-                line1 = lines[i + 1].strip()
-                line2 = lines[i + 2].strip()
-                
-                sat = EarthSatellite(line1, line2, name, self.ts)
-                satellites[name] = {
-                    'satellite': sat,
-                    'tle1': line1,
-                    'tle2': line2
-                }
+        """تحميل بيانات TLE من Celestrak (مع الذاكرة المؤقتة)"""
+        return self.tle_cache.get(category)
+    
+    def _fetch_tle_catalog(self, category):
+        """فهرس الفئة من قاعدة البيانات (إذا كانت المصدر وفيها الفئة) أو من Celestrak"""
+        if Config.TLE_SOURCE == 'database':
+            try:
+                satellites = load_catalog(db.supabase, category, self.ts, Config.TLE_INGEST_BATCH_SIZE)
+            except Exception:
+                logger.warning('تعذرت قراءة الفئة %s من قاعدة البيانات', category, exc_info=True)
+                satellites = None
+            if satellites:
+                newest = max(record.elements['epoch_jd'] for record in satellites.values())
+                age_hours = (time.time() / 86400.0 + UNIX_EPOCH_JD - newest) * 24
+                if age_hours <= Config.TLE_DATABASE_MAX_AGE_HOURS:
+                    return satellites
+                logger.warning('أحدث حقبة في الفئة %s عمرها %.1f ساعة، الرجوع إلى Celestrak',
+                               category, age_hours)
+        return self._download_tle_catalog(category)
+    
+    def _download_tle_catalog(self, category):
+        """تنزيل بيانات TLE من Celestrak، مع الرجوع لآخر لقطة محلية عند انقطاع الشبكة"""
+        try:
+            # سجلات خفيفة فقط؛ تهيئة SGP4 تتم عند أول حساب لكل قمر
+            satellites, modified = self.celestrak.fetch(
+                category, lambda lines: parse_tle_lines(lines, self.ts)
+            )
+        except requests.RequestException:
+            snapshot = self._load_tle_snapshot(category) if self.snapshot_dir else None
+            if snapshot is None:
+                raise
+            return snapshot[0]
         
+        # عند 304 يعود الفهرس نفسه فتبقى الذواكر المبنية عليه (حسب id) صالحة
+        if modified and satellites:
+            self._save_tle_snapshot(category, satellites)
         return satellites
     
+    def ingest_tle(self, category):
+        """تنزيل فئة من Celestrak وإدخالها في جدول satellites (الأقمار المتغيرة حقبتها فقط)"""
+        satellites = self._download_tle_catalog(category)
+        return ingest_catalog(db.supabase, category, satellites, Config.TLE_INGEST_BATCH_SIZE)
+    
+    def _load_tle_snapshot(self, category):
+        """تحميل آخر لقطة محفوظة للفئة: (الأقمار، عمر اللقطة بالثواني) أو None"""
+        path = snapshot_path(self.snapshot_dir, category)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            header, records = load_snapshot(path)
+        except (OSError, ValueError):
+            return None
+        
+        return catalog_from_snapshot(records, self.ts), max(0.0, time.time() - header['created_at'])
+    
+    def _save_tle_snapshot(self, category, satellites):
+        """حفظ الفهرس كلقطة محلية (اختياري ولا يوقف الطلب عند الفشل)"""
+        if not self.snapshot_dir:
+            return
+        
+        try:
+            write_snapshot(snapshot_path(self.snapshot_dir, category), category, satellites)
+        except (OSError, ValueError):
+            pass
+    
     def calculate_position(self, satellite: EarthSatellite, lat: float, lon: float, alt: float = 0):
         """حساب موقع القمر بالنسبة لموقع في العراق"""
         observer = Topos(latitude_degrees=lat, longitude_degrees=lon, elevation_m=alt)
         t = self.ts.now()
         
-        difference = satellite - observer
-        topocentric = difference.at(t)
-        
-        # حساب الارتفاع والسمت
-        alt, az, distance = topocentric.altaz()
+        if satellite.name in Config.IRAQ_IMPORTANT_SATELLITES:
+            # الأقمار المهمة: تقييم مقاطع Chebyshev المحسوبة مسبقاً بدل SGP4
+            r_ecef, _ = self.chebyshev.ecef_position(satellite.model, t)
+            az, elevation, distance_km = look_angles(r_ecef[0], lat, lon, alt)
+            elevation, az, distance_km = float(elevation), float(az), float(distance_km)
+        else:
+            difference = satellite - observer
+            topocentric = difference.at(t)
+            
+            # حساب الارتفاع والسمت
+            elevation, az, distance = topocentric.altaz()
+            elevation, az, distance_km = elevation.degrees, az.degrees, distance.km
         
         # هل القمر فوق الأفق؟
-        is_visible = alt.degrees > 0
+        is_visible = bool(elevation > 0)
         
         # تحديد إذا كان النهار أو الليل (للعرض فقط)
-        is_daytime = self.is_daytime(lat, lon)
+        is_daytime = self.is_daytime(lat, lon, t.utc_datetime())
         
         return {
             'latitude': observer.latitude.degrees,
             'longitude': observer.longitude.degrees,
-            'satellite_height': distance.km,
-            'altitude': alt.degrees,
-            'azimuth': az.degrees,
+            'satellite_height': distance_km,
+            'altitude': elevation,
+            'azimuth': az,
             'is_visible': is_visible,
             'daytime': is_daytime,
             'timestamp': t.utc_datetime().isoformat(),
             'local_time': datetime.now(pytz.timezone('Asia/Baghdad')).strftime('%Y-%m-%d %H:%M:%S')
         }
     
-    def is_daytime(self, lat: float, lon: float):
-        """تحقق إذا كان الوقت الحالي نهاراً في الموقع"""
+    def time_from_iso(self, value: str = None):
+        """تحويل نص ISO 8601 إلى زمن skyfield (الوقت الحالي إذا لم يُحدد)"""
+        if not value:
+            return self.ts.now()
+        
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=pytz.utc)
+        return self.ts.from_datetime(moment)
+    
+    def catalog_satrec_array(self, satellites: dict):
+        """مصفوفة SGP4 مجمّعة للفهرس: (الأسماء، SatrecArray) تُبنى مرة لكل نسخة فهرس"""
+        cached = self._satrec_arrays.get(id(satellites))
+        if cached is not None and cached[0] is satellites:
+            return cached[1], cached[2]
+        
+        names = list(satellites.keys())
+        satrec_array = SatrecArray([satellites[name].satrec for name in names])
+        
+        self._satrec_arrays[id(satellites)] = (satellites, names, satrec_array)
+        while len(self._satrec_arrays) > 8:
+            self._satrec_arrays.popitem(last=False)
+        
+        return names, satrec_array
+    
+    def catalog_elements(self, satellites: dict):
+        """العناصر المدارية للفهرس كمصفوفات: (الأسماء، العناصر) تُبنى مرة لكل نسخة فهرس"""
+        cached = self._catalog_elements.get(id(satellites))
+        if cached is not None and cached[0] is satellites:
+            return cached[1], cached[2]
+        
+        names = list(satellites.keys())
+        elements = element_arrays([satellites[name] for name in names])
+        
+        self._catalog_elements[id(satellites)] = (satellites, names, elements)
+        while len(self._catalog_elements) > 8:
+            self._catalog_elements.popitem(last=False)
+        
+        return names, elements
+    
+    def coverage_index(self, satellites: dict):
+        """الفهرس المكاني لتغطية العراق لنسخة الفهرس (يُحدَّث تدريجياً ولا يُعاد بناؤه لكل طلب)"""
+        cached = self._coverage_indexes.get(id(satellites))
+        if cached is not None and cached[0] is satellites:
+            return cached[1], cached[2]
+        
+        names = list(satellites.keys())
+        index = CoverageIndex(
+            [satellites[name] for name in names], Config.IRAQ_BOUNDARY, Config.IRAQ_LOCATIONS,
+            Config.COVERAGE_CELL_DEGREES, Config.COVERAGE_REFRESH_SECONDS, Config.COVERAGE_TOLERANCE_DEGREES
+        )
+        
+        self._coverage_indexes[id(satellites)] = (satellites, names, index)
+        while len(self._coverage_indexes) > 8:
+            self._coverage_indexes.popitem(last=False)
+        
+        return names, index
+    
+    def coverage_stats(self):
+        """إحصائيات الفهارس المكانية الحالية (واحد لكل نسخة فهرس TLE)"""
+        return [index.get_stats() for _, _, index in list(self._coverage_indexes.values())]
+    
+    def iraq_coverage(self, satellites: dict, mode: str = 'footprint', min_elevation: float = 0):
+        """الأقمار فوق العراق الآن: نقطتها داخل الحدود (subpoint) أو دائرة رؤيتها تتقاطع معها (footprint)"""
+        names, index = self.coverage_index(satellites)
         t = self.ts.now()
-        observer = Topos(latitude_degrees=lat, longitude_degrees=lon)
+        cities = list(Config.IRAQ_LOCATIONS.keys())
+        
+        if mode == 'subpoint':
+            selected, seen = index.subpoints_inside(t), None
+        else:
+            selected, seen = index.footprints_intersecting(t, min_elevation)
+        
+        results = []
+        for row, i in enumerate(selected.tolist()):
+            entry = {
+                'name': names[i],
+                'norad_id': satellites[names[i]].norad_id,
+                'latitude': float(index.lat[i]),
+                'longitude': float(index.lon[i]),
+                'height_km': float(index.height[i])
+            }
+            if seen is not None:
+                entry['visible_from'] = [city for city, visible in zip(cities, seen[row]) if visible]
+            results.append(entry)
+        return results
+    
+    def find_overhead(self, satellites: dict, lat: float, lon: float, alt: float = 0,
+                      min_elevation: float = 0, t=None):
+        """كل أقمار الفهرس فوق ارتفاع معين من موقع في العراق بحساب SGP4 مجمّع واحد
+
+        النتيجة (الأقمار المرئية، عدد الأقمار المستبعدة هندسياً قبل النشر).
+        """
+        if t is None:
+            t = self.ts.now()
+        
+        names, elements = self.catalog_elements(satellites)
+        if not names:
+            return [], 0
+        
+        # استبعاد الأقمار التي لا يمكن أن تظهر من هذا الموقع قبل أي حساب SGP4
+        kept = np.flatnonzero(visibility_mask(elements, [(lat, lon, alt)], min_elevation, t.tt, t.tt))
+        pruned = len(names) - len(kept)
+        if not len(kept):
+            return [], pruned
+        
+        if pruned:
+            names = [names[i] for i in kept]
+            satrec_array = SatrecArray([satellites[name].satrec for name in names])
+        else:
+            _, satrec_array = self.catalog_satrec_array(satellites)
+        
+        errors, r_teme, v_teme = propagate(satrec_array, t)
+        r_ecef, _ = teme_to_ecef(r_teme[:, 0], None, t)
+        az, el, distance = look_angles(r_ecef, lat, lon, alt)
+        
+        # استبعاد الأقمار التي فشل نشرها (مثلاً بعد سقوطها) ثم تصفية الارتفاع
+        selected = np.nonzero((errors[:, 0] == 0) & (el >= min_elevation))[0]
+        selected = selected[np.argsort(-el[selected])]
+        
+        return [
+            {
+                'name': names[i],
+                'norad_id': satellites[names[i]].norad_id,
+                'azimuth': float(az[i]),
+                'altitude': float(el[i]),
+                'satellite_height': float(distance[i])
+            }
+            for i in selected
+        ], pruned
+    
+    def screen_conjunctions(self, satellites: dict, targets: list = None, threshold_km: float = 5,
+                            hours: float = 24, step_seconds: float = None, t0=None):
+        """الاقترابات الأقل من threshold_km بين الأهداف (أسماء أو أرقام NORAD) وبقية الفهرس
+
+        بدون أهداف يُفحص كل زوج في الفهرس. النتيجة (الأحداث مرتبة بالمسافة، إحصائيات الفحص).
+        """
+        if t0 is None:
+            t0 = self.ts.now()
+        if step_seconds is None:
+            step_seconds = Config.CONJUNCTION_STEP_SECONDS
         
-        # حساب شروق وغروب الشمس
-        t0 = t.utc_datetime() - timedelta(hours=12)
-        t1 = t.utc_datetime() + timedelta(hours=12)
+        names = list(satellites.keys())
+        primaries = None
+        if targets:
+            positions = {name: i for i, name in enumerate(names)}
+            norad_index = {satellites[name].norad_id.lstrip('0'): name for name in names}
+            primaries = []
+            for target in targets:
+                target = str(target).strip()
+                name = target if target in positions else norad_index.get(target.lstrip('0'))
+                if name is None:
+                    raise ValueError(f'قمر غير موجود: {target}')
+                primaries.append(positions[name])
+            primaries = sorted(set(primaries))
         
-        times, events = almanac.find_discrete(
-            self.ts.from_datetime(t0), 
-            self.ts.from_datetime(t1), 
-            almanac.sunrise_sunset(self.eph, observer)
+        jd, fr = sgp4_time_arrays(t0)
+        events, stats = screen(
+            [satellites[name].satrec for name in names], float(jd[0]), float(fr[0]),
+            hours / 24, threshold_km, primaries, step_seconds
         )
         
-        # البحث عن حالة الشمس الحالية
-        for time, event in zip(times, events):
-            if time.utc_datetime() > t.utc_datetime():
-                # event == 1 يعني شروق الشمس، event == 0 يعني غروب الشمس
-                return event == 1
+        for event in events:
+            event['primary'] = names[event.pop('i')]
+            event['secondary'] = names[event.pop('j')]
+            event['tca'] = datetime.fromtimestamp(event['tca'], pytz.utc).isoformat()
+        return events, stats
+    
+    def track_many(self, records: list, observers: list, t=None):
+        """مصفوفة زوايا النظر لعدة أقمار × عدة رواصد بحساب SGP4 واحد
+
+        observers قائمة من (lat, lon, alt_m). النتيجة مصفوفات بأبعاد N×M.
+        """
+        if t is None:
+            t = self.ts.now()
+        
+        errors, r_teme, _ = propagate([record.satrec for record in records], t)
+        r_ecef, _ = teme_to_ecef(r_teme[:, 0], None, t)
+        
+        obs = np.asarray(observers, dtype=float).reshape(-1, 3)
+        az, el, distance = look_angles(r_ecef[:, np.newaxis, :], obs[:, 0], obs[:, 1], obs[:, 2])
         
-        return True  # إفتراضي
+        return {
+            'time': t,
+            'valid': errors[:, 0] == 0,
+            'azimuth': az,
+            'altitude': el,
+            'satellite_height': distance
+        }
+    
+    def stream_positions(self, record: TLERecord, lat: float, lon: float, alt: float = 0,
+                         rate: float = 1.0, duration: float = 60):
+        """مولّد مواقع القمر اللحظية (سمت، ارتفاع، مسافة، نقطة تحت القمر) بمعدل rate
+
+        المشتركون في نفس القمر من نفس المدينة وبنفس المعدل يتشاركون حساباً واحداً.
+        """
+        return self.live.subscribe(record.satrec, self.ts, record.name, lat, lon, alt, rate, duration)
+    
+    def is_daytime(self, lat: float, lon: float, when: datetime = None):
+        """تحقق إذا كان الوقت الحالي نهاراً في الموقع (من جدول الشروق والغروب المحفوظ)"""
+        return self.solar.is_daytime(lat, lon, when)
     
     def predict_passes(self, satellite: EarthSatellite, lat: float, lon: float, 
-                      days: int = 1, min_elevation: float = 10):
-        """تنبؤ بمرور القمر فوق العراق"""
+                      days: int = 1, min_elevation: float = 10, t0=None):
+        """تنبؤ بمرور القمر فوق العراق (مع ذاكرة مؤقتة للنوافذ المحسوبة)"""
+        # تقريب الموقع لشبكة الذاكرة المؤقتة حتى تتشارك الطلبات المتقاربة نفس النتيجة
+        lat, lon = self.pass_cache.quantize(lat, lon)
         observer = Topos(latitude_degrees=lat, longitude_degrees=lon)
         
         # إنشاء قائمة بالأوقات للأيام القادمة
-        t0 = self.ts.now()
-        t1 = self.ts.utc(t0.utc_datetime() + timedelta(days=days))
+        if t0 is None:
+            t0 = self.ts.now()
+        t1 = self.ts.tt_jd(t0.tt + days)
+        
+        # قمر لا يمكن أن يرتفع فوق الحد الأدنى من هذا الموقع لا يحتاج find_events
+        if not visibility_mask(satrec_elements(satellite.model), [(lat, lon, 0.0)],
+                               min_elevation, t0.tt, t1.tt)[0]:
+            return []
+        
+        def compute(start, end):
+            # حساب أوقات الظهور والاختفاء
+            t, events = satellite.find_events(
+                observer, self.ts.tt_jd(start), self.ts.tt_jd(end),
+                altitude_degrees=min_elevation
+            )
+            return list(zip(t.tt.tolist(), events.tolist()))
+        
+        model = satellite.model
+        cached_events = self.pass_cache.get_events(
+            model.satnum, model.jdsatepoch + model.jdsatepochF,
+            lat, lon, min_elevation, t0.tt, t1.tt, compute
+        )
+        
+        return self.format_pass_events(cached_events)
+    
+    def stored_passes(self, names: list, observers: list, days: float = 1,
+                      min_elevation: float = 10, t0=None):
+        """المرورات المحسوبة مسبقاً من iraq_passes بنفس شكل predict_passes_many، أو None إذا لم تكن مغطاة
+
+        names يجب أن تقتصر على الأقمار الموجودة في الفهرس المحمّل حتى تطابق النتيجة الحساب المباشر.
+        """
+        if not Config.PASS_STORE_ENABLED:
+            return None
+        if t0 is None:
+            t0 = self.ts.now()
+        
+        try:
+            events = self.pass_store.lookup(
+                lambda: db.supabase, names, observers, t0.tt, t0.tt + days, min_elevation
+            )
+        except Exception:
+            # الرجوع للحساب المباشر
+            logger.warning('تعذرت قراءة iraq_passes', exc_info=True)
+            return None
+        if events is None:
+            return None
+        
+        return {
+            name: [self.format_pass_events(observer_events) for observer_events in all_events]
+            for name, all_events in events.items()
+        }
+    
+    def precompute_passes(self, days: float = None):
+        """مدّ نافذة المرورات المخزنة للأقمار المهمة فوق كل محطات iraq_stations"""
+        stats = precompute_passes(
+            db.supabase, self, Config.IRAQ_IMPORTANT_SATELLITES,
+            Config.PASS_PRECOMPUTE_DAYS if days is None else days,
+            Config.PASS_PRECOMPUTE_MIN_ELEVATION,
+            groups=Config.PASS_PRECOMPUTE_GROUPS,
+            batch_size=Config.TLE_INGEST_BATCH_SIZE
+        )
+        self.pass_store.invalidate()
+        return stats
+    
+    def predict_passes_multi(self, satellite: EarthSatellite, observers: list,
+                             days: int = 1, min_elevation: float = 10, t0=None):
+        """تنبؤ بمرور القمر فوق عدة مواقع عراقية من مسار مداري واحد مشترك
+
+        observers قائمة من (lat, lon, alt_m)، والنتيجة قائمة مرورات لكل راصد.
+        """
+        if t0 is None:
+            t0 = self.ts.now()
+        
+        events = predict_passes_multi(
+            satellite.model, observers, self.ts, t0.tt, t0.tt + days, min_elevation
+        )
+        return [self.format_pass_events(observer_events) for observer_events in events]
+    
+    def predict_passes_many(self, satellites: list, observers: list, days: int = 1,
+                            min_elevation: float = 10, t0=None, timeout: float = None):
+        """تنبؤ بمرور عدة أقمار فوق راصد أو عدة رواصد، على عمليات متوازية إن كانت مفعّلة
+
+        satellites قائمة من (الاسم، سجل TLE) وobservers قائمة من (lat, lon, alt_m).
+        النتيجة (results, timed_out, pruned): results قاموس بترتيب satellites نفسه يحوي
+        قائمة مرورات لكل راصد، وtimed_out أسماء الأقمار التي لم تُحسب قبل انتهاء المهلة،
+        وpruned عدد الأقمار المستبعدة هندسياً لأنها لا تظهر من أي راصد.
+        """
+        if t0 is None:
+            t0 = self.ts.now()
+        start, end = t0.tt, t0.tt + days
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        
+        if satellites:
+            mask = visibility_mask(
+                element_arrays([record for _, record in satellites]),
+                observers, min_elevation, start, end
+            )
+            pruned = len(satellites) - int(np.count_nonzero(mask))
+            satellites = [item for item, visible in zip(satellites, mask) if visible]
+        else:
+            pruned = 0
+        
+        # راصد واحد بدون عمليات متوازية: find_events في skyfield مع تمديد النوافذ في الذاكرة
+        if not self.pass_pool.enabled and len(observers) == 1:
+            lat, lon, _ = observers[0]
+            results = {}
+            timed_out = []
+            for name, record in satellites:
+                if deadline is not None and time.monotonic() >= deadline:
+                    timed_out.append(name)
+                    continue
+                results[name] = [self.predict_passes(
+                    record['satellite'], lat, lon, days, min_elevation, t0
+                )]
+            return results, timed_out, pruned
+        
+        # بقية الحالات بمحرك pass_engine (Hermite) سواء في هذه العملية أو في العمال،
+        # مع نفس تقريب الموقع ومفاتيح الذاكرة المؤقتة في الوضعين
+        observers = [self.pass_cache.quantize(lat, lon) + (alt,) for lat, lon, alt in observers]
+        
+        # كل راصد إما مغطى بالكامل، أو يُكمل مدخله من آخر اختفاء حتى end (كما في get_events)،
+        # فتبقى الطلبات المتكررة مع تقدم الزمن تحسب الجزء الجديد فقط
+        cached = {}
+        partial = {}
+        starts = {}
+        jobs = []
+        for name, record in satellites:
+            satrec = record.satrec
+            epoch = satrec.jdsatepoch + satrec.jdsatepochF
+            looked_up = [
+                self.pass_cache.lookup(satrec.satnum, epoch, lat, lon, min_elevation, start, end, 'hermite')
+                for lat, lon, _ in observers
+            ]
+            if all(resume_from is None for _, resume_from in looked_up):
+                cached[name] = [events for events, _ in looked_up]
+            else:
+                partial[name] = looked_up
+                starts[name] = min(resume_from for _, resume_from in looked_up if resume_from is not None)
+                jobs.append((name, record['tle1'], record['tle2']))
+        
+        if not jobs:
+            computed, timed_out = {}, []
+        elif self.pass_pool.enabled:
+            computed, timed_out = self.pass_pool.predict(
+                jobs, observers, start, end, min_elevation, timeout, starts
+            )
+        else:
+            records = dict(satellites)
+            computed, timed_out = {}, []
+            for name, _, _ in jobs:
+                if deadline is not None and time.monotonic() >= deadline:
+                    timed_out.append(name)
+                    continue
+                computed[name] = predict_passes_multi(
+                    records[name].satrec, observers, self.ts, starts[name], end, min_elevation
+                )
+        
+        results = {}
+        for name, record in satellites:
+            if name in cached:
+                events = cached[name]
+            elif name in computed:
+                satrec = record.satrec
+                events = []
+                for (lat, lon, _), (kept, resume_from), observer_events in zip(
+                    observers, partial[name], computed[name]
+                ):
+                    if resume_from is None:
+                        events.append(kept)
+                        continue
+                    events.append(self.pass_cache.store(
+                        satrec.satnum, satrec.jdsatepoch + satrec.jdsatepochF,
+                        lat, lon, min_elevation, start, end, observer_events, 'hermite',
+                        kept, resume_from
+                    ))
+            else:
+                continue
+            results[name] = [self.format_pass_events(observer_events) for observer_events in events]
+        
+        return results, timed_out, pruned
+    
+    def rotator_track(self, record: TLERecord, lat: float, lon: float, alt: float = 0,
+                      rate: float = 1.0, days: float = 1, min_elevation: float = 0,
+                      frequency_hz: float = None, t0=None):
+        """جدول دوّار الهوائي للمرور القادم (أو الجاري) فوق الموقع، أو None إذا لم يوجد مرور
+
+        النتيجة قاموس فيه حدود المرور (زمن Unix) وعينات TRACK_DTYPE من rotator_track.
+        """
+        if t0 is None:
+            t0 = self.ts.now()
+        satrec = record.satrec
+        events = predict_passes_multi(
+            satrec, [(lat, lon, alt)], self.ts, t0.tt, t0.tt + days, min_elevation
+        )[0]
+        
+        window_end = t0.tt + days
+        if events:
+            # القمر فوق الحد الأدنى الآن إذا كان أول حدث ذروة أو اختفاء
+            start = events[0][0] if events[0][1] == RISE else t0.tt
+            end = next((tt for tt, event in events if event == SET), window_end)
+        else:
+            # قمر ثابت فوق الأفق لا يظهر ولا يختفي: جدول بالمدة القصوى من الآن
+            start, end = t0.tt, window_end
+        
+        start_unix, end_unix = unix_seconds(self.ts.tt_jd(np.array([start, end])))
+        end_unix = min(end_unix, start_unix + Config.ROTATOR_MAX_SECONDS)
+        track, fits = compute_track(
+            satrec, self.ts, start_unix, end_unix, lat, lon, alt, rate, frequency_hz,
+            Config.ROTATOR_MAX_AZIMUTH
+        )
+        if not events and (not len(track) or track['elevation'][0] < min_elevation):
+            return None
+        
+        return {
+            'start': float(start_unix),
+            'end': float(end_unix),
+            'max_elevation': float(track['elevation'].max()) if len(track) else None,
+            'azimuth_fits_rotator': fits,
+            'track': track
+        }
+    
+    def ground_track(self, record: TLERecord, minutes: float = 90, step_seconds: float = 30,
+                     min_elevation: float = 0, tolerance: float = 0.0, t0=None):
+        """المسار الأرضي للقمر لمدة minutes من t0 ودائرة رؤيته عند t0 (نشر SGP4 واحد للمسار)"""
+        if t0 is None:
+            t0 = self.ts.now()
+        satrec = record.satrec
+        segments, sampled, kept = ground_track(
+            satrec, self.ts, t0.tt, t0.tt + minutes / 1440, step_seconds, tolerance
+        )
+        
+        lat, lon, height, valid = subpoints(satrec, self.ts, np.array([t0.tt]))
+        if not valid[0]:
+            return {'segments': segments, 'points': sampled, 'kept': kept, 'footprint': None}
+        
+        radius, ring_lat, ring_lon = footprint(lat[0], lon[0], height[0], min_elevation)
+        return {
+            'segments': segments,
+            'points': sampled,
+            'kept': kept,
+            'footprint': {
+                'center': [round(float(lat[0]), 4), round(float(lon[0]), 4)],
+                'height_km': float(height[0]),
+                'min_elevation': min_elevation,
+                'radius_degrees': radius,
+                'radius_km': radius * np.pi / 180 * 6371.0,
+                'ring': np.round(np.column_stack([ring_lat, ring_lon]), 4).tolist()
+            }
+        }
+    
+    def format_pass_events(self, events: list):
+        """تنسيق أحداث المرور (زمن TT، رمز الحدث) للعرض بتوقيت بغداد"""
+        if not events:
+            return []
         
-        # حساب أوقات الظهور والاختفاء
-        t, events = satellite.find_events(observer, t0, t1, altitude_degrees=min_elevation)
+        times = self.ts.tt_jd(np.array([tt for tt, _ in events]))
         
         passes = []
-        for ti, event in zip(t, events):
-            utc_time = ti.utc_datetime()
+        for utc_time, (_, event) in zip(times.utc_datetime(), events):
             # تحويل لوقت بغداد
-            baghdad_time = utc_time.replace(tzinfo=pytz.utc).astimezone(pytz.timezone('Asia/Baghdad'))
+            baghdad_time = utc_time.astimezone(pytz.timezone('Asia/Baghdad'))
             time_str = baghdad_time.strftime('%Y-%m-%d %H:%M:%S')
             
             event_name = 'ظهور' if event == 0 else 'ذروة' if event == 1 else 'اختفاء'
@@ -110,7 +701,7 @@ class SatelliteTracker:
                 'type': event_name,
                 'time': time_str,
                 'utc_time': utc_time.isoformat(),
-                'event_code': event
+                'event_code': int(event)
             })
         
         return passes
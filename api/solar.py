@@ -0,0 +1,178 @@
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+# ارتفاع مركز الشمس (درجة) لكل حدث: الشروق/الغروب مع الانكسار ونصف قطر القرص، ثم الشفق
+SUN_ALTITUDES = {
+    'sun': -0.833,
+    'civil': -6.0,
+    'nautical': -12.0,
+    'astronomical': -18.0
+}
+
+
+# اليوم الجولياني لعصر J2000 ومعدل دوران الأرض بالنسبة للنجوم (درجة/يوم)
+J2000 = 2451545.0
+SIDEREAL_DEGREES_PER_DAY = 360.98564736629
+UNIX_EPOCH_JD = 2440587.5
+
+
+def julian_day(when: datetime):
+    """اليوم الجولياني (UTC) لزمن datetime بمنطقة زمنية"""
+    return UNIX_EPOCH_JD + when.timestamp() / 86400.0
+
+
+def from_julian_day(jd: float):
+    return datetime.fromtimestamp((jd - UNIX_EPOCH_JD) * 86400.0, timezone.utc)
+
+
+def sun_equatorial(jd: float):
+    """المطلع المستقيم والميل الظاهريان للشمس (درجة)
+
+    الخوارزمية المبسطة من Meeus (الفصل 25)، بدقة نحو 0.01 درجة، أي ثوانٍ قليلة
+    في أوقات الشروق والغروب.
+    """
+    T = (jd - J2000) / 36525.0
+    mean_longitude = 280.46646 + 36000.76983 * T
+    mean_anomaly = math.radians(357.52911 + 35999.05029 * T)
+    center = ((1.914602 - 0.004817 * T) * math.sin(mean_anomaly)
+              + (0.019993 - 0.000101 * T) * math.sin(2 * mean_anomaly)
+              + 0.000289 * math.sin(3 * mean_anomaly))
+    omega = math.radians(125.04 - 1934.136 * T)
+    longitude = math.radians(mean_longitude + center - 0.00569 - 0.00478 * math.sin(omega))
+    obliquity = math.radians(23.439291 - 0.0130042 * T + 0.00256 * math.cos(omega))
+
+    right_ascension = math.degrees(math.atan2(math.cos(obliquity) * math.sin(longitude), math.cos(longitude)))
+    declination = math.degrees(math.asin(math.sin(obliquity) * math.sin(longitude)))
+    return right_ascension, declination
+
+
+def hour_angle(jd: float, lon: float):
+    """زاوية ساعة الشمس (درجة، بين -180 و 180) وميلها من خط طول lon"""
+    right_ascension, declination = sun_equatorial(jd)
+    gmst = 280.46061837 + SIDEREAL_DEGREES_PER_DAY * (jd - J2000)
+    return (gmst + lon - right_ascension + 180.0) % 360.0 - 180.0, declination
+
+
+def _event_hour_angle(lat: float, declination: float, altitude: float):
+    """زاوية الساعة (درجة) التي تبلغ فيها الشمس الارتفاع altitude، أو 'above'/'below'"""
+    phi, delta = math.radians(lat), math.radians(declination)
+    denominator = math.cos(phi) * math.cos(delta)
+    if abs(denominator) < 1e-12:
+        return 'above' if lat * declination > 0 else 'below'
+
+    cos_h = (math.sin(math.radians(altitude)) - math.sin(phi) * math.sin(delta)) / denominator
+    if cos_h <= -1:
+        return 'above'
+    if cos_h >= 1:
+        return 'below'
+    return math.degrees(math.acos(cos_h))
+
+
+def solar_day(lat: float, lon: float, day: datetime):
+    """جدول يوم شمسي واحد: الظهر الشمسي وأوقات الشروق/الغروب والشفق (UTC)
+
+    day هو التاريخ المحلي الشمسي للموقع. كل حدث يُحل بتكرار قصير على زاوية
+    الساعة (Meeus، الفصل 15). إذا لم تعبر الشمس الارتفاع المطلوب (نهار أو ليل
+    قطبي) يكون الحدثان None وتُحدد الحالة في الحقل 'polar'.
+    """
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+    # الظهر الشمسي: زاوية الساعة = 0
+    noon_jd = julian_day(midnight) + 0.5 - lon / 360.0
+    for _ in range(3):
+        H, _ = hour_angle(noon_jd, lon)
+        noon_jd -= H / SIDEREAL_DEGREES_PER_DAY
+
+    table = {'date': midnight.date().isoformat(), 'solar_noon': from_julian_day(noon_jd), 'polar': {}}
+    for name, altitude in SUN_ALTITUDES.items():
+        for event, sign in (('rise', -1), ('set', 1)):
+            jd = noon_jd
+            target = None
+            for _ in range(4):
+                H, declination = hour_angle(jd, lon)
+                target = _event_hour_angle(lat, declination, altitude)
+                if isinstance(target, str):
+                    break
+                jd += (sign * target - H) / SIDEREAL_DEGREES_PER_DAY
+
+            if isinstance(target, str):
+                table[f'{name}_{event}'] = None
+                table['polar'][name] = target
+            else:
+                table[f'{name}_{event}'] = from_julian_day(jd)
+
+    return table
+
+
+class SolarTable:
+    """جداول الشروق والغروب والشفق محسوبة مرة واحدة لكل (موقع مقرّب، يوم) ومحفوظة LRU"""
+
+    def __init__(self, max_entries: int = 1024, grid_degrees: float = 0.1):
+        self.max_entries = max_entries
+        self.grid_degrees = grid_degrees
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def quantize(self, lat: float, lon: float):
+        """تقريب الموقع إلى شبكة الجدول"""
+        if self.grid_degrees <= 0:
+            return lat, lon
+        step = self.grid_degrees
+        return round(round(lat / step) * step, 6), round(round(lon / step) * step, 6)
+
+    def get_day(self, lat: float, lon: float, when: datetime = None):
+        """جدول اليوم الشمسي المحلي الذي يقع فيه الزمن when (UTC) للموقع"""
+        if when is None:
+            when = datetime.now(timezone.utc)
+        lat, lon = self.quantize(lat, lon)
+
+        # التاريخ الشمسي المحلي: كل يوم يمتد ±12 ساعة حول ظهره الشمسي تقريباً
+        local_day = (when + timedelta(hours=lon / 15)).date()
+        key = (lat, lon, local_day)
+
+        with self._lock:
+            table = self._entries.get(key)
+            if table is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return table
+
+        table = solar_day(lat, lon, datetime(local_day.year, local_day.month, local_day.day))
+
+        with self._lock:
+            self._stats['misses'] += 1
+            self._entries[key] = table
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return table
+
+    def is_daytime(self, lat: float, lon: float, when: datetime = None, twilight: str = 'sun'):
+        """هل الشمس فوق الأفق (أو فوق حد الشفق المطلوب) في الزمن when"""
+        if when is None:
+            when = datetime.now(timezone.utc)
+        table = self.get_day(lat, lon, when)
+
+        rise, set_ = table[f'{twilight}_rise'], table[f'{twilight}_set']
+        if rise is None and set_ is None:
+            return table['polar'][twilight] == 'above'
+        # قرب الدائرة القطبية قد يكون في اليوم شروق بلا غروب أو العكس: المقارنة بالحد الموجود فقط
+        if set_ is None:
+            return rise <= when
+        if rise is None:
+            return when < set_
+        return rise <= when < set_
+
+    def warm(self, locations, when: datetime = None):
+        """حساب جداول اليوم مسبقاً لقائمة مواقع (مثل مدن العراق)"""
+        for location in locations:
+            self.get_day(location['lat'], location['lon'], when)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        return stats
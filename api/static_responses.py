@@ -0,0 +1,55 @@
+import hashlib
+import threading
+
+from flask import Response, request
+
+
+class StaticResponse:
+    """استجابة JSON ثابتة تُسلسل مرة واحدة عند التشغيل
+
+    الجسم يُحفظ بايتات بنفس تنسيق jsonify، و ETag مأخوذ من تجزئة المحتوى فيتغير
+    فقط عند تغير البيانات (أي مع النشر الجديد). الطلب الذي يرسل If-None-Match
+    مطابقاً يأخذ 304 بدون جسم.
+    """
+
+    def __init__(self, app, payload, cache_control: str, stats=None):
+        self.body = app.json.response(payload).get_data()
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        # الترويسات مبنية مسبقاً (بدل make_conditional الذي يعيد تحليلها لكل طلب)
+        self.headers = [('ETag', f'"{self.etag}"'), ('Cache-Control', cache_control)]
+        self.stats = stats
+
+    def respond(self):
+        not_modified = request.if_none_match.contains_weak(self.etag)
+        if self.stats is not None:
+            self.stats.record(not_modified)
+        if not_modified:
+            return Response(status=304, headers=self.headers)
+        return Response(self.body, mimetype='application/json', headers=self.headers)
+
+
+class StaticVariants:
+    """مجموعة استجابات ثابتة حسب قيمة معامل (مثل city) مع استجابة احتياطية للقيم الأخرى"""
+
+    def __init__(self, app, build, keys, fallback, cache_control: str, stats=None):
+        self.variants = {key: StaticResponse(app, build(key), cache_control, stats) for key in keys}
+        self.fallback = StaticResponse(app, build(fallback), cache_control, stats)
+
+    def respond(self, key):
+        return self.variants.get(key, self.fallback).respond()
+
+
+class StaticStats:
+    """عدد الاستجابات الكاملة و 304 للمسارات الثابتة"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {'full': 0, 'not_modified': 0}
+
+    def record(self, not_modified: bool):
+        with self._lock:
+            self._stats['not_modified' if not_modified else 'full'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+# أسماء الأنواع في جدول satellites كما في setup.sql
+WEATHER_TYPE = 'طقس'
+COMMUNICATIONS_TYPE = 'اتصالات'
+HIGH_IMPORTANCE = ('عالية', 'عالية جداً')
+
+
+def build_statistics(counters: list, stations: dict):
+    """تحويل صفوف iraq_stats_counters (metric، dimension، value) إلى إحصائيات العراق
+
+    stations خريطة {معرّف المحطة: اسمها} لعرض الأرصاد حسب المحطة بالأسماء.
+    """
+    grouped = {}
+    for row in counters:
+        grouped.setdefault(row['metric'], {})[row['dimension']] = int(row['value'])
+
+    by_type = {k: v for k, v in grouped.get('satellites_by_type', {}).items() if v}
+    by_importance = {k: v for k, v in grouped.get('satellites_by_importance', {}).items() if v}
+    by_station = {
+        stations.get(station_id, station_id or 'غير محددة'): count
+        for station_id, count in grouped.get('observations_by_station', {}).items() if count
+    }
+
+    return {
+        'total_observations': grouped.get('observations', {}).get('', 0),
+        'total_satellites': grouped.get('satellites', {}).get('', 0),
+        'active_satellites': grouped.get('satellites_by_status', {}).get('active', 0),
+        'iraq_stations': len(stations),
+        'weather_satellites': by_type.get(WEATHER_TYPE, 0),
+        'communication_satellites': by_type.get(COMMUNICATIONS_TYPE, 0),
+        'high_importance_satellites': sum(by_importance.get(level, 0) for level in HIGH_IMPORTANCE),
+        'iraqi_satellites': grouped.get('satellites_by_country', {}).get('العراق', 0),
+        'satellites_by_type': by_type,
+        'satellites_by_importance': by_importance,
+        'observations_by_station': by_station
+    }
+
+
+class StatisticsCache:
+    """نسخة واحدة من الإحصائيات في الذاكرة لمدة ttl ثانية
+
+    الطلب الذي يجد النسخة منتهية يعيدها فوراً ويحدّثها طلب واحد فقط في الخلفية،
+    وعند فشل التحديث تبقى النسخة السابقة. الأرصاد المكتوبة من هذه العملية
+    تُضاف للعدادات مباشرة (record_observations) حتى تظهر قبل التحديث التالي.
+    """
+
+    def __init__(self, loader, ttl: float = 60):
+        self.loader = loader
+        self.ttl = ttl
+        self._value = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def get(self):
+        """الإحصائيات الحالية (نسخة مستقلة يمكن تعديلها)"""
+        with self._lock:
+            if self._value is not None:
+                if time.monotonic() - self._loaded_at < self.ttl:
+                    self._stats['hits'] += 1
+                elif not self._refreshing:
+                    self._stats['stale_hits'] += 1
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh, daemon=True).start()
+                else:
+                    self._stats['stale_hits'] += 1
+                return self._copy()
+            self._stats['misses'] += 1
+
+        # أول طلب فقط يحمّل، والبقية تنتظر نتيجته
+        with self._load_lock:
+            with self._lock:
+                if self._value is not None:
+                    return self._copy()
+            self._load()
+            with self._lock:
+                return self._copy()
+
+    def _copy(self):
+        value = dict(self._value)
+        for key in ('satellites_by_type', 'satellites_by_importance', 'observations_by_station'):
+            value[key] = dict(value[key])
+        return value
+
+    def _load(self):
+        value = self.loader()
+        value['last_updated'] = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic()
+            self._stats['refreshes'] += 1
+
+    def _refresh(self):
+        try:
+            self._load()
+        except Exception:
+            with self._lock:
+                self._stats['refresh_errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def record_observations(self, rows: list, stations: dict = None):
+        """إضافة أرصاد كُتبت للتو إلى النسخة المحفوظة (بدون استعلام)"""
+        with self._lock:
+            if self._value is None:
+                return
+            self._value['total_observations'] += len(rows)
+            by_station = self._value['observations_by_station']
+            for row in rows:
+                station_id = row.get('station_id') or ''
+                name = (stations or {}).get(station_id, station_id or 'غير محددة')
+                by_station[name] = by_station.get(name, 0) + 1
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['ttl_seconds'] = self.ttl
+            stats['age_seconds'] = round(time.monotonic() - self._loaded_at, 1) if self._value is not None else None
+        return stats
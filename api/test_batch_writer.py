@@ -0,0 +1,250 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class SupabaseStandIn(BaseHTTPRequestHandler):
+    """بديل محلي لواجهة Supabase REST: يسجل كل إدخال ويعيد الصفوف مع أرقام id"""
+
+    requests = []
+    attempts = []
+    delay = 0.0
+    fail = False
+    lock = threading.Lock()
+
+    def do_POST(self):
+        table = self.path.split('?')[0].rsplit('/', 1)[-1]
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        rows = body if isinstance(body, list) else [body]
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.attempts.append(len(rows))
+            if self.fail:
+                status, payload = 500, {'message': 'stand-in failure', 'code': 'XX000'}
+            elif any(row.get('bad') for row in rows):
+                # مثل خرق قيد في Postgres: الطلب كله يُرفض بسبب صف واحد
+                status, payload = 400, {'message': 'bad row', 'code': '23514'}
+            else:
+                start = sum(len(r) for _, r in self.requests)
+                self.requests.append((table, rows))
+                status = 201
+                payload = [dict(row, id=start + i + 1) for i, row in enumerate(rows)]
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SupabaseStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset(delay=0.0, fail=False):
+    SupabaseStandIn.requests = []
+    SupabaseStandIn.attempts = []
+    SupabaseStandIn.delay = delay
+    SupabaseStandIn.fail = fail
+
+
+server = start_server()
+os.environ['SUPABASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+os.environ.setdefault('SUPABASE_KEY', 'stand-in-key')
+
+from batch_writer import BatchWriter, BufferFullError
+from database import SatelliteDatabase
+
+
+def make_writer(db, **options):
+    return BatchWriter(db._insert_rows, **options)
+
+
+def test_size_triggered_batches():
+    print("🧪 التفريغ عند بلوغ حجم الدفعة...")
+    reset()
+    db = SatelliteDatabase()
+    db.writer = make_writer(db, batch_size=100, interval=60)
+
+    async def run():
+        return await asyncio.gather(*[
+            db.add_iraq_observation({'satellite': 'NOAA 19', 'seq': i}) for i in range(200)
+        ])
+
+    results = asyncio.run(run())
+    sizes = [len(rows) for _, rows in SupabaseStandIn.requests]
+    assert sizes == [100, 100], sizes
+    assert [r[0]['seq'] for r in results] == list(range(200))
+    assert all(r[0]['id'] for r in results)
+    assert all(r[0]['country'] == 'العراق' for r in results)
+    print(f"✅ 200 رصد في {len(sizes)} طلبات")
+
+
+def test_interval_flush():
+    print("🧪 التفريغ بعد مهلة التجميع...")
+    reset()
+    db = SatelliteDatabase()
+    db.writer = make_writer(db, batch_size=100, interval=0.2)
+
+    async def run():
+        started = time.monotonic()
+        results = await asyncio.gather(*[
+            db.log_iraq_pass({'city': 'بغداد'}, {'name': 'ISS'}, {'max_elevation': i}) for i in range(3)
+        ])
+        return time.monotonic() - started, results
+
+    elapsed, results = asyncio.run(run())
+    assert len(SupabaseStandIn.requests) == 1
+    assert SupabaseStandIn.requests[0][0] == 'iraq_satellite_passes'
+    assert 0.15 <= elapsed < 2.0, elapsed
+    assert [r[0]['pass_details']['max_elevation'] for r in results] == [0, 1, 2]
+    print(f"✅ 3 سجلات في طلب واحد بعد {elapsed * 1000:.0f} ms")
+
+
+def test_acknowledgement_without_waiting():
+    print("🧪 التأكيد القابل للانتظار دون انتظار الكتابة...")
+    reset(delay=0.3)
+    db = SatelliteDatabase()
+    db.writer = make_writer(db, batch_size=1, interval=60)
+
+    async def run():
+        started = time.monotonic()
+        ack = await db.add_iraq_observation({'satellite': 'METEOR M2'}, wait=False)
+        returned = time.monotonic() - started
+        row = await ack
+        return returned, row
+
+    returned, row = asyncio.run(run())
+    assert returned < 0.1, returned
+    assert row['id'] == 1 and row['satellite'] == 'METEOR M2'
+    print(f"✅ عاد الاستدعاء بعد {returned * 1000:.1f} ms واكتمل التأكيد لاحقاً")
+
+
+def test_backpressure():
+    print("🧪 الضغط العكسي عند امتلاء المخزن...")
+    reset(delay=0.2)
+    db = SatelliteDatabase()
+    writer = make_writer(db, batch_size=2, interval=0.01, max_pending=2, submit_timeout=5)
+
+    futures = [writer.submit('iraq_observations', {'seq': i}) for i in range(2)]
+    time.sleep(0.05)
+    futures += [writer.submit('iraq_observations', {'seq': i}) for i in range(2, 4)]
+    try:
+        writer.submit('iraq_observations', {'seq': 4}, timeout=0)
+        raise AssertionError('كان يجب رفض الصف والمخزن ممتلئ')
+    except BufferFullError:
+        pass
+
+    started = time.monotonic()
+    futures.append(writer.submit('iraq_observations', {'seq': 4}, timeout=5))
+    waited = time.monotonic() - started
+    assert waited >= 0.1, waited
+    assert [f.result(timeout=5)['seq'] for f in futures] == list(range(5))
+    assert writer.get_stats()['waits'] >= 1
+    writer.close()
+    print(f"✅ انتظر المُرسل {waited * 1000:.0f} ms حتى فرغ مكان")
+
+
+def test_flush_on_close():
+    print("🧪 كتابة المتبقي عند الإيقاف...")
+    reset()
+    db = SatelliteDatabase()
+    writer = make_writer(db, batch_size=100, interval=3600)
+    futures = [writer.submit('iraq_observations', {'seq': i}) for i in range(150)]
+    assert not SupabaseStandIn.requests
+    assert writer.close(timeout=5)
+    assert sum(len(rows) for _, rows in SupabaseStandIn.requests) == 150
+    assert all(f.done() for f in futures)
+    try:
+        writer.submit('iraq_observations', {'seq': 150})
+        raise AssertionError('كان يجب رفض الصف بعد الإغلاق')
+    except RuntimeError:
+        pass
+    print(f"✅ 150 صفاً كُتبت في {len(SupabaseStandIn.requests)} طلبات عند الإغلاق")
+
+
+def test_failure_reaches_caller():
+    print("🧪 وصول خطأ الإدخال للمُستدعي...")
+    reset(fail=True)
+    db = SatelliteDatabase()
+    db.writer = make_writer(db, batch_size=10, interval=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            *[db.add_iraq_observation({'seq': i}) for i in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, Exception) for r in results), results
+    db.writer.flush(timeout=5)
+    stats = db.writer.get_stats()
+    assert stats['failed'] == 3 and stats['written'] == 0
+    # الفشل المشترك لا يُقسم حتى صف واحد
+    assert len(SupabaseStandIn.attempts) == 3, SupabaseStandIn.attempts
+    print("✅ كل المُستدعين حصلوا على الخطأ")
+
+
+def test_bad_row_fails_alone():
+    print("🧪 الصف المعيب يفشل وحده...")
+    reset()
+    db = SatelliteDatabase()
+    writer = make_writer(db, batch_size=16, interval=60)
+    futures = [writer.submit('iraq_observations', {'seq': i, 'bad': i == 11}) for i in range(16)]
+    assert writer.flush(timeout=5)
+
+    errors = [i for i, f in enumerate(futures) if f.exception(timeout=5) is not None]
+    assert errors == [11], errors
+    assert [f.result()['seq'] for i, f in enumerate(futures) if i != 11] == [i for i in range(16) if i != 11]
+    stats = writer.get_stats()
+    assert stats['failed'] == 1 and stats['written'] == 15
+    writer.close()
+    print(f"✅ 15 صفاً كُتبت وفشل صف واحد بعد {len(SupabaseStandIn.attempts)} طلبات")
+
+
+def test_leftover_rows_keep_their_age():
+    print("🧪 الصفوف المتبقية بعد دفعة تُكتب بحسب زمن وصولها...")
+    reset()
+    db = SatelliteDatabase()
+    writer = make_writer(db, batch_size=3, interval=1.0)
+    started = time.monotonic()
+    writer.submit('iraq_observations', {'seq': 0})
+    time.sleep(0.4)
+    leftover = writer.submit('iraq_satellite_passes', {'seq': 1})
+    time.sleep(0.4)
+    # الجدول الأول يبلغ حجم الدفعة الكلي فيُكتب، ويبقى صف الجدول الثاني
+    writer.submit('iraq_observations', {'seq': 2})
+    leftover.result(timeout=5)
+    elapsed = time.monotonic() - started
+    # أقدم صف متبقٍ وصل عند 0.4 ثانية فيُكتب نحو 1.4 ثانية (وليس 1.8)
+    assert elapsed < 1.65, elapsed
+    writer.close()
+    print(f"✅ كُتب الصف المتبقي بعد {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    print("🔗 اختبار الكاتب المؤجل مع بديل محلي لـ Supabase...")
+    print("-" * 50)
+    test_size_triggered_batches()
+    test_interval_flush()
+    test_acknowledgement_without_waiting()
+    test_backpressure()
+    test_flush_on_close()
+    test_failure_reaches_caller()
+    test_bad_row_fails_alone()
+    test_leftover_rows_keep_their_age()
+    print("\n" + "=" * 50)
+    print("🎉 كل الاختبارات نجحت")
+    server.shutdown()
@@ -0,0 +1,219 @@
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+import requests
+
+from celestrak_client import CelesTrakClient
+from tle_fixtures import generate_catalog
+
+
+class CelesTrakStandIn(BaseHTTPRequestHandler):
+    """بديل محلي لـ gp.php: يرسل ETag و Last-Modified ويرد 304 عند عدم التغيير"""
+
+    protocol_version = 'HTTP/1.1'
+    groups = {}
+    requests = []
+    connections = set()
+    send_etag = True
+    delay = 0.0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        group = self.path.split('GROUP=')[1].split('&')[0]
+        text, modified = self.groups[group]
+        etag = '"' + hashlib.md5(text.encode()).hexdigest() + '"'
+        last_modified = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(modified))
+        with self.lock:
+            self.requests.append((group, dict(self.headers)))
+            self.connections.add(self.client_address)
+        time.sleep(self.delay)
+
+        if_none_match = self.headers.get('If-None-Match')
+        if_modified_since = self.headers.get('If-Modified-Since')
+        unchanged = (if_none_match == etag) if (self.send_etag and if_none_match) else \
+            (if_modified_since == last_modified)
+        if unchanged:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        # إرسال مقسّم (chunked) حتى يُختبر التحليل المتدفق
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        if self.send_etag:
+            self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        data = text.encode()
+        for start in range(0, len(data), 8192):
+            chunk = data[start:start + 8192]
+            self.wfile.write(f'{len(chunk):x}\r\n'.encode() + chunk + b'\r\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, *args):
+        pass
+
+
+def catalog_text(count, names=None):
+    lines = []
+    for name, line1, line2 in generate_catalog(count):
+        lines += [names(name) if names else name, line1, line2]
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def reset(send_etag=True, delay=0.0):
+    CelesTrakStandIn.requests = []
+    CelesTrakStandIn.connections = set()
+    CelesTrakStandIn.send_etag = send_etag
+    CelesTrakStandIn.delay = delay
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), CelesTrakStandIn)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+BASE_URL = f'http://127.0.0.1:{server.server_address[1]}/NORAD/elements/gp.php'
+
+
+def parse_names(lines):
+    """محلل بسيط: أسماء الأقمار (كل ثالث سطر غير فارغ)"""
+    lines = [line.strip() for line in lines if line.strip()]
+    return lines[0::3]
+
+
+def test_not_modified_reuses_value():
+    print("🧪 إعادة استخدام النتيجة عند 304 (ETag)...")
+    reset()
+    CelesTrakStandIn.groups['stations'] = (catalog_text(20), 1_700_000_000)
+    client = CelesTrakClient(BASE_URL)
+
+    first, modified = client.fetch('stations', parse_names)
+    assert modified and len(first) == 20
+    second, modified = client.fetch('stations', parse_names)
+    assert not modified and second is first
+    assert 'If-None-Match' not in CelesTrakStandIn.requests[0][1]
+    assert CelesTrakStandIn.requests[1][1]['If-None-Match'].startswith('"')
+    assert client.get_stats()['not_modified'] == 1
+    print("✅ الطلب الثاني أعاد الكائن نفسه بدون تنزيل")
+
+
+def test_changed_group_is_reparsed():
+    print("🧪 إعادة التحليل عند تغير المجموعة...")
+    reset()
+    CelesTrakStandIn.groups['weather'] = (catalog_text(5), 1_700_000_000)
+    client = CelesTrakClient(BASE_URL)
+    first, _ = client.fetch('weather', parse_names)
+
+    CelesTrakStandIn.groups['weather'] = (catalog_text(5, names=lambda n: n + ' NEW'), 1_700_007_200)
+    second, modified = client.fetch('weather', parse_names)
+    assert modified and second is not first
+    assert all(name.endswith(' NEW') for name in second)
+    print("✅ المجموعة المتغيرة نُزّلت وحُللت من جديد")
+
+
+def test_last_modified_only():
+    print("🧪 الطلب الشرطي بـ If-Modified-Since فقط...")
+    reset(send_etag=False)
+    CelesTrakStandIn.groups['geo'] = (catalog_text(8), 1_700_000_000)
+    client = CelesTrakClient(BASE_URL)
+    first, _ = client.fetch('geo', parse_names)
+    second, modified = client.fetch('geo', parse_names)
+    assert not modified and second is first
+    assert 'If-None-Match' not in CelesTrakStandIn.requests[1][1]
+    assert CelesTrakStandIn.requests[1][1]['If-Modified-Since'].endswith('GMT')
+    print("✅ 304 بالاعتماد على Last-Modified")
+
+
+def test_keep_alive():
+    print("🧪 إعادة استخدام الاتصال بين الطلبات...")
+    reset()
+    CelesTrakStandIn.groups['stations'] = (catalog_text(20), 1_700_000_000)
+    client = CelesTrakClient(BASE_URL)
+    for _ in range(5):
+        client.fetch('stations', parse_names)
+    assert len(CelesTrakStandIn.requests) == 5
+    assert len(CelesTrakStandIn.connections) == 1, CelesTrakStandIn.connections
+    print("✅ 5 طلبات على اتصال TCP واحد")
+
+
+def test_streaming_parse_large_group():
+    print("🧪 التحليل المتدفق لمجموعة كبيرة...")
+    reset()
+    from skyfield.api import load
+    from tle_catalog import parse_tle_lines
+
+    text = catalog_text(5000)
+    CelesTrakStandIn.groups['active'] = (text, 1_700_000_000)
+    ts = load.timescale()
+    client = CelesTrakClient(BASE_URL)
+
+    satellites, _ = client.fetch('active', lambda lines: parse_tle_lines(lines, ts))
+    expected = parse_tle_lines(text.split('\n'), ts)
+    assert list(satellites) == list(expected)
+    assert all(satellites[name].tle2 == expected[name].tle2 for name in expected)
+    print(f"✅ {len(satellites)} قمر من استجابة مقسّمة")
+
+
+def test_timeout():
+    print("🧪 مهلة الطلب...")
+    reset(delay=1.0)
+    CelesTrakStandIn.groups['slow'] = (catalog_text(3), 1_700_000_000)
+    client = CelesTrakClient(BASE_URL, timeout=0.2)
+    try:
+        client.fetch('slow', parse_names)
+        raise AssertionError('كان يجب أن تنتهي المهلة')
+    except requests.Timeout:
+        pass
+    assert client.get_stats()['errors'] == 1
+    print("✅ انتهت المهلة بدل انتظار غير محدود")
+
+
+def test_tracker_keeps_catalog_on_304():
+    print("🧪 ذاكرة الفهرس تحتفظ بالنسخة نفسها عند 304...")
+    reset()
+    os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+    os.environ.setdefault('SUPABASE_KEY', 'stand-in-key')
+    from satellite_utils import SatelliteTracker
+
+    CelesTrakStandIn.groups['stations'] = (catalog_text(30), 1_700_000_000)
+    tracker = SatelliteTracker()
+    # مجلد لقطات فارغ حتى يأتي الفهرس من البديل المحلي
+    tracker.snapshot_dir = tempfile.mkdtemp()
+    tracker.celestrak = CelesTrakClient(BASE_URL)
+
+    first = tracker.load_tle_from_celestrak('stations')
+    # انتهاء الصلاحية يطلق تحديثاً في الخلفية يصل إليه 304
+    tracker.tle_cache.ttl = 0
+    tracker.load_tle_from_celestrak('stations')
+    deadline = time.monotonic() + 5
+    while tracker.tle_cache.get_stats()['refreshing'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    second = tracker.load_tle_from_celestrak('stations')
+    assert second is first and len(first) == 30
+    assert tracker.tle_cache.get_stats()['refreshes'] >= 1
+    assert tracker.celestrak.get_stats()['not_modified'] == 1
+    print("✅ الفهرس نفسه أُعيد دون تحليل جديد")
+
+
+if __name__ == "__main__":
+    print("🔗 اختبار جلسة CelesTrak مع بديل محلي...")
+    print("-" * 50)
+    test_not_modified_reuses_value()
+    test_changed_group_is_reparsed()
+    test_last_modified_only()
+    test_keep_alive()
+    test_streaming_parse_large_group()
+    test_timeout()
+    test_tracker_keeps_catalog_on_304()
+    print("\n" + "=" * 50)
+    print("🎉 كل الاختبارات نجحت")
+    server.shutdown()
@@ -0,0 +1,51 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from solar import SolarTable, solar_day
+
+
+def test_subpolar_one_sided_days():
+    print("🧪 أيام بشروق دون غروب (أو العكس) قرب الدائرة القطبية...")
+    table = SolarTable(grid_degrees=0)
+    start = datetime(2026, 5, 20, tzinfo=timezone.utc)
+    one_sided = 0
+    for day in range(60):
+        when = start + timedelta(days=day, hours=7)
+        entry = table.get_day(65.9, -120.0, when)
+        if (entry['sun_rise'] is None) != (entry['sun_set'] is None):
+            one_sided += 1
+        for hour in range(0, 24, 3):
+            assert isinstance(table.is_daytime(65.9, -120.0, when + timedelta(hours=hour)), bool)
+    assert one_sided > 0
+    print(f"✅ {one_sided} يوماً بحد واحد دون أخطاء")
+
+
+def test_one_sided_bound():
+    print("🧪 شروق بلا غروب (65.9، -120 في 2026-06-13): المقارنة بالشروق فقط...")
+    day = solar_day(65.9, -120.0, datetime(2026, 6, 13))
+    assert day['sun_rise'] is not None and day['sun_set'] is None
+    table = SolarTable(grid_degrees=0)
+    assert table.is_daytime(65.9, -120.0, day['sun_rise'] + timedelta(minutes=5))
+    assert not table.is_daytime(65.9, -120.0, day['sun_rise'] - timedelta(minutes=5))
+    print("✅ الحالة صحيحة قبل وبعد الشروق")
+
+
+def test_baghdad_day_and_night():
+    print("🧪 بغداد: نهار عند الظهر وليل عند منتصف الليل...")
+    table = SolarTable()
+    assert table.is_daytime(33.31, 44.36, datetime(2026, 6, 13, 9, tzinfo=timezone.utc))
+    assert not table.is_daytime(33.31, 44.36, datetime(2026, 6, 13, 21, tzinfo=timezone.utc))
+    print("✅ صحيح")
+
+
+if __name__ == "__main__":
+    print("☀️ اختبار جدول الشروق والغروب...")
+    print("-" * 50)
+    test_subpolar_one_sided_days()
+    test_one_sided_bound()
+    test_baghdad_day_and_night()
+    print("\n" + "=" * 50)
+    print("🎉 كل الاختبارات نجحت")
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TLECatalogCache:
+    """ذاكرة مؤقتة لبيانات TLE حسب الفئة مع تحديث في الخلفية عند انتهاء الصلاحية
+
+    الفئة تأتي من معامل الطلب، لذلك عدد الفئات محدود (LRU) والفهارس الفارغة (فئة
+    غير موجودة في Celestrak) لا تُحفظ.
+    """
+
+    def __init__(self, loader, ttl: float = 3600, seed=None, max_entries: int = 32):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # seed(category) -> (satellites, age_seconds) أو None، لتسخين الذاكرة من مصدر محلي
+        self.seed = seed
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._category_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'seeded': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'evictions': 0
+        }
+
+    def get(self, category: str):
+        """إرجاع فهرس الفئة من الذاكرة، أو تحميله عند عدم وجوده"""
+        with self._lock:
+            entry = self._entries.get(category)
+            if entry is not None:
+                self._entries.move_to_end(category)
+                if time.monotonic() - entry['fetched_at'] < self.ttl:
+                    self._stats['hits'] += 1
+                else:
+                    # البيانات قديمة: نعيدها فوراً ونحدّثها مرة واحدة في الخلفية
+                    self._stats['stale_hits'] += 1
+                    self._start_refresh(category)
+                return entry['satellites']
+
+            self._stats['misses'] += 1
+            category_lock = self._category_locks.setdefault(category, threading.Lock())
+
+        # طلب واحد فقط يحمّل الفئة، والبقية تنتظر نتيجته
+        try:
+            with category_lock:
+                with self._lock:
+                    entry = self._entries.get(category)
+                if entry is not None:
+                    return entry['satellites']
+
+                seeded = self.seed(category) if self.seed is not None else None
+                if seeded is not None:
+                    satellites, age = seeded
+                    self.put(category, satellites, time.monotonic() - age)
+                    with self._lock:
+                        self._stats['seeded'] += 1
+                        if age >= self.ttl:
+                            self._start_refresh(category)
+                    return satellites
+
+                return self._load(category)
+        finally:
+            # القفل مطلوب أثناء التحميل فقط، فلا تتراكم أقفال لفئات عشوائية
+            with self._lock:
+                if self._category_locks.get(category) is category_lock:
+                    del self._category_locks[category]
+
+    def put(self, category: str, satellites: dict, fetched_at: float = None):
+        """تخزين فهرس فئة في الذاكرة (الفهرس الفارغ لا يُحفظ)"""
+        if not satellites:
+            return
+        with self._lock:
+            self._entries[category] = {
+                'satellites': satellites,
+                'fetched_at': time.monotonic() if fetched_at is None else fetched_at
+            }
+            self._entries.move_to_end(category)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, category: str = None):
+        """حذف فئة واحدة أو جميع الفئات من الذاكرة"""
+        with self._lock:
+            if category is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(category, None)
+
+    def _load(self, category: str):
+        satellites = self.loader(category)
+        self.put(category, satellites)
+        return satellites
+
+    def _start_refresh(self, category: str):
+        # يجب استدعاؤها مع الاحتفاظ بالقفل
+        if category in self._refreshing:
+            return
+        self._refreshing.add(category)
+        thread = threading.Thread(target=self._refresh, args=(category,), daemon=True)
+        thread.start()
+
+    def _refresh(self, category: str):
+        try:
+            self._load(category)
+            with self._lock:
+                self._stats['refreshes'] += 1
+        except Exception:
+            # نستمر بتقديم البيانات القديمة ونعيد المحاولة عند الطلب التالي
+            with self._lock:
+                self._stats['refresh_errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(category)
+
+    def get_stats(self):
+        """إحصائيات الإصابة والإخفاق والتحديث"""
+        now = time.monotonic()
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+            stats['hit_rate'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+            stats['ttl_seconds'] = self.ttl
+            stats['max_entries'] = self.max_entries
+            stats['refreshing'] = sorted(self._refreshing)
+            stats['categories'] = {
+                category: {
+                    'count': len(entry['satellites']),
+                    'age_seconds': round(now - entry['fetched_at'], 1),
+                    'stale': now - entry['fetched_at'] >= self.ttl
+                }
+                for category, entry in self._entries.items()
+            }
+        return stats
@@ -0,0 +1,110 @@
+from sgp4.api import Satrec
+from skyfield.api import EarthSatellite
+
+from tle_snapshot import RECORD_DTYPE, parse_tle_elements
+
+
+class TLERecord:
+    """سجل TLE خفيف يؤجل تهيئة SGP4 حتى أول حساب للموقع"""
+
+    __slots__ = ('name', 'tle1', 'tle2', 'ts', '_satellite', '_satrec', '_elements')
+
+    def __init__(self, name: str, tle1: str, tle2: str, ts, elements: dict = None):
+        self.name = name
+        self.tle1 = tle1
+        self.tle2 = tle2
+        self.ts = ts
+        self._satellite = None
+        self._satrec = None
+        # العناصر المحللة مسبقاً (مثلاً من لقطة) تغني عن إعادة تحليل السطرين
+        self._elements = elements
+
+    @property
+    def satellite(self):
+        """كائن EarthSatellite يُبنى مرة واحدة عند أول طلب"""
+        if self._satellite is None:
+            if self._satrec is not None:
+                satellite = EarthSatellite.from_satrec(self._satrec, self.ts)
+                satellite.name = self.name
+            else:
+                satellite = EarthSatellite(self.tle1, self.tle2, self.name, self.ts)
+            self._satellite = satellite
+        return self._satellite
+
+    @property
+    def satrec(self):
+        """نموذج SGP4 الخام (بدون غلاف skyfield) للحسابات المجمّعة"""
+        if self._satellite is not None:
+            return self._satellite.model
+        if self._satrec is None:
+            self._satrec = Satrec.twoline2rv(self.tle1, self.tle2)
+        return self._satrec
+
+    @property
+    def norad_id(self):
+        return self.tle1[2:7].strip()
+
+    @property
+    def elements(self):
+        """العناصر المدارية المستخرجة من نص TLE"""
+        if self._elements is None:
+            self._elements = parse_tle_elements(self.tle1, self.tle2)
+        return self._elements
+
+    @property
+    def is_initialized(self):
+        return self._satellite is not None or self._satrec is not None
+
+    # توافق مع الشكل القديم للفهرس: satellites[name]['satellite'] و ['tle1']
+    def __getitem__(self, key):
+        if key in ('satellite', 'tle1', 'tle2'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f'<TLERecord {self.name!r} #{self.norad_id}>'
+
+
+def parse_tle_lines(lines, ts):
+    """تحويل أسطر 3LE إلى فهرس {الاسم: TLERecord} بدون تهيئة SGP4
+
+    lines أي مُكرِّر أسطر (قائمة، ملف، أو استجابة HTTP متدفقة) ويُقرأ سطراً سطراً.
+    """
+    satellites = {}
+    group = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        group.append(line)
+        if len(group) == 3:
+            name, line1, line2 = group
+            satellites[name] = TLERecord(name, line1, line2, ts)
+            group = []
+
+    return satellites
+
+
+def catalog_from_snapshot(records, ts):
+    """تحويل سجلات لقطة إلى فهرس {الاسم: TLERecord} مع العناصر المحفوظة فيها
+
+    الأعمدة تُقرأ دفعة واحدة، والعناصر تُمرر كما هي بدل تحليل السطرين من جديد.
+    """
+    element_fields = RECORD_DTYPE.names[3:]
+    columns = [records[field].tolist() for field in element_fields]
+    satellites = {}
+    for name, line1, line2, *values in zip(
+        records['name'].tolist(), records['line1'].tolist(), records['line2'].tolist(), *columns
+    ):
+        name = name.decode('utf-8', errors='ignore')
+        satellites[name] = TLERecord(
+            name, line1.decode('ascii'), line2.decode('ascii'), ts, dict(zip(element_fields, values))
+        )
+    return satellites
@@ -0,0 +1,164 @@
+"""إدخال مجموعة TLE في جدول satellites وقراءتها منه
+
+الكتابة تحتاج مفتاح service role في SUPABASE_KEY (سياسات RLS تسمح بالقراءة فقط):
+
+    python tle_ingest.py --group stations --group weather
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from tle_catalog import TLERecord
+
+
+def epoch_iso(line1: str):
+    """حقبة TLE بصيغة ISO 8601 (UTC)"""
+    year = int(line1[18:20])
+    year += 2000 if year < 57 else 1900
+    moment = datetime(year, 1, 1, tzinfo=timezone.utc) + timedelta(days=float(line1[20:32]) - 1)
+    return moment.isoformat()
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def existing_rows(client, norad_ids: list, batch_size: int = 500):
+    """الصفوف الحالية للأقمار المطلوبة: {norad_id: {tle_line1، tle_groups}}"""
+    rows = {}
+    for chunk in _chunks(norad_ids, batch_size):
+        response = client.table('satellites')\
+            .select('norad_id,tle_line1,tle_groups')\
+            .in_('norad_id', chunk)\
+            .execute()
+        for row in response.data:
+            rows[row['norad_id']] = row
+    return rows
+
+
+def group_members(client, category: str, page_size: int = 1000):
+    """الصفوف المسجلة حالياً في الفئة: {norad_id: tle_groups}"""
+    members = {}
+    start = 0
+    while True:
+        response = client.table('satellites')\
+            .select('norad_id,tle_groups')\
+            .contains('tle_groups', [category])\
+            .order('norad_id')\
+            .range(start, start + page_size - 1)\
+            .execute()
+        for row in response.data:
+            members[row['norad_id']] = row['tle_groups'] or []
+        if len(response.data) < page_size:
+            return members
+        start += page_size
+
+
+def prune_group(client, category: str, keep: set, batch_size: int = 500):
+    """إزالة الفئة من الأقمار التي خرجت منها (سقطت أو نُقلت لمجموعة أخرى)، وإرجاع عددها"""
+    # الصفوف تُجمع حسب قائمة الفئات الناتجة حتى تكفي عملية update واحدة لكل مجموعة منها
+    updates = {}
+    for norad_id, groups in group_members(client, category, batch_size).items():
+        if norad_id not in keep:
+            remaining = tuple(group for group in groups if group != category)
+            updates.setdefault(remaining, []).append(norad_id)
+
+    for remaining, norad_ids in updates.items():
+        for chunk in _chunks(norad_ids, batch_size):
+            client.table('satellites')\
+                .update({'tle_groups': list(remaining)}, returning='minimal')\
+                .in_('norad_id', chunk)\
+                .execute()
+    return sum(len(norad_ids) for norad_ids in updates.values())
+
+
+def ingest_catalog(client, category: str, satellites: dict, batch_size: int = 500):
+    """upsert لفهرس فئة في satellites على norad_id، متجاوزاً الأقمار التي لم تتغير حقبتها
+
+    الصفوف المتغيرة تُرسل في دفعات من batch_size، ونقل العناصر القديمة إلى
+    tle_history يتم في قاعدة البيانات (المشغل archive_satellites_tle). الأقمار
+    المسجلة في الفئة وغير الموجودة في الفهرس الجديد تُزال منها.
+    """
+    # قمر واحد لكل رقم NORAD (الأحدث حقبة) حتى لا يتكرر في دفعة upsert واحدة
+    latest = {}
+    for record in satellites.values():
+        current = latest.get(record.norad_id)
+        if current is None or epoch_iso(record.tle1) > epoch_iso(current.tle1):
+            latest[record.norad_id] = record
+
+    existing = existing_rows(client, list(latest), batch_size)
+
+    changed = []
+    stats = {'fetched': len(satellites), 'unchanged': 0, 'inserted': 0, 'updated': 0, 'regrouped': 0}
+    for norad_id, record in latest.items():
+        row = existing.get(norad_id)
+        groups = list((row or {}).get('tle_groups') or [])
+        new_group = category not in groups
+        if new_group:
+            groups.append(category)
+
+        if row is None:
+            stats['inserted'] += 1
+        elif not row.get('tle_line1') or row['tle_line1'][18:32] != record.tle1[18:32]:
+            stats['updated'] += 1
+        elif new_group:
+            stats['regrouped'] += 1
+        else:
+            stats['unchanged'] += 1
+            continue
+
+        changed.append({
+            'norad_id': norad_id,
+            'name': record.name,
+            'tle_line1': record.tle1,
+            'tle_line2': record.tle2,
+            'tle_epoch': epoch_iso(record.tle1),
+            'tle_groups': groups
+        })
+
+    batches = 0
+    for chunk in _chunks(changed, batch_size):
+        client.table('satellites')\
+            .upsert(chunk, on_conflict='norad_id', returning='minimal')\
+            .execute()
+        batches += 1
+
+    stats['batches'] = batches
+    # فهرس فارغ يعني غالباً خطأ في التنزيل، فلا تُفرّغ الفئة بسببه
+    stats['removed'] = prune_group(client, category, set(latest), batch_size) if latest else 0
+    return stats
+
+
+def load_catalog(client, category: str, ts, page_size: int = 1000):
+    """فهرس فئة من قاعدة البيانات {الاسم: TLERecord} (صفحات بحجم page_size)"""
+    satellites = {}
+    start = 0
+    while True:
+        response = client.table('satellites')\
+            .select('name,tle_line1,tle_line2')\
+            .contains('tle_groups', [category])\
+            .not_.is_('tle_line1', 'null')\
+            .order('norad_id')\
+            .range(start, start + page_size - 1)\
+            .execute()
+        for row in response.data:
+            satellites[row['name']] = TLERecord(row['name'], row['tle_line1'], row['tle_line2'], ts)
+        if len(response.data) < page_size:
+            return satellites
+        start += page_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--group', action='append', help='فئة Celestrak (يمكن تكرارها)')
+    args = parser.parse_args()
+
+    from satellite_utils import tracker
+
+    for group in args.group or ['stations']:
+        stats = tracker.ingest_tle(group)
+        print(f"{group}: {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""لقطات فهارس TLE بصيغة ثابتة الحجم قابلة لـ mmap
+
+تنزيل مجموعات وكتابة لقطاتها مباشرة في مجلد TLE_SNAPSHOT_DIR:
+
+    python tle_snapshot.py --group stations --group weather
+"""
+import argparse
+import os
+import re
+import struct
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+# صيغة ملف اللقطة: ترويسة ثابتة ثم سجلات بحجم ثابت يمكن قراءتها عبر mmap
+SNAPSHOT_MAGIC = b'IQTLESNP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = '.tlesnap'
+
+HEADER_FORMAT = '<8sHHId32s'
+HEADER_SIZE = 64
+
+RECORD_DTYPE = np.dtype([
+    ('name', 'S48'),
+    ('line1', 'S69'),
+    ('line2', 'S69'),
+    ('norad_id', '<u4'),
+    ('epoch_jd', '<f8'),
+    ('inclination', '<f8'),
+    ('raan', '<f8'),
+    ('eccentricity', '<f8'),
+    ('arg_perigee', '<f8'),
+    ('mean_anomaly', '<f8'),
+    ('mean_motion', '<f8'),
+    ('bstar', '<f8'),
+])
+
+_CATEGORY_PATTERN = re.compile(r'[^A-Za-z0-9_-]')
+
+
+def parse_tle_elements(line1: str, line2: str):
+    """استخراج العناصر المدارية من سطري TLE بدون تهيئة SGP4"""
+    year = int(line1[18:20])
+    year += 2000 if year < 57 else 1900
+    day_of_year = float(line1[20:32])
+    # اليوم الجولياني لمنتصف ليل 1 يناير هو 1721424.5 + الترتيب الميلادي
+    epoch_jd = 1721424.5 + date(year, 1, 1).toordinal() + day_of_year - 1
+
+    # حقل BSTAR بصيغة مضغوطة: إشارة + 5 أرقام + أس (مثال: -11606-4)
+    bstar_field = line1[53:61]
+    sign = '-' if bstar_field[0] == '-' else ''
+    mantissa = bstar_field[1:6].strip() or '0'
+    exponent = bstar_field[6:8].strip() or '0'
+    bstar = float(f"{sign}0.{mantissa}e{exponent}")
+
+    return {
+        'norad_id': int(line1[2:7]),
+        'epoch_jd': epoch_jd,
+        'inclination': float(line2[8:16]),
+        'raan': float(line2[17:25]),
+        'eccentricity': float('0.' + line2[26:33].strip()),
+        'arg_perigee': float(line2[34:42]),
+        'mean_anomaly': float(line2[43:51]),
+        'mean_motion': float(line2[52:63]),
+        'bstar': bstar
+    }
+
+
+def snapshot_path(directory: str, category: str):
+    """مسار ملف اللقطة لفئة معينة"""
+    safe_category = _CATEGORY_PATTERN.sub('_', category)
+    return os.path.join(directory, safe_category + SNAPSHOT_EXTENSION)
+
+
+def write_snapshot(path: str, category: str, satellites: dict):
+    """كتابة فهرس الأقمار إلى ملف لقطة بشكل ذري"""
+    rows = []
+    for name, data in satellites.items():
+        elements = parse_tle_elements(data['tle1'], data['tle2'])
+        rows.append((
+            name.encode('utf-8')[:48],
+            data['tle1'].encode('ascii'),
+            data['tle2'].encode('ascii'),
+            *(elements[field] for field in RECORD_DTYPE.names[3:])
+        ))
+    records = np.array(rows, dtype=RECORD_DTYPE)
+
+    header = struct.pack(
+        HEADER_FORMAT,
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        0,
+        len(records),
+        time.time(),
+        category.encode('utf-8')[:32]
+    ).ljust(HEADER_SIZE, b'\0')
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_snapshot_header(path: str):
+    """قراءة ترويسة ملف اللقطة والتحقق من الإصدار"""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f'ملف لقطة غير مكتمل: {path}')
+
+    magic, version, _, count, created_at, category = struct.unpack_from(HEADER_FORMAT, raw)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f'ليس ملف لقطة TLE: {path}')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f'إصدار لقطة غير مدعوم: {version}')
+
+    return {
+        'version': version,
+        'count': count,
+        'created_at': created_at,
+        'category': category.rstrip(b'\0').decode('utf-8')
+    }
+
+
+def load_snapshot(path: str):
+    """تحميل ملف اللقطة عبر mmap وإرجاع (الترويسة، السجلات)"""
+    header = read_snapshot_header(path)
+    if header['count'] == 0:
+        return header, np.zeros(0, dtype=RECORD_DTYPE)
+
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r',
+                        offset=HEADER_SIZE, shape=(header['count'],))
+    return header, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--group', action='append', help='فئة Celestrak (يمكن تكرارها)')
+    args = parser.parse_args()
+
+    from satellite_utils import tracker
+    from tle_catalog import parse_tle_lines
+
+    if not tracker.snapshot_dir:
+        parser.error('TLE_SNAPSHOT_DIR فارغ')
+
+    for group in args.group or ['stations']:
+        # تنزيل مباشر (بدون الرجوع للقطة القديمة) حتى يفشل البناء إذا تعذر Celestrak
+        satellites, _ = tracker.celestrak.fetch(group, lambda lines: parse_tle_lines(lines, tracker.ts))
+        path = snapshot_path(tracker.snapshot_dir, group)
+        write_snapshot(path, group, satellites)
+        print(f"{group}: {len(satellites)} -> {path}")
+
+
+if __name__ == '__main__':
+    main()
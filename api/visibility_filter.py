@@ -0,0 +1,105 @@
+import numpy as np
+from skyfield.sgp4lib import theta_GMST1982
+
+from orbit_math import WGS84_A_KM, DAY_S
+
+# ثابت الجاذبية الأرضية (كم³/ث²) وعدد دورات الأرض في اليوم الشمسي
+EARTH_MU = 398600.4418
+SIDEREAL_REVS_PER_DAY = 1.00273790935
+
+# هامش أمان (درجة) يغطي إهمال الاضطرابات وتسطح الأرض في الحساب التحليلي
+MARGIN_DEGREES = 2.0
+
+# الأقمار القريبة من التزامن مع دوران الأرض تُعامل كأقمار ثابتة بالنسبة للأرض
+GEO_MEAN_MOTION_TOLERANCE = 0.05
+GEO_MAX_ECCENTRICITY = 0.05
+
+
+def satrec_elements(satrec):
+    """العناصر المدارية من نموذج SGP4 بنفس وحدات parse_tle_elements (درجات، دورة/يوم)"""
+    return {
+        'epoch_jd': satrec.jdsatepoch + satrec.jdsatepochF,
+        'inclination': np.degrees(satrec.inclo),
+        'raan': np.degrees(satrec.nodeo),
+        'eccentricity': satrec.ecco,
+        'arg_perigee': np.degrees(satrec.argpo),
+        'mean_anomaly': np.degrees(satrec.mo),
+        'mean_motion': satrec.no_kozai * 1440 / (2 * np.pi)
+    }
+
+
+def element_arrays(records: list):
+    """تجميع عناصر TLE لقائمة سجلات في مصفوفات numpy (بدون تهيئة SGP4)"""
+    fields = ('epoch_jd', 'inclination', 'raan', 'eccentricity',
+              'arg_perigee', 'mean_anomaly', 'mean_motion')
+    elements = [record.elements for record in records]
+    return {field: np.array([e[field] for e in elements], dtype=float) for field in fields}
+
+
+def coverage_angle(height_km, min_elevation: float):
+    """نصف زاوية التغطية الأرضية (درجة) لقمر على ارتفاع height_km فوق أدنى ارتفاع رؤية"""
+    elevation = np.radians(min_elevation)
+    ratio = WGS84_A_KM * np.cos(elevation) / (WGS84_A_KM + np.maximum(height_km, 0.0))
+    return np.degrees(np.arccos(np.clip(ratio, -1.0, 1.0)) - elevation)
+
+
+def visibility_mask(elements: dict, observers: list, min_elevation: float = 0,
+                    start_jd: float = None, end_jd: float = None):
+    """True لكل قمر قد يرتفع فوق min_elevation من راصد واحد على الأقل
+
+    الاختبار تحليلي من الميل والسرعة المتوسطة واللامركزية فقط (بدون نشر SGP4)،
+    ومحافظ: قد يُبقي قمراً لا يظهر فعلاً لكنه لا يستبعد قمراً يمكن رؤيته.
+    - خط العرض: أقصى خط عرض تبلغه نقطة القمر هو الميل، ويُرى القمر من خط عرض
+      أعلى بمقدار زاوية التغطية عند الأوج فقط.
+    - الأقمار الثابتة: خط طول نقطة القمر شبه ثابت، فيكفي فحص بُعده عن الراصد
+      مع حساب الانجراف خلال النافذة [start_jd, end_jd] (أيام UTC).
+    """
+    elements = {field: np.atleast_1d(np.asarray(value, dtype=float)) for field, value in elements.items()}
+    inclination = elements['inclination']
+    eccentricity = elements['eccentricity']
+    mean_motion = elements['mean_motion']
+
+    obs = np.asarray(observers, dtype=float).reshape(-1, 3)
+    obs_lat = obs[:, 0]
+    obs_lon = obs[:, 1]
+
+    # نصف المحور الأكبر من السرعة المتوسطة ثم أعلى ارتفاع (الأوج)
+    n = np.maximum(mean_motion, 1e-6) * 2 * np.pi / DAY_S
+    semi_major = np.cbrt(EARTH_MU / n ** 2)
+    reach = coverage_angle(semi_major * (1 + eccentricity) - WGS84_A_KM, min_elevation)
+
+    # المدارات التراجعية تبلغ خط عرض 180 - الميل
+    max_latitude = np.minimum(inclination, 180.0 - inclination)
+    limit = max_latitude + reach + MARGIN_DEGREES
+    visible = np.any(np.abs(obs_lat)[np.newaxis, :] <= limit[:, np.newaxis], axis=1)
+
+    geo = ((np.abs(mean_motion - SIDEREAL_REVS_PER_DAY) < GEO_MEAN_MOTION_TOLERANCE)
+           & (eccentricity < GEO_MAX_ECCENTRICITY))
+    if start_jd is None or not np.any(geo):
+        return visible
+
+    if end_jd is None:
+        end_jd = start_jd
+
+    # خط طول نقطة القمر عند العصر: الطول السماوي ناقص زاوية دوران الأرض
+    epoch_jd = elements['epoch_jd'][geo]
+    whole = np.floor(epoch_jd)
+    gmst = np.degrees(theta_GMST1982(whole, epoch_jd - whole)[0])
+    celestial = (elements['raan'] + elements['arg_perigee'] + elements['mean_anomaly'])[geo]
+
+    # الانجراف اليومي لخط الطول، ومنتصف النافذة ونصف عرضها
+    drift = (mean_motion[geo] - SIDEREAL_REVS_PER_DAY) * 360.0
+    mid_offset = (start_jd + end_jd) / 2 - epoch_jd
+    sub_lon = celestial - gmst + drift * mid_offset
+    spread = np.abs(drift) * (end_jd - start_jd) / 2
+
+    # تذبذب خط الطول بسبب اللامركزية (معادلة المركز ≈ 2e راديان) وخط العرض بسبب الميل
+    wobble = np.degrees(2 * eccentricity[geo]) + inclination[geo]
+    allowed = reach[geo] + spread + wobble + MARGIN_DEGREES
+
+    delta_lon = np.radians(obs_lon[np.newaxis, :] - sub_lon[:, np.newaxis])
+    cos_distance = np.cos(np.radians(obs_lat))[np.newaxis, :] * np.cos(delta_lon)
+    distance = np.degrees(np.arccos(np.clip(cos_distance, -1.0, 1.0)))
+
+    visible[geo] &= np.any(distance <= allowed[:, np.newaxis], axis=1)
+    return visible
@@ -0,0 +1,49 @@
+"""زمن فحص الاقتراب لفهارس بحجم 1000 و 5000 و 10000 جسم (هدف واحد، وكل الأزواج)"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from sgp4.api import Satrec
+
+from conjunction import screen
+from tle_fixtures import generate_catalog
+
+# 2026-10-17 00:00 UTC
+START_JD, START_FR = 2461330.5, 0.0
+
+
+def run(satrecs, hours, threshold, primaries, step):
+    started = time.perf_counter()
+    events, stats = screen(satrecs, START_JD, START_FR, hours / 24, threshold, primaries, step)
+    return time.perf_counter() - started, events, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,5000,10000')
+    parser.add_argument('--threshold', type=float, default=5.0, help='مسافة الاقتراب (كم)')
+    parser.add_argument('--hours', type=float, default=24.0, help='نافذة الفحص حول هدف واحد')
+    parser.add_argument('--all-hours', type=float, default=2.0, help='نافذة فحص كل الأزواج')
+    parser.add_argument('--step', type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"مسافة الاقتراب {args.threshold} كم، خطوة {args.step} ث")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        satrecs = [Satrec.twoline2rv(line1, line2) for _, line1, line2 in generate_catalog(size)]
+
+        # هدف واحد (ISS هو أول جسم في الفهرس المولّد)
+        elapsed, events, stats = run(satrecs, args.hours, args.threshold, [0], args.step)
+        print(f"{size:6d} جسم، ISS، {args.hours:g} ساعة: {elapsed * 1000:9.1f} ms  "
+              f"(بعد تصفية الأغلفة {stats['screened']}، مرشحون {stats['candidates']}، اقترابات {len(events)})")
+
+        elapsed, events, stats = run(satrecs, args.all_hours, args.threshold, None, args.step)
+        pairs = size * (size - 1) // 2
+        print(f"{size:6d} جسم، كل الأزواج ({pairs:,})، {args.all_hours:g} ساعة: {elapsed * 1000:9.1f} ms  "
+              f"(مرشحون {stats['candidates']}، تضييق {stats['refined']}، اقترابات {len(events)})")
+
+
+if __name__ == '__main__':
+    main()
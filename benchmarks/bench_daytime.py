@@ -0,0 +1,79 @@
+"""زمن تحديد النهار/الليل لكل طلب: بحث almanac على DE421 مقابل جدول الشروق والغروب المحفوظ"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from skyfield import almanac
+from skyfield.api import load, Topos
+
+from config import Config
+from solar import SolarTable
+
+
+def almanac_is_daytime(ts, eph, lat, lon, when):
+    """المسار السابق في SatelliteTracker.is_daytime: find_discrete على نافذة 24 ساعة"""
+    observer = Topos(latitude_degrees=lat, longitude_degrees=lon)
+    times, events = almanac.find_discrete(
+        ts.from_datetime(when - timedelta(hours=12)),
+        ts.from_datetime(when + timedelta(hours=12)),
+        almanac.sunrise_sunset(eph, observer)
+    )
+    for t, event in zip(times, events):
+        if t.utc_datetime() > when:
+            # الحدث التالي غروب (0) يعني أن الشمس فوق الأفق الآن
+            return event == 0
+    return True
+
+
+def per_call(repeat, func):
+    start = time.perf_counter()
+    for i in range(repeat):
+        result = func(i)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ephemeris', default='de421.bsp')
+    parser.add_argument('--time', default='2026-10-17T09:00:00+00:00', help='زمن ثابت للقياس (ISO)')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    eph = load(args.ephemeris)
+    when = datetime.fromisoformat(args.time)
+    cities = list(Config.IRAQ_LOCATIONS.values())
+
+    def city(i):
+        return cities[i % len(cities)]
+
+    old, _ = per_call(max(args.repeat // 10, 6), lambda i: almanac_is_daytime(
+        ts, eph, city(i)['lat'], city(i)['lon'], when))
+
+    # جدول جديد في كل استدعاء = أسوأ حالة (حساب اليوم من الصفر)
+    cold, _ = per_call(args.repeat, lambda i: SolarTable().is_daytime(
+        city(i)['lat'], city(i)['lon'], when))
+
+    table = SolarTable()
+    table.warm(cities, when)
+    warm, _ = per_call(args.repeat * 50, lambda i: table.is_daytime(
+        city(i)['lat'], city(i)['lon'], when + timedelta(seconds=i)))
+
+    mismatches = sum(
+        almanac_is_daytime(ts, eph, c['lat'], c['lon'], when + timedelta(hours=h)) !=
+        table.is_daytime(c['lat'], c['lon'], when + timedelta(hours=h))
+        for c in cities for h in range(0, 24, 3)
+    )
+
+    print(f"almanac.find_discrete:   {old * 1e3:10.3f} ms/طلب")
+    print(f"جدول شمسي (حساب جديد):  {cold * 1e3:10.3f} ms/طلب")
+    print(f"جدول شمسي (محفوظ):      {warm * 1e3:10.4f} ms/طلب  (تسريع x{old / warm:,.0f})")
+    print(f"اختلافات النهار/الليل مع almanac: {mismatches} من {len(cities) * 8}")
+
+
+if __name__ == '__main__':
+    main()
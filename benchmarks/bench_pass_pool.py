@@ -0,0 +1,69 @@
+"""زمن تنبؤ المرور لقائمة أقمار على 1 و 2 و 4 و 8 عمليات متوازية"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from skyfield.api import load
+
+from pass_pool import PassWorkerPool, predict_from_lines
+from tle_fixtures import generate_catalog
+
+BAGHDAD = (33.3128, 44.3615, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=64, help='عدد الأقمار في الطلب')
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--start-method', default='spawn')
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    start_tt = ts.utc(2026, 10, 17).tt
+    end_tt = start_tt + args.days
+    catalog = generate_catalog(args.count)
+    jobs = [(name, line1, line2) for name, line1, line2 in catalog]
+    observers = [BAGHDAD]
+
+    print(f"عدد الأقمار: {len(jobs)}، الأيام: {args.days}، أنوية المعالج: {os.cpu_count()}")
+
+    reference = None
+    baseline = None
+    for workers in [int(w) for w in args.workers.split(',')]:
+        if workers <= 1:
+            # التنفيذ التسلسلي داخل نفس العملية (بدون كلفة نقل البيانات)
+            started = time.perf_counter()
+            results = {
+                name: predict_from_lines(line1, line2, observers, start_tt, end_tt, 10, ts)
+                for name, line1, line2 in jobs
+            }
+            elapsed = time.perf_counter() - started
+            warmup = 0.0
+        else:
+            pool = PassWorkerPool(workers, args.start_method)
+            # تسخين العمال (بدء العمليات واستيراد المكتبات) خارج القياس
+            started = time.perf_counter()
+            pool.predict(jobs[:workers], observers, start_tt, start_tt + 0.01)
+            warmup = time.perf_counter() - started
+
+            started = time.perf_counter()
+            results, timed_out = pool.predict(jobs, observers, start_tt, end_tt)
+            elapsed = time.perf_counter() - started
+            pool.shutdown()
+            assert not timed_out
+
+        if reference is None:
+            reference, baseline = results, elapsed
+        # الترتيب والنتائج يجب أن تكون متطابقة مهما كان عدد العمال
+        assert list(results) == list(reference) and results == reference
+
+        print(f"عمال={workers}: {elapsed * 1000:9.1f} ms  "
+              f"(تسريع x{baseline / elapsed:4.2f}، تسخين {warmup * 1000:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""طلبات في الثانية لمسارات المعلومات الثابتة: jsonify لكل طلب مقابل البايتات المسلسلة مسبقاً و 304
+
+يُشغّل عبر عميل اختبار Flask (بدون شبكة)، ويحتاج SUPABASE_URL و SUPABASE_KEY بأي قيمة
+لأن استيراد app ينشئ عميل Supabase دون الاتصال به.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from flask import jsonify, request
+
+import app as app_module
+
+ROUTES = {
+    '/api/iraq/info': lambda: app_module.iraq_info_payload(),
+    '/api/developer': lambda: app_module.developer_payload(),
+    '/api/location/iraq': lambda: app_module.iraq_location_payload(request.args.get('city', 'baghdad')),
+    '/api/location': lambda: app_module.location_payload(request.args.get('city', 'baghdad')),
+}
+
+
+def register_jsonify_routes(app):
+    """المسار السابق: بناء القاموس و jsonify في كل طلب، تحت البادئة /bench/jsonify"""
+    for path, build in ROUTES.items():
+        app.add_url_rule(
+            '/bench/jsonify' + path, endpoint='bench_jsonify' + path,
+            view_func=lambda build=build: jsonify(build())
+        )
+
+
+def requests_per_second(client, url, seconds, rounds, headers=None):
+    """أفضل معدل من عدة جولات عبر عميل الاختبار (الطلب كاملاً مع CORS والسياق)"""
+    best = 0.0
+    for _ in range(rounds):
+        count = 0
+        start = time.perf_counter()
+        deadline = start + seconds / rounds
+        while time.perf_counter() < deadline:
+            for _ in range(50):
+                response = client.get(url, headers=headers)
+            count += 50
+        best = max(best, count / (time.perf_counter() - start))
+    return best, response
+
+
+def handler_per_second(app, url, view, repeat, headers=None):
+    """معدل دالة المسار وحدها داخل سياق طلب واحد (بدون كلفة عميل الاختبار)"""
+    with app.test_request_context(url, headers=headers):
+        view()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            view()
+        return repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=3.0, help='مدة القياس عبر عميل الاختبار لكل مسار وطريقة')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20000, help='عدد استدعاءات دالة المسار وحدها')
+    parser.add_argument('--city', default='basra')
+    args = parser.parse_args()
+
+    app = app_module.app
+    register_jsonify_routes(app)
+    client = app.test_client()
+
+    for label, measure in (
+        ('دالة المسار وحدها (طلب/ثانية)', 'handler'),
+        ('الطلب كاملاً عبر عميل الاختبار (طلب/ثانية)', 'client'),
+    ):
+        print(label)
+        print(f"{'المسار':<22}{'jsonify':>12}{'مسلسل':>12}{'304':>12}{'التسريع':>10}")
+        for path, build in ROUTES.items():
+            url = path + (f'?city={args.city}' if path.startswith('/api/location') else '')
+            view = app.view_functions[app.url_map.bind('').match(path)[0]]
+            old = client.get('/bench/jsonify' + url)
+            new = client.get(url)
+            assert old.get_data() == new.get_data(), f'{path}: المحتوى مختلف'
+            conditional = {'If-None-Match': new.headers['ETag']}
+            assert client.get(url, headers=conditional).status_code == 304
+
+            if measure == 'handler':
+                before = handler_per_second(app, url, lambda: jsonify(build()), args.repeat)
+                after = handler_per_second(app, url, view, args.repeat)
+                revalidated = handler_per_second(app, url, view, args.repeat, conditional)
+            else:
+                before, _ = requests_per_second(client, '/bench/jsonify' + url, args.seconds, args.rounds)
+                after, _ = requests_per_second(client, url, args.seconds, args.rounds)
+                revalidated, _ = requests_per_second(client, url, args.seconds, args.rounds, conditional)
+            print(f"{path:<22}{before:>12.0f}{after:>12.0f}{revalidated:>12.0f}{after / before:>9.2f}x")
+        print()
+
+
+if __name__ == '__main__':
+    main()
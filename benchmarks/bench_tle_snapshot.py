@@ -0,0 +1,101 @@
+"""مقارنة زمن تحميل لقطة TLE المحلية مقابل إعادة تحليل نص Celestrak الخام"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from skyfield.api import load, EarthSatellite
+
+from tle_snapshot import write_snapshot, load_snapshot
+from tle_catalog import catalog_from_snapshot, parse_tle_lines
+from tle_fixtures import generate_catalog, catalog_text
+
+
+def parse_raw_text(text, ts):
+    """نفس مسار التحليل في SatelliteTracker._fetch_tle_catalog"""
+    satellites = {}
+    lines = text.strip().split('\n')
+    for i in range(0, len(lines), 3):
+        if i + 2 < len(lines):
+            name = lines[i].strip()
+            line1 = lines[i + 1].strip()
+            line2 = lines[i + 2].strip()
+            satellites[name] = {
+                'satellite': EarthSatellite(line1, line2, name, ts),
+                'tle1': line1,
+                'tle2': line2
+            }
+    return satellites
+
+
+def best_of(repeat, func):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10000, help='عدد الأقمار في الفهرس المولّد')
+    parser.add_argument('--tle-file', help='ملف TLE حقيقي بدلاً من الفهرس المولّد')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.tle_file:
+        with open(args.tle_file, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = catalog_text(generate_catalog(args.count))
+
+    ts = load.timescale()
+    parse_time, satellites = best_of(args.repeat, lambda: parse_raw_text(text, ts))
+    lazy_time, _ = best_of(args.repeat, lambda: parse_tle_lines(text.split('\n'), ts))
+
+    def parse_with_elements():
+        catalog = parse_tle_lines(text.split('\n'), ts)
+        for record in catalog.values():
+            record.elements
+        return catalog
+
+    elements_time, _ = best_of(args.repeat, parse_with_elements)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.tlesnap')
+        write_time, _ = best_of(args.repeat, lambda: write_snapshot(path, 'bench', satellites))
+        size = os.path.getsize(path)
+
+        def load_records():
+            header, records = load_snapshot(path)
+            # لمس عمود واحد لإجبار قراءة الصفحات فعلياً
+            records['epoch_jd'].max()
+            return records
+
+        load_time, records = best_of(args.repeat, load_records)
+
+        def load_catalog():
+            # نفس مسار SatelliteTracker._load_tle_snapshot (سجلات مع عناصرها)
+            _, records = load_snapshot(path)
+            return catalog_from_snapshot(records, ts)
+
+        lines_time, _ = best_of(args.repeat, load_catalog)
+        del records
+
+    print(f"عدد الأقمار: {len(satellites)}")
+    print(f"حجم اللقطة: {size / 1024:.1f} KiB")
+    print(f"تحليل النص الخام + EarthSatellite: {parse_time * 1000:9.2f} ms")
+    print(f"تحليل النص الخام (سجلات مؤجلة):    {lazy_time * 1000:9.2f} ms")
+    print(f"تحليل النص الخام + العناصر:        {elements_time * 1000:9.2f} ms")
+    print(f"كتابة اللقطة:                      {write_time * 1000:9.2f} ms")
+    print(f"تحميل اللقطة (mmap + عناصر):       {load_time * 1000:9.2f} ms")
+    print(f"تحميل اللقطة إلى فهرس TLERecord:   {lines_time * 1000:9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""ميزانية زمن التشغيل البارد: استيراد app وأول طلب، مع أثقل الوحدات حسب python -X importtime"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+
+# يُنفّذ في عملية جديدة لكل قياس حتى يكون التشغيل بارداً فعلاً
+PROBE = '''
+import json, os, sys, time
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('SUPABASE_KEY', 'profile')
+sys.path.insert(0, {api_dir!r})
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+client.get('/health')
+health = time.perf_counter()
+app.tracker.ts.now()
+timescale = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'first_health_ms': (health - imported) * 1000,
+    'first_timescale_ms': (timescale - health) * 1000
+}}))
+'''
+
+
+def run_probe(api_dir):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(api_dir=api_dir)],
+        cwd=api_dir, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(api_dir, top):
+    """أثقل الوحدات (الزمن التراكمي بالميلي ثانية) من مخرجات -X importtime"""
+    env = dict(os.environ, SUPABASE_URL='http://127.0.0.1:9', SUPABASE_KEY='profile')
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=api_dir, env=env, check=True, capture_output=True, text=True
+    ).stderr
+
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        # app والوحدات المستوردة منه مباشرة وما يليها بمستوى واحد فقط
+        if depth <= 2:
+            modules.append((int(cumulative_us) / 1000, name.strip(), depth))
+    modules.sort(reverse=True)
+    return modules[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--api-dir', default=API_DIR, help='مجلد api المراد قياسه (لمقارنة نسختين)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args()
+    api_dir = os.path.abspath(args.api_dir)
+
+    runs = [run_probe(api_dir) for _ in range(args.runs)]
+    for key in ('import_ms', 'first_health_ms', 'first_timescale_ms'):
+        values = sorted(run[key] for run in runs)
+        print(f"{key:20s} وسيط {values[len(values) // 2]:8.1f} ms  (أقل {values[0]:.1f})")
+
+    print("\nأثقل الوحدات عند الاستيراد:")
+    for cumulative_ms, name, depth in import_profile(api_dir, args.top):
+        print(f"  {cumulative_ms:8.1f} ms  {'  ' * depth}{name}")
+
+
+if __name__ == '__main__':
+    main()
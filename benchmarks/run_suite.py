@@ -0,0 +1,297 @@
+"""مجموعة قياس الأداء للمسارات الساخنة بدون شبكة: فهارس TLE من benchmarks/fixtures وزمن مثبّت
+
+تغطي تحليل TLE و calculate_position و is_daytime و predict_passes (1 و 2 و 7 أيام)
+و get_antenna_orientation وكل مسارات Flask عبر عميل الاختبار، وتحفظ النتائج في JSON
+للمقارنة بين الإيداعات:
+
+    python run_suite.py --output before.json
+    python run_suite.py --compare before.json
+
+ملفات fixtures الحالية مولّدة بـ tle_fixtures.py (بصيغة Celestrak نفسها)، و --record
+يستبدلها بالمجموعات الحقيقية من Celestrak عند توفر الشبكة.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(BENCH_DIR, '..', 'api')
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+GROUPS = ('stations', 'weather', 'geo', 'active')
+
+sys.path.insert(0, API_DIR)
+
+# بدون شبكة: عميل Supabase يُنشأ ولا يتصل، ولا لقطات TLE ولا iraq_passes ولا عمليات منفصلة
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('SUPABASE_KEY', 'benchmark')
+os.environ['TLE_SNAPSHOT_DIR'] = ''
+os.environ['TLE_SOURCE'] = 'celestrak'
+os.environ['PASS_STORE_ENABLED'] = 'false'
+os.environ['PASS_POOL_WORKERS'] = '0'
+
+# عدادات ثابتة لمسار /api/iraq/statistics بدل قراءة iraq_stats_counters
+STATS_COUNTERS = [
+    {'metric': 'observations', 'dimension': '', 'value': 1200},
+    {'metric': 'satellites', 'dimension': '', 'value': 7},
+    {'metric': 'satellites_by_status', 'dimension': 'active', 'value': 7},
+    {'metric': 'satellites_by_type', 'dimension': 'طقس', 'value': 3},
+    {'metric': 'satellites_by_type', 'dimension': 'اتصالات', 'value': 3},
+    {'metric': 'satellites_by_importance', 'dimension': 'عالية', 'value': 3},
+    {'metric': 'satellites_by_country', 'dimension': 'العراق', 'value': 1},
+    {'metric': 'observations_by_station', 'dimension': 'baghdad', 'value': 800},
+]
+
+
+def fixture_path(group):
+    return os.path.join(FIXTURES_DIR, f'{group}.tle')
+
+
+def record_fixtures(groups):
+    """تنزيل المجموعات من Celestrak وحفظها كما هي في fixtures"""
+    import requests
+    from config import Config
+
+    for group in groups:
+        response = requests.get(Config.CELESTRAK_URL, params={'GROUP': group, 'FORMAT': 'tle'}, timeout=30)
+        response.raise_for_status()
+        with open(fixture_path(group), 'wb') as f:
+            f.write(response.content)
+        print(f"{group}: {len(response.content)} بايت")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, min_time, min_runs, setup=None):
+    """أزمنة الاستدعاء (ميلي ثانية) لعدد min_runs على الأقل وحتى يمضي min_time ثانية
+
+    setup() يُنفّذ قبل كل استدعاء خارج التوقيت (مثل تفريغ الذواكر لكل طلب).
+    """
+    if setup is not None:
+        setup()
+    func()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_runs or time.perf_counter() - started < min_time:
+        if setup is not None:
+            setup()
+        t = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t) * 1000)
+
+    samples.sort()
+    return {
+        'runs': len(samples),
+        'min_ms': samples[0],
+        'median_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'mean_ms': statistics.fmean(samples)
+    }
+
+
+class Suite:
+    """تهيئة المتعقب وتطبيق Flask على الفهارس المحلية والزمن المثبّت"""
+
+    def __init__(self, pinned: datetime):
+        import app as app_module
+        from stats_rollup import build_statistics
+        from tle_catalog import parse_tle_lines
+
+        self.app_module = app_module
+        self.tracker = app_module.tracker
+        self.client = app_module.app.test_client()
+        self.parse_tle_lines = parse_tle_lines
+
+        ts = self.tracker.ts
+        self.t0 = ts.from_datetime(pinned)
+        # كل ts.now() في المتعقب (المواقع، المرورات، البث) يعيد الزمن المثبّت
+        ts.now = lambda: self.t0
+
+        self.fixture_lines = {}
+        for group in GROUPS:
+            with open(fixture_path(group), encoding='utf-8') as f:
+                self.fixture_lines[group] = f.read().splitlines()
+            self.tracker.tle_cache.put(group, parse_tle_lines(self.fixture_lines[group], ts))
+
+        def offline(category):
+            raise RuntimeError(f'لا يوجد ملف fixtures للفئة {category}')
+        self.tracker.tle_cache.loader = offline
+
+        stations = {key: location['city'] for key, location in app_module.Config.IRAQ_LOCATIONS.items()}
+        app_module.db.statistics.loader = lambda: build_statistics(STATS_COUNTERS, stations)
+
+        self.stations = self.tracker.load_tle_from_celestrak('stations')
+        self.baghdad = app_module.Config.DEFAULT_LOCATION
+
+    def reset_request_caches(self):
+        """تفريغ ذواكر الطلب الواحد حتى يقيس كل تكرار الحساب نفسه لا الإصابة"""
+        self.app_module.response_cache.clear()
+        self.tracker.pass_cache.clear()
+
+    def benchmarks(self):
+        """(الاسم، الدالة، setup) لكل قياس"""
+        tracker = self.tracker
+        lat, lon = self.baghdad['lat'], self.baghdad['lon']
+        iss = self.stations['ISS (ZARYA)']['satellite']
+        sgp4_only = next(record['satellite'] for name, record in self.stations.items()
+                         if name not in self.app_module.Config.IRAQ_IMPORTANT_SATELLITES)
+        when = self.t0.utc_datetime()
+
+        def parse(group):
+            # تهيئة SGP4 مؤجلة في TLERecord، فنقيسها أيضاً بطلب satellite لكل سجل
+            def run():
+                for record in self.parse_tle_lines(self.fixture_lines[group], tracker.ts).values():
+                    record['satellite']
+            return run
+
+        items = [
+            ('parse_tle/stations', parse('stations'), None),
+            ('parse_tle/active', parse('active'), None),
+            ('calculate_position/iss_chebyshev', lambda: tracker.calculate_position(iss, lat, lon), None),
+            ('calculate_position/sgp4', lambda: tracker.calculate_position(sgp4_only, lat, lon), None),
+            ('is_daytime/baghdad', lambda: tracker.is_daytime(lat, lon, when), None),
+            ('get_antenna_orientation', lambda: tracker.get_antenna_orientation(123.4, 35.6), None),
+        ]
+        for days in (1, 2, 7):
+            items.append((
+                f'predict_passes/iss_{days}d',
+                lambda days=days: tracker.predict_passes(iss, lat, lon, days=days, t0=self.t0),
+                tracker.pass_cache.clear
+            ))
+        for name, method, url, body in ROUTES:
+            items.append((f'route/{name}', self.route_call(method, url, body), self.reset_request_caches))
+        return items
+
+    def route_call(self, method, url, body):
+        def run():
+            if url.startswith('/api/track/stream'):
+                # البث مستمر: نقيس حتى أول حدث ثم نغلق الاتصال
+                response = self.client.get(url, buffered=False)
+                first = next(iter(response.response))
+                response.close()
+                assert first.startswith(b'data:'), first
+                return
+            response = self.client.open(url, method=method, json=body)
+            assert response.status_code == 200, (url, response.status_code, response.get_data()[:200])
+        return run
+
+
+ISS = 'ISS (ZARYA)'
+ROUTES = [
+    ('satellites', 'GET', '/api/satellites', None),
+    ('satellites_iraq', 'GET', '/api/satellites?iraq=true', None),
+    ('track', 'POST', '/api/track', {'satellite_name': ISS}),
+    ('track_batch', 'POST', '/api/track/batch', {'satellites': [ISS, 'NOAA 19', 'NOAA 18'], 'stations': 'all'}),
+    ('track_stream', 'GET', '/api/track/stream?duration=2&rate=10', None),
+    ('rotator_track', 'GET', '/api/rotator/track?satellite=NOAA%2019', None),
+    ('groundtrack', 'GET', '/api/groundtrack', None),
+    ('predict', 'POST', '/api/predict', {'days': 2}),
+    ('predict_all_stations', 'POST', '/api/predict', {'days': 2, 'stations': 'all'}),
+    ('overhead', 'GET', '/api/overhead', None),
+    ('iraq_coverage', 'GET', '/api/iraq/coverage', None),
+    ('conjunctions', 'GET', '/api/conjunctions?hours=6', None),
+    ('iraq_info', 'GET', '/api/iraq/info', None),
+    ('iraq_statistics', 'GET', '/api/iraq/statistics', None),
+    ('location_iraq', 'GET', '/api/location/iraq?city=basra', None),
+    ('location', 'GET', '/api/location', None),
+    ('health', 'GET', '/health', None),
+    ('cache_stats', 'GET', '/api/cache/stats', None),
+    ('developer', 'GET', '/api/developer', None),
+]
+
+
+def compare(results, baseline_path, threshold):
+    """جدول الوسيط الحالي مقابل ملف سابق؛ يُرجع أسماء القياسات التي تباطأت أكثر من threshold"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print(f"\nمقارنة مع {baseline_path} ({baseline['meta'].get('commit')})")
+    regressions = []
+    for name, current in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:<40}{'':>12}{current['median_ms']:>12.3f}   جديد")
+            continue
+        ratio = current['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  ⚠️ أبطأ'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = '  أسرع'
+        print(f"{name:<40}{before['median_ms']:>12.3f}{current['median_ms']:>12.3f}{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--time', default='2026-10-17T09:00:00+00:00', help='الزمن المثبّت (ISO)')
+    parser.add_argument('--min-time', type=float, default=0.5, help='أقل مدة قياس لكل بند (ثانية)')
+    parser.add_argument('--min-runs', type=int, default=5)
+    parser.add_argument('--filter', help='تشغيل البنود التي يحتوي اسمها هذا النص فقط')
+    parser.add_argument('--output', help='ملف JSON للنتائج (افتراضياً results/<commit>.json)')
+    parser.add_argument('--compare', help='ملف نتائج سابق للمقارنة')
+    parser.add_argument('--threshold', type=float, default=0.15, help='نسبة التباطؤ التي تُعد تراجعاً')
+    parser.add_argument('--record', action='store_true', help='تحديث fixtures من Celestrak ثم الخروج')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(GROUPS)
+        return 0
+
+    pinned = datetime.fromisoformat(args.time)
+    suite = Suite(pinned)
+    commit = git_commit()
+
+    results = {}
+    print(f"{'البند':<40}{'الوسيط ms':>12}{'الأدنى ms':>12}{'p95 ms':>12}{'مرات':>8}")
+    for name, func, setup in suite.benchmarks():
+        if args.filter and args.filter not in name:
+            continue
+        result = measure(func, args.min_time, args.min_runs, setup)
+        results[name] = result
+        print(f"{name:<40}{result['median_ms']:>12.3f}{result['min_ms']:>12.3f}"
+              f"{result['p95_ms']:>12.3f}{result['runs']:>8d}")
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'pinned_time': pinned.isoformat(),
+                'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'fixtures': {group: len(suite.fixture_lines[group]) // 3 for group in GROUPS},
+                'min_time': args.min_time,
+                'min_runs': args.min_runs
+            },
+            'results': results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nالنتائج في {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} بند أبطأ من {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
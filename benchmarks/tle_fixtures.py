@@ -0,0 +1,100 @@
+"""توليد فهارس TLE اصطناعية بصيغة Celestrak (3LE) لاختبارات الأداء"""
+import math
+import random
+
+# عناصر مدارية تقريبية لأقمار معروفة، تُستخدم كبداية لكل فهرس مولّد
+SEED_SATELLITES = [
+    # (NORAD, الاسم, الميل, السرعة المتوسطة دورة/يوم, اللامركزية)
+    (25544, 'ISS (ZARYA)', 51.6400, 15.50100000, 0.0004000),
+    (33591, 'NOAA 19', 99.1900, 14.12800000, 0.0013000),
+    (28654, 'NOAA 18', 98.9800, 14.13100000, 0.0014000),
+    (40069, 'METEOR M2', 98.4800, 14.20900000, 0.0006000),
+    (27844, 'SAUDISAT 1C', 64.5500, 14.85000000, 0.0080000),
+    (33056, 'TÜRKSAT 3A', 0.0500, 1.00270000, 0.0002000),
+]
+
+
+def tle_checksum(line: str):
+    """مجموع التحقق لسطر TLE (الأرقام + 1 لكل إشارة سالبة)"""
+    total = 0
+    for char in line[:68]:
+        if char.isdigit():
+            total += int(char)
+        elif char == '-':
+            total += 1
+    return total % 10
+
+
+def _exponent_field(value: float):
+    if value == 0:
+        return ' 00000-0'
+    sign = '-' if value < 0 else ' '
+    value = abs(value)
+    exponent = math.floor(math.log10(value)) + 1
+    mantissa = int(round(value / 10 ** exponent * 1e5))
+    if mantissa >= 100000:
+        mantissa //= 10
+        exponent += 1
+    return f"{sign}{mantissa:05d}{'-' if exponent < 0 else '+'}{abs(exponent)}"
+
+
+def make_tle(norad_id: int, name: str, epoch_year: int, epoch_day: float,
+             inclination: float, raan: float, eccentricity: float,
+             arg_perigee: float, mean_anomaly: float, mean_motion: float,
+             bstar: float = 1e-4):
+    """بناء ثلاثية (الاسم، السطر 1، السطر 2) بصيغة TLE صحيحة"""
+    line1 = (f"1 {norad_id:05d}U 00000A   {epoch_year % 100:02d}{epoch_day:012.8f} "
+             f" .00001000  00000-0 {_exponent_field(bstar)} 0  999")
+    line1 += str(tle_checksum(line1))
+    line2 = (f"2 {norad_id:05d} {inclination:8.4f} {raan:8.4f} "
+             f"{int(round(eccentricity * 1e7)):07d} {arg_perigee:8.4f} "
+             f"{mean_anomaly:8.4f} {mean_motion:11.8f}{10000:5d}")
+    line2 += str(tle_checksum(line2))
+    return name, line1, line2
+
+
+def generate_catalog(count: int, epoch_year: int = 2026, epoch_day: float = 289.5, seed: int = 2026):
+    """فهرس بحجم count: الأقمار المعروفة أولاً ثم خليط من LEO و MEO و GEO"""
+    rng = random.Random(seed)
+    catalog = []
+
+    for norad_id, name, inclination, mean_motion, eccentricity in SEED_SATELLITES[:count]:
+        catalog.append(make_tle(
+            norad_id, name, epoch_year, epoch_day - rng.uniform(0, 1),
+            inclination, rng.uniform(0, 360), eccentricity,
+            rng.uniform(0, 360), rng.uniform(0, 360), mean_motion
+        ))
+
+    for i in range(count - len(catalog)):
+        kind = rng.random()
+        if kind < 0.75:
+            inclination = rng.choice([rng.uniform(0, 30), rng.uniform(45, 75), rng.uniform(95, 100)])
+            mean_motion = rng.uniform(13.0, 15.8)
+            eccentricity = rng.uniform(0, 0.01)
+        elif kind < 0.88:
+            inclination = rng.uniform(50, 65)
+            mean_motion = rng.uniform(1.9, 2.3)
+            eccentricity = rng.uniform(0, 0.02)
+        else:
+            inclination = rng.uniform(0, 5)
+            mean_motion = rng.uniform(0.99, 1.01)
+            eccentricity = rng.uniform(0, 0.001)
+
+        catalog.append(make_tle(
+            50000 + i, f'OBJECT {i:05d}', epoch_year, epoch_day - rng.uniform(0, 3),
+            inclination, rng.uniform(0, 360), eccentricity,
+            rng.uniform(0, 360), rng.uniform(0, 360), mean_motion,
+            bstar=rng.uniform(1e-5, 5e-4)
+        ))
+
+    return catalog
+
+
+def catalog_text(catalog):
+    """تحويل الفهرس إلى نص بنفس شكل استجابة Celestrak"""
+    return '\n'.join('\n'.join(entry) for entry in catalog) + '\n'
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.write(catalog_text(generate_catalog(int(sys.argv[1]) if len(sys.argv) > 1 else 100)))
@@ -10,6 +10,8 @@ CREATE TABLE satellites (
     norad_id VARCHAR(50) UNIQUE NOT NULL,
     tle_line1 TEXT,
     tle_line2 TEXT,
+    tle_epoch TIMESTAMP WITH TIME ZONE,
+    tle_groups TEXT[] DEFAULT '{}',
     frequency VARCHAR(50),
     type VARCHAR(50) CHECK (type IN ('طقس', 'اتصالات', 'بحث', 'محطة فضائية', 'عسكري', 'أخرى')),
     description TEXT,
@@ -24,6 +26,17 @@ CREATE TABLE satellites (
     project_year VARCHAR(10) DEFAULT '2026'
 );
 
+-- سجل عناصر TLE السابقة: كل مجموعة عناصر استُبدلت بحقبة أحدث في satellites
+CREATE TABLE tle_history (
+    id BIGSERIAL PRIMARY KEY,
+    norad_id VARCHAR(50) NOT NULL REFERENCES satellites(norad_id) ON DELETE CASCADE,
+    tle_line1 TEXT NOT NULL,
+    tle_line2 TEXT NOT NULL,
+    tle_epoch TIMESTAMP WITH TIME ZONE NOT NULL,
+    superseded_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (norad_id, tle_epoch)
+);
+
 -- جدول محطات الرصد العراقية
 CREATE TABLE iraq_stations (
     id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
@@ -73,7 +86,22 @@ CREATE TABLE iraq_passes (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     developer VARCHAR(255) DEFAULT 'المهندس حسين فاهم الخزعلي',
-    city VARCHAR(100) DEFAULT 'بغداد'
+    city VARCHAR(100) DEFAULT 'بغداد',
+    culmination_time TIMESTAMP WITH TIME ZONE,
+    min_elevation DECIMAL(5, 2),
+    UNIQUE (satellite_id, station_id, pass_start)
+);
+
+-- النافذة المحسوبة مسبقاً لكل (قمر، محطة) في iraq_passes (يحدّثها pass_store.py)
+CREATE TABLE iraq_pass_coverage (
+    satellite_id UUID NOT NULL REFERENCES satellites(id) ON DELETE CASCADE,
+    station_id UUID NOT NULL REFERENCES iraq_stations(id) ON DELETE CASCADE,
+    covered_from TIMESTAMP WITH TIME ZONE NOT NULL,
+    covered_until TIMESTAMP WITH TIME ZONE NOT NULL,
+    min_elevation DECIMAL(5, 2) NOT NULL,
+    tle_epoch TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (satellite_id, station_id)
 );
 
 -- جدول المستخدمين العراقيين
@@ -113,7 +141,10 @@ CREATE INDEX idx_satellites_iraq_importance ON satellites(iraq_importance);
 CREATE INDEX idx_satellites_type ON satellites(type);
 CREATE INDEX idx_observations_time ON iraq_observations(observation_time);
 CREATE INDEX idx_passes_time ON iraq_passes(pass_start, pass_end);
+CREATE INDEX idx_passes_station_time ON iraq_passes(station_id, pass_end, pass_start);
 CREATE INDEX idx_stations_location ON iraq_stations(location);
+CREATE INDEX idx_satellites_tle_groups ON satellites USING GIN (tle_groups);
+CREATE INDEX idx_tle_history_epoch ON tle_history(norad_id, tle_epoch DESC);
 
 -- Enable Row Level Security
 ALTER TABLE satellites ENABLE ROW LEVEL SECURITY;
@@ -121,12 +152,16 @@ ALTER TABLE iraq_stations ENABLE ROW LEVEL SECURITY;
 ALTER TABLE iraq_observations ENABLE ROW LEVEL SECURITY;
 ALTER TABLE iraq_passes ENABLE ROW LEVEL SECURITY;
 ALTER TABLE iraq_users ENABLE ROW LEVEL SECURITY;
+ALTER TABLE tle_history ENABLE ROW LEVEL SECURITY;
+ALTER TABLE iraq_pass_coverage ENABLE ROW LEVEL SECURITY;
 
 -- سياسات الوصول العام (قراءة فقط)
 CREATE POLICY "الوصول العام للأقمار" ON satellites FOR SELECT USING (true);
 CREATE POLICY "الوصول العام للمحطات" ON iraq_stations FOR SELECT USING (true);
 CREATE POLICY "الوصول العام للرصد" ON iraq_observations FOR SELECT USING (true);
 CREATE POLICY "الوصول العام للتنبؤات" ON iraq_passes FOR SELECT USING (true);
+CREATE POLICY "الوصول العام لسجل TLE" ON tle_history FOR SELECT USING (true);
+CREATE POLICY "الوصول العام لتغطية التنبؤات" ON iraq_pass_coverage FOR SELECT USING (true);
 
 -- دالة تحديث الوقت
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -143,12 +178,164 @@ CREATE TRIGGER update_satellites_updated_at
     FOR EACH ROW 
     EXECUTE FUNCTION update_updated_at_column();
 
+-- نقل عناصر TLE القديمة إلى السجل عند وصول حقبة جديدة
+CREATE OR REPLACE FUNCTION archive_superseded_tle()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF OLD.tle_line1 IS NOT NULL AND OLD.tle_epoch IS NOT NULL
+       AND NEW.tle_epoch IS DISTINCT FROM OLD.tle_epoch THEN
+        INSERT INTO tle_history (norad_id, tle_line1, tle_line2, tle_epoch)
+        VALUES (OLD.norad_id, OLD.tle_line1, OLD.tle_line2, OLD.tle_epoch)
+        ON CONFLICT (norad_id, tle_epoch) DO NOTHING;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER archive_satellites_tle
+    BEFORE UPDATE OF tle_epoch ON satellites
+    FOR EACH ROW
+    EXECUTE FUNCTION archive_superseded_tle();
+
 CREATE TRIGGER update_passes_updated_at 
     BEFORE UPDATE ON iraq_passes 
     FOR EACH ROW 
     EXECUTE FUNCTION update_updated_at_column();
 
--- دالة إحصائية للعراق
+CREATE TRIGGER update_pass_coverage_updated_at
+    BEFORE UPDATE ON iraq_pass_coverage
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- عدادات الإحصائيات: صف لكل (مقياس، بُعد) بدل COUNT على الجداول عند كل طلب
+CREATE TABLE iraq_stats_counters (
+    metric VARCHAR(50) NOT NULL,
+    dimension VARCHAR(255) NOT NULL DEFAULT '',
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (metric, dimension)
+);
+
+ALTER TABLE iraq_stats_counters ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "الوصول العام للإحصائيات" ON iraq_stats_counters FOR SELECT USING (true);
+
+-- الأرصاد: عدّ تزايدي لكل جملة إدخال أو حذف (إدخال دفعة من 100 رصد = تحديث واحد لكل محطة)
+CREATE OR REPLACE FUNCTION count_iraq_observations()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO iraq_stats_counters (metric, dimension, value, updated_at)
+    SELECT metric, dimension, CASE WHEN TG_OP = 'DELETE' THEN -total ELSE total END, NOW()
+    FROM (
+        SELECT 'observations' AS metric, '' AS dimension, COUNT(*) AS total FROM changed_rows
+        UNION ALL
+        SELECT 'observations_by_station', COALESCE(station_id::text, ''), COUNT(*)
+        FROM changed_rows GROUP BY station_id
+    ) counts
+    ON CONFLICT (metric, dimension)
+    DO UPDATE SET value = iraq_stats_counters.value + EXCLUDED.value, updated_at = NOW();
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER count_observations_insert
+    AFTER INSERT ON iraq_observations
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_iraq_observations();
+
+CREATE TRIGGER count_observations_delete
+    AFTER DELETE ON iraq_observations
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_iraq_observations();
+
+-- الأبعاد التي يُعدّ فيها كل قمر: (المقياس، البُعد)
+CREATE OR REPLACE FUNCTION satellite_stat_dimensions(
+    sat_type VARCHAR, sat_status VARCHAR, importance VARCHAR, sat_country VARCHAR
+)
+RETURNS TABLE (metric VARCHAR, dimension VARCHAR) AS $$
+    VALUES
+        ('satellites'::VARCHAR, ''::VARCHAR),
+        ('satellites_by_type', COALESCE(sat_type, '')),
+        ('satellites_by_status', COALESCE(sat_status, '')),
+        ('satellites_by_importance', COALESCE(importance, '')),
+        ('satellites_by_country', COALESCE(sat_country, ''))
+$$ LANGUAGE sql IMMUTABLE;
+
+-- الأقمار: فروق تزايدية من جداول الانتقال (+1 للصفوف الجديدة، -1 للقديمة) لكل مقياس وبُعد.
+-- تحديث TLE لا يغيّر النوع أو الحالة فتتعادل فروقه ولا يُكتب أي عداد
+CREATE OR REPLACE FUNCTION count_satellites()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO iraq_stats_counters (metric, dimension, value, updated_at)
+        SELECT d.metric, d.dimension, COUNT(*), NOW()
+        FROM new_rows
+        CROSS JOIN LATERAL satellite_stat_dimensions(new_rows.type, new_rows.status, new_rows.iraq_importance, new_rows.country) d
+        GROUP BY d.metric, d.dimension
+        ORDER BY d.metric, d.dimension
+        ON CONFLICT (metric, dimension)
+        DO UPDATE SET value = iraq_stats_counters.value + EXCLUDED.value, updated_at = NOW();
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO iraq_stats_counters (metric, dimension, value, updated_at)
+        SELECT d.metric, d.dimension, -COUNT(*), NOW()
+        FROM old_rows
+        CROSS JOIN LATERAL satellite_stat_dimensions(old_rows.type, old_rows.status, old_rows.iraq_importance, old_rows.country) d
+        GROUP BY d.metric, d.dimension
+        ORDER BY d.metric, d.dimension
+        ON CONFLICT (metric, dimension)
+        DO UPDATE SET value = iraq_stats_counters.value + EXCLUDED.value, updated_at = NOW();
+    ELSE
+        INSERT INTO iraq_stats_counters (metric, dimension, value, updated_at)
+        SELECT d.metric, d.dimension, SUM(changed.delta), NOW()
+        FROM (
+            SELECT type, status, iraq_importance, country, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT type, status, iraq_importance, country, -1 FROM old_rows
+        ) changed
+        CROSS JOIN LATERAL satellite_stat_dimensions(changed.type, changed.status, changed.iraq_importance, changed.country) d
+        GROUP BY d.metric, d.dimension
+        HAVING SUM(changed.delta) <> 0
+        ORDER BY d.metric, d.dimension
+        ON CONFLICT (metric, dimension)
+        DO UPDATE SET value = iraq_stats_counters.value + EXCLUDED.value, updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER count_satellites_insert
+    AFTER INSERT ON satellites
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_satellites();
+
+CREATE TRIGGER count_satellites_update
+    AFTER UPDATE ON satellites
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_satellites();
+
+CREATE TRIGGER count_satellites_delete
+    AFTER DELETE ON satellites
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_satellites();
+
+-- تعبئة العدادات للبيانات الموجودة قبل إنشاء المشغلات
+INSERT INTO iraq_stats_counters (metric, dimension, value)
+SELECT 'observations', '', COUNT(*) FROM iraq_observations
+UNION ALL
+SELECT 'observations_by_station', COALESCE(station_id::text, ''), COUNT(*)
+FROM iraq_observations GROUP BY station_id;
+
+INSERT INTO iraq_stats_counters (metric, dimension, value)
+SELECT d.metric, d.dimension, COUNT(*)
+FROM satellites
+CROSS JOIN LATERAL satellite_stat_dimensions(satellites.type, satellites.status, satellites.iraq_importance, satellites.country) d
+GROUP BY d.metric, d.dimension;
+
+-- دالة إحصائية للعراق (تقرأ العدادات بزمن ثابت)
 CREATE OR REPLACE FUNCTION get_iraq_satellite_stats()
 RETURNS TABLE (
     total_satellites BIGINT,
@@ -160,12 +347,12 @@ RETURNS TABLE (
 BEGIN
     RETURN QUERY
     SELECT 
-        COUNT(*) as total_satellites,
-        COUNT(*) FILTER (WHERE type = 'طقس') as weather_sats,
-        COUNT(*) FILTER (WHERE type = 'اتصالات') as comm_sats,
-        COUNT(*) FILTER (WHERE iraq_importance IN ('عالية', 'عالية جداً')) as high_importance,
-        COUNT(*) FILTER (WHERE country = 'العراق') as iraqi_sats
-    FROM satellites;
+        COALESCE(SUM(value) FILTER (WHERE metric = 'satellites'), 0)::BIGINT as total_satellites,
+        COALESCE(SUM(value) FILTER (WHERE metric = 'satellites_by_type' AND dimension = 'طقس'), 0)::BIGINT as weather_sats,
+        COALESCE(SUM(value) FILTER (WHERE metric = 'satellites_by_type' AND dimension = 'اتصالات'), 0)::BIGINT as comm_sats,
+        COALESCE(SUM(value) FILTER (WHERE metric = 'satellites_by_importance' AND dimension IN ('عالية', 'عالية جداً')), 0)::BIGINT as high_importance,
+        COALESCE(SUM(value) FILTER (WHERE metric = 'satellites_by_country' AND dimension = 'العراق'), 0)::BIGINT as iraqi_sats
+    FROM iraq_stats_counters;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -174,6 +361,9 @@ COMMENT ON TABLE satellites IS 'جدول الأقمار الصناعية - ال
 COMMENT ON TABLE iraq_stations IS 'محطات الرصد العراقية - تطوير المهندس حسين فاهم الخزعلي 2026';
 COMMENT ON TABLE iraq_observations IS 'سجلات الرصد العراقية للأقمار الصناعية';
 COMMENT ON TABLE iraq_passes IS 'تنبؤات مرور الأقمار فوق العراق';
+COMMENT ON TABLE iraq_pass_coverage IS 'النافذة الزمنية المحسوبة مسبقاً لكل قمر ومحطة';
+COMMENT ON TABLE iraq_stats_counters IS 'عدادات الإحصائيات التي تحدّثها المشغلات';
+COMMENT ON TABLE tle_history IS 'عناصر TLE السابقة لكل قمر مرتبة حسب الحقبة';
 
 -- رسالة ترحيبية
 DO $$